@@ -21,14 +21,18 @@ class Static2D(tk.Frame):
         self.Nset, self.Elset, self.Surface = [], [], []  # 初始化结点集、单元集和表面集
         self.cengmian = []  # 初始化层面集合
         self.nodes = None  # 初始化结点坐标
+        self.elements = None  # 初始化二维单元的角结点编号
         self.bound = None  # 初始化边界结点
         self.slide_f = tk.StringVar()  # 初始化抗剪断参数f
         self.slide_c = tk.StringVar()  # 初始化抗剪断参数c
         self.K_value = tk.StringVar()  # 初始化抗滑稳定安全系数K
-        self.figs = []  # 初始化图片列表
+        self.figs = OrderedDict()  # 初始化已绘制图片的缓存，键为图片序号
+        self.fig_specs = []  # 初始化图片绘图描述列表
         self.figs_type = []  # 初始化图片类型列表
         self.figs_data = []  # 初始化图片数据
         self.current_fig = None  # 初始化当前显示的图片
+        self.fig_idx = None  # 初始化当前显示的图片序号
+        self.fig_prefetch = None  # 初始化空闲时预先绘制图片的回调
         self.fig_title = []  # 初始化图片标题列表
         self.fig_title_current = tk.StringVar(value='图片显示')  # 初始化当前图片标题
         self.set_page()  # 页面设置
@@ -64,8 +68,10 @@ class Static2D(tk.Frame):
             self.write_log_to_Text('网格文件格式错误，请选择Abaqus的inp文件')
             self.Nset, self.Elset, self.Surface = [], [], []
             self.nodes = None
+            self.elements = None
         else:
             self.nodes = read_nodes(self.mesh_path.get(), dims=2)  # 读取所有结点坐标
+            self.elements = read_plane_elements(self.mesh_path.get()) or None  # 读取二维单元，用于直接在网格单元上绘制等值线
             self.Nset, self.Elset, self.Surface = read_mesh(self.mesh_path.get())  # 读取所有集合
             for ns in self.Nset:
                 if 'cengmian' in ns.lower() and ns not in self.cengmian:  # 读取层面
@@ -110,14 +116,17 @@ class Static2D(tk.Frame):
         self.Nset, self.Elset, self.Surface = [], [], []
         self.cengmian = []
         self.nodes = None
+        self.elements = None
         self.bound = None  
         self.renew_combobox()  # 更新下拉选择框
         self.write_log_to_Text('清除文件成功！')
         # 清除图片显示框
-        self.figs = []  # 初始化图片列表
+        self.figs = OrderedDict()  # 初始化已绘制图片的缓存，键为图片序号
+        self.fig_specs = []  # 初始化图片绘图描述列表
         self.figs_type = []  # 初始化图片类型列表
         self.figs_data = []  # 初始化图片数据
         self.current_fig = None  # 初始化当前显示的图片
+        self.fig_idx = None  # 初始化当前显示的图片序号
         self.fig_title = []  # 初始化图片标题列表
         self.fig_title_current.set('图片显示')  # 初始化当前图片标题
         for widget in self.fig_frame.winfo_children():
@@ -178,6 +187,10 @@ class Static2D(tk.Frame):
                     self.write_log_to_Text('没有边界结点信息，请读取边界文件')
                 else:
                     boundary = get_boundary(self.bound, self.nodes)  # 获取用于绘图的边界
+                    # 等值线绘制方式，'网格'时直接在网格单元上绘制，没有读到二维单元时对结点做三角剖分
+                    method, elements = 'cubic', None
+                    if self.contour_method_ddl.get() == '网格':
+                        method, elements = 'tri', self.elements
                     # 位移等值线图的绘制
                     disp_data_path = os.path.join(odb_dir, 'sta-disp-dam.csv')
                     if os.path.exists(disp_data_path):  # 检查是否存在位移数据文件
@@ -186,11 +199,7 @@ class Static2D(tk.Frame):
                             disp_comp = disp_comp.split(',')
                             for comp in disp_comp:
                                 if comp != '全选':
-                                    fig, xx, yy, zz = sta_disp_contour(disp_data_path, boundary, direc=comp)
-                                    self.figs.append(fig)
-                                    self.figs_data.append([xx, yy, zz])
-                                    self.figs_type.append('contour')
-                                    self.fig_title.append('%s向位移等值线图(cm)' % comp)
+                                    self.add_fig_spec('contour', '%s向位移等值线图(cm)' % comp, fig_spec(sta_disp_contour, disp_data_path, boundary, direc=comp, method=method, elements=elements))
                     # 应力等值线图的绘制
                     stre_data_path = os.path.join(odb_dir, 'sta-stre-dam.csv')
                     if os.path.exists(stre_data_path):  # 检查是否存在应力数据文件
@@ -200,29 +209,89 @@ class Static2D(tk.Frame):
                             for comp in stre_comp:
                                 if comp != '全选':
                                     if comp == '大主应力':
-                                        fig, xx, yy, zz = sta_stre_contour(stre_data_path, boundary, component='Smax')
+                                        component = 'Smax'
                                     if comp == '小主应力':
-                                        fig, xx, yy, zz = sta_stre_contour(stre_data_path, boundary, component='Smin')
-                                    self.figs.append(fig)
-                                    self.figs_data.append([xx, yy, zz])
-                                    self.figs_type.append('contour')
-                                    self.fig_title.append('%s等值线图(MPa)' % comp)
+                                        component = 'Smin'
+                                    self.add_fig_spec('contour', '%s等值线图(MPa)' % comp, fig_spec(sta_stre_contour, stre_data_path, boundary, component=component, method=method, elements=elements))
                     # 损伤因子分布图的绘制
                     dmgt_data_path = os.path.join(odb_dir, 'dmgt-dam1.csv')
                     if os.path.exists(dmgt_data_path):  # 检查是否存在损伤因子数据文件
                         if self.dmgt_direc_ddl.get() == '是':
-                            fig, xx, yy, zz = dmgt_contour(dmgt_data_path, boundary)
-                            self.figs.append(fig)
-                            self.figs_data.append([xx, yy, zz])
-                            self.figs_type.append('contourf')
-                            self.fig_title.append('损伤因子分布图')
-        # 默认显示第一张图片
-        if len(self.figs) > 0:
-            self.current_fig = self.figs[0]
-            self.update_fig()
-            self.write_log_to_Text('绘图完成，共绘制了%d张图片' % len(self.figs))
+                            self.add_fig_spec('contourf', '损伤因子分布图', fig_spec(dmgt_contour, dmgt_data_path, boundary, method=method, elements=elements))
+        # 默认显示第一张图片，其余图片在切换到时才绘制
+        if len(self.fig_specs) > 0:
+            self.show_fig(0)
+            self.write_log_to_Text('共%d张图片，切换到图片时绘制' % len(self.fig_specs))
 
     
+    def add_fig_spec(self, fig_type, title, spec, fig=None, fig_data=None):
+        """把图片的绘图描述加入图片列表，图片在切换到该图时才绘制
+
+        Args:
+            fig_type (string): 图片类型
+            title (string): 图片标题
+            spec (tuple): 绘图描述，见fig_spec
+            fig (plt.figure, optional): 已绘制的图片，默认为None
+            fig_data (list, optional): 已绘制图片的重绘数据，默认为None
+        """
+        self.fig_specs.append(spec)
+        self.figs_data.append(fig_data)
+        self.figs_type.append(fig_type)
+        self.fig_title.append(title)
+        if fig is not None:
+            plt.close(fig)
+            cache_fig(self.figs, len(self.fig_specs) - 1, fig, self.fig_idx)
+
+
+    def get_fig(self, idx):
+        """获取图片，不在缓存中的图片根据绘图描述重新绘制
+
+        Args:
+            idx (int): 图片序号
+
+        Returns:
+            fig (plt.figure): 图片句柄
+        """
+        if idx not in self.figs:
+            fig, self.figs_data[idx] = render_fig(self.fig_specs[idx])
+            cache_fig(self.figs, idx, fig, self.fig_idx)
+        return self.figs[idx]
+
+
+    def show_fig(self, idx):
+        """显示图片，没有绘制的图片此时才绘制，并在界面空闲时预先绘制前后两张图片
+
+        Args:
+            idx (int): 图片序号
+        """
+        self.fig_idx = idx
+        self.current_fig = self.get_fig(idx)
+        self.figs.move_to_end(idx)
+        self.update_fig()
+        if self.fig_prefetch is not None:  # 切换图片后不再预先绘制上一张图片的前后图片
+            self.after_cancel(self.fig_prefetch)
+        self.fig_prefetch = self.after_idle(self.prefetch_fig, idx, [idx + 1, idx - 1])
+
+
+    def prefetch_fig(self, idx, pending):
+        """界面空闲时预先绘制一张图片，其余图片排到下一次空闲，图片显示后界面不必等待前后图片绘制完成
+
+        Args:
+            idx (int): 发起预先绘制时显示的图片序号
+            pending (list): 待预先绘制的图片序号
+        """
+        self.fig_prefetch = None
+        if idx != self.fig_idx:  # 已切换图片或清除了图片
+            return
+        while len(pending) > 0:
+            i = pending.pop(0)
+            if 0 <= i < len(self.fig_specs) and i not in self.figs:
+                self.get_fig(i)
+                break
+        if len(pending) > 0:
+            self.fig_prefetch = self.after_idle(self.prefetch_fig, idx, pending)
+
+
     def update_fig(self):
         """更新图片显示框的图片
         """
@@ -234,9 +303,9 @@ class Static2D(tk.Frame):
         self.fig_canvas.get_tk_widget().pack(side='bottom')  # 调整图片显示位置
         self.toolbar = NavigationToolbar2Tk(self.fig_canvas, self.fig_frame)  # 创建图片工具栏
         self.toolbar.update()
-        self.fig_title_current.set(self.fig_title[self.figs.index(self.current_fig)])  # 显示当前图片的标题
+        self.fig_title_current.set(self.fig_title[self.fig_idx])  # 显示当前图片的标题
         # 如果当前图片是等值线图，显示图片调整组件
-        if self.figs_type[self.figs.index(self.current_fig)] == 'contour':
+        if self.figs_type[self.fig_idx] == 'contour':
             if not self.fig_change_frame.winfo_ismapped():
                 self.fig_change_frame.place(x=0.578 * self.width, y=0.66 * self.height)
         else:  # 隐藏图片调整组件
@@ -247,13 +316,12 @@ class Static2D(tk.Frame):
     def next_fig(self):
         """下一张图片
         """
-        if len(self.figs) == 0:
+        if len(self.fig_specs) == 0:
             self.write_log_to_Text('图窗中没有图片')
         else:
-            idx = np.min([self.figs.index(self.current_fig) + 1, len(self.figs) - 1])  # 获取当前图片下一张图片的索引
-            self.current_fig = self.figs[idx]  # 将当前图片设置为下一张图片
-            self.update_fig()  # 更新图片显示框的图片
-            if idx == len(self.figs) - 1:  # 判断是否到达最后一张图片
+            idx = min(self.fig_idx + 1, len(self.fig_specs) - 1)  # 获取当前图片下一张图片的索引
+            self.show_fig(idx)  # 显示下一张图片，没有绘制的图片此时才绘制
+            if idx == len(self.fig_specs) - 1:  # 判断是否到达最后一张图片
                 self.write_log_to_Text('已到最后一张图片')
             else:
                 self.write_log_to_Text('下一张图片')
@@ -262,12 +330,11 @@ class Static2D(tk.Frame):
     def previous_fig(self):
         """上一张图片
         """
-        if len(self.figs) == 0:
+        if len(self.fig_specs) == 0:
             self.write_log_to_Text('图窗中没有图片')
         else:
-            idx = np.max([self.figs.index(self.current_fig) - 1, 0])  # 获取当前图片上一张图片的索引
-            self.current_fig = self.figs[idx]  # 将当前图片设置为上一张图片
-            self.update_fig()  # 更新图片显示框的图片
+            idx = max(self.fig_idx - 1, 0)  # 获取当前图片上一张图片的索引
+            self.show_fig(idx)  # 显示上一张图片，没有绘制的图片此时才绘制
             if idx == 0:  # 判断是否到达第一张图片
                 self.write_log_to_Text('已到第一张图片')
             else:
@@ -278,7 +345,7 @@ class Static2D(tk.Frame):
         """重新绘制当前的图片
         """
         boundary = get_boundary(self.bound, self.nodes)  # 获取用于绘图的边界
-        idx = self.figs.index(self.current_fig)  # 获取当前图片的索引
+        idx = self.fig_idx  # 获取当前图片的索引
         fig_data = self.figs_data[idx]  # 获取当前图片的数据
         num_float = 1  # 等值线数值小数点位数默认值
         dele_height = 0  # 删除数据区域高度的默认值
@@ -306,21 +373,17 @@ class Static2D(tk.Frame):
                 num_line = np.arange(contour_min, contour_max, contour_step)
             else:
                 num_line = np.arange(contour_min, contour_max, contour_step)
-        # 重新绘制图片
-        fig = plt.figure(figsize=(6.1, 4.4))
-        if dele_height > 0:
-            X, Y, ZS, hd = getContour(fig_data[0], fig_data[1], fig_data[2], boundary, dpi=100, Extrapolation=1, num_float=num_float, baseP=dele_height, numline=num_line, max_min=max_min)
-        else:
-            X, Y, ZS, hd = getContour(fig_data[0], fig_data[1], fig_data[2], boundary, dpi=100, Extrapolation=0, num_float=num_float, baseP=dele_height, numline=num_line, max_min=max_min)
-        plt.tight_layout()
-        self.figs[idx] = fig
-        self.current_fig = self.figs[idx]
-        self.update_fig()
+        # 重新绘制图片，绘图描述一并更新，图片移出缓存后按新的参数重绘
+        extrapolation = 1 if dele_height > 0 else 0
+        method = self.fig_specs[idx][2].get('method', 'cubic')  # 沿用原图的等值线绘制方式，'tri'模式沿用网格单元三角形
+        self.fig_specs[idx] = fig_spec(contour_fig, fig_data[0], fig_data[1], fig_data[2], [boundary], method=method, triangles=fig_data[3], dpi=100, Extrapolation=extrapolation, num_float=num_float, baseP=dele_height, numline=num_line, max_min=max_min, extra=fig_data)
+        self.figs.pop(idx, None)
+        self.show_fig(idx)
         self.write_log_to_Text('重绘成功')
 
 
     def save_all_figs(self):
-        """保存图片显示框里的所有图片
+        """保存图片显示框中的所有图片，缓存中的图片直接保存，其余图片在界面空闲时逐张绘制并导出
         """
         if self.odb_path.get() == '':  # 检查是否选了odb文件
             self.write_log_to_Text('没有选择结果文件，请读取结果文件')
@@ -329,9 +392,32 @@ class Static2D(tk.Frame):
             fig_dir = os.path.join(odb_dir, 'figures')
             if not os.path.exists(fig_dir):  # 如果文件夹中没有figures文件夹，则创建
                 os.makedirs(fig_dir)
-            for idx, fig in enumerate(self.figs):
-                fig.savefig(os.path.join(fig_dir, '静力%s.svg' % self.fig_title[idx]), bbox_inches='tight')
-        self.write_log_to_Text('所有图片导出成功，共导出了%d张图片' % len(self.figs))
+            pending = []
+            for idx, spec in enumerate(self.fig_specs):
+                fpath = os.path.join(fig_dir, '静力%s.svg' % self.fig_title[idx])
+                if idx in self.figs:
+                    self.figs[idx].savefig(fpath, bbox_inches='tight')
+                else:
+                    pending.append((fpath, spec))
+            if len(pending) == 0:
+                self.write_log_to_Text('所有图片导出成功，共导出了%d张图片' % len(self.fig_specs))
+            else:
+                self.write_log_to_Text('已导出%d张图片，其余%d张图片在界面空闲时逐张绘制并导出' % (len(self.fig_specs) - len(pending), len(pending)))
+                self.after_idle(self.save_next_fig, pending)
+
+
+    def save_next_fig(self, pending):
+        """界面空闲时绘制并导出一张不在缓存中的图片，其余图片排到下一次空闲，两张图片之间界面可以响应
+
+        Args:
+            pending (list): 待导出图片的文件路径和绘图描述
+        """
+        fpath, spec = pending.pop(0)
+        render_fig(spec)[0].savefig(fpath, bbox_inches='tight')  # 临时绘制，不加入缓存
+        if len(pending) > 0:
+            self.after_idle(self.save_next_fig, pending)
+        else:
+            self.write_log_to_Text('所有图片导出成功，图片保存在%s' % os.path.dirname(fpath))
 
 
     def set_page(self):        
@@ -384,6 +470,12 @@ class Static2D(tk.Frame):
         # 绘图按钮
         plot_fig = tk.Button(self, text='绘制', font=('黑体', 18), width=5, height=2, bg='lightblue', command=self.plot_figs)
         plot_fig.place(x=0.471 * w, y=0.3 * h)
+        ## 等值线绘制方式，'网格'表示不插值到网格，直接在网格单元上绘制
+        contour_method_label = tk.Label(self, text='等值线', font=('黑体', font_size3))
+        contour_method_label.place(x=0.471 * w, y=0.4 * h)
+        self.contour_method_ddl = ttk.Combobox(self, values=['插值', '网格'], width=5, state='readonly')
+        self.contour_method_ddl.current(0)
+        self.contour_method_ddl.place(x=0.471 * w, y=0.43 * h)
 
         # 分割线
         canvas = tk.Canvas(self, bg='white', highlightthickness=0, width=0.38 * w, height=5)
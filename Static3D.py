@@ -3,6 +3,7 @@ import tkinter.filedialog
 from tkinter import ttk
 from Combopicker import Combopicker
 import os
+import functools
 from functions import *
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 import warnings
@@ -27,16 +28,30 @@ class Static3D(tk.Frame):
         self.areas = []  # 初始化面积文件列表
         self.holes = []  # 初始化孔洞列表
         self.concens = []  # 初始化应力集中点列表
+        self.geo = None  # 初始化几何信息索引
         self.nodes = None  # 初始化结点坐标
         self.copen_data = []  # 初始化横缝开度数据，从.dat文件中读取
         self.copen_id = []  # 初始化横缝开度数据标签，从.dat文件中读取，与copen_data对应
         self.K_value = tk.StringVar()  # 初始化抗滑稳定安全系数K
-        self.figs = []  # 初始化图片列表
+        self.figs = OrderedDict()  # 初始化已绘制图片的缓存，键为图片序号
+        self.fig_specs = []  # 初始化图片绘图描述列表
         self.figs_type = []  # 初始化图片类型列表
         self.figs_data = []  # 初始化图片数据
         self.current_fig = None  # 初始化当前显示的图片
+        self.fig_idx = None  # 初始化当前显示的图片序号
+        self.fig_rendering = {}  # 初始化正在绘制的图片，值为绘图任务
         self.fig_title = []  # 初始化图片标题列表
         self.fig_title_current = tk.StringVar(value='图片显示')  # 初始化当前图片标题
+        self.fig_pool = None  # 初始化绘图进程池
+        self.fig_pool_nodes = None  # 初始化绘图进程池中的结点坐标
+        self.fig_pool_cache_dir = None  # 初始化绘图进程池中的插值掩膜缓存文件夹
+        self.fig_jobs = {}  # 初始化未完成的绘图任务，值为处理任务结果的函数
+        self.fig_poll = None  # 初始化检查绘图任务的定时器
+        self.fig_total, self.fig_done = 0, 0  # 初始化绘图任务总数和已完成数
+        self.fig_shown = False  # 本次绘制的图片是否已经显示
+        self.fig_batch = False  # 是否还需要输出本次绘制的图片数量
+        self.fig_progress_text = tk.StringVar(value='')  # 初始化绘图进度文字
+        self.fig_save_left = 0  # 初始化后台导出中尚未完成的图片数
         self.set_page()  # 页面设置
 
 
@@ -77,15 +92,21 @@ class Static3D(tk.Frame):
             self.Nset, self.Elset, self.Surface = [], [], []
             self.nodes = None
         else:
-            self.nodes = read_nodes(self.mesh_path.get(), dims=3)  # 读取所有结点坐标
-            self.Nset, self.Elset, self.Surface = read_mesh(self.mesh_path.get())  # 读取所有集合
-            self.coord_all = read_coordinate(self.mesh_path.get())  # 读取所有局部坐标系
+            mesh = read_inp(self.mesh_path.get(), dims=3)  # 一次读取网格文件中的结点、集合和局部坐标系
+            self.nodes = mesh['nodes']  # 所有结点坐标
+            build_node_index(self.nodes)  # 建立结点编号索引
+            self.Nset = list(mesh['nset'])  # 所有结点集
+            self.Elset = [name for name in mesh['elset'] if name[0] != '_']  # 所有单元集，去除定义表面时的一些单元集
+            self.Surface = list(mesh['surface'])  # 所有表面集
+            self.coord_all = mesh['orientation']  # 所有局部坐标系
             self.write_log_to_Text('网格文件中共定义了%d个结点，%d个结点集，%d个单元集，%d个面，%d个局部坐标系' % (self.nodes.shape[0], len(self.Nset), len(self.Elset), len(self.Surface), len(self.coord_all)))
         if self.geo_path.get() == '':  # 判断是否输入了几何信息文件夹
             self.write_log_to_Text('请选择几何信息文件夹')
         else:
-            self.bounds, self.areas, self.holes, self.concens = find_geo_file(self.geo_path.get())  # 读取几何信息文件，包括边界文件、面积文件、孔洞文件、应力集中点文件
+            self.geo = scan_geo_folder(self.geo_path.get(), sections=list(self.coord_all))  # 扫描一次几何信息文件夹，建立剖面到几何信息文件的索引
+            self.bounds, self.areas, self.holes, self.concens = self.geo['bound'], self.geo['area'], self.geo['holes'], self.geo['delete']
             self.write_log_to_Text('共读取了%d个边界文件，%d个面积文件，%d个孔洞文件，%d个应力集中区域文件' % (len(self.bounds), len(self.areas), len(self.holes), len(self.concens)))
+            set_grid_cache_dir(os.path.join(self.geo_path.get(), 'cache'))  # 插值掩膜缓存在几何信息文件夹中，几何不变时不需要重复计算
 
         # 更新下拉选择框
         self.renew_combobox()
@@ -108,18 +129,15 @@ class Static3D(tk.Frame):
                         coord1 = self.coord_all[key]  # 获取滑面1的局部坐标系
                     if plane2[3:] in key:
                         coord2 = self.coord_all[key]  # 获取滑面2的局部坐标系
-                for name in self.areas:
-                    if plane1[3:] in name:
-                        area1 = os.path.join(self.geo_path.get(), name) # 获取滑面1的面积文件
-                    if plane2[3:] in name:
-                        area2 = os.path.join(self.geo_path.get(), name)  # 获取滑面2的面积文件
+                area1 = get_geo_file(self.geo, 'area', plane1[3:])  # 获取滑面1的面积文件
+                area2 = get_geo_file(self.geo, 'area', plane2[3:])  # 获取滑面2的面积文件
                 f1, c1 = float(self.f1_entry.get()), float(self.c1_entry.get())  # 获取滑面1的f,c值
                 f2, c2 = float(self.f2_entry.get()), float(self.c2_entry.get())  # 获取滑面2的f,c值
                 _, _, vec_n1 = get_vec_xyz(coord1, self.nodes)  # 获取滑面1的法向量
                 _, _, vec_n2 = get_vec_xyz(coord2, self.nodes)  # 获取滑面2的法向量
                 vec_t = np.cross(vec_n1, vec_n2)  # 获取滑动向量，与两个法向量垂直
-                area_data1 = np.loadtxt(area1, skiprows=19, encoding='gbk')  # 求滑面1的结点面积数据
-                area_data2 = np.loadtxt(area2, skiprows=19, encoding='gbk')  # 求滑面2的结点面积数据
+                area_data1 = load_geo_file(area1, skiprows=19, encoding='gbk')  # 求滑面1的结点面积数据
+                area_data2 = load_geo_file(area2, skiprows=19, encoding='gbk')  # 求滑面2的结点面积数据
                 # 求抗滑稳定安全系数
                 KK = kanghua3D_2P_static(stre_data1, stre_data2, area_data1, area_data2, vec_n1, vec_n2, vec_t, f=[f1, f2], c=[c1, c2])
                 self.K_value.set('%.3f' % KK)
@@ -140,14 +158,20 @@ class Static3D(tk.Frame):
         self.areas = []  # 初始化所有结点面积列表
         self.holes = []  # 初始化孔洞列表
         self.concens = []  # 初始化应力集中点列表
+        self.geo = None  # 初始化几何信息索引
+        set_grid_cache_dir(None)  # 不再使用原几何信息文件夹中的插值掩膜缓存
+        self.close_fig_pool()  # 结束绘图子进程
         self.csv_flist = []  # 初始化所有结果文件列表
         self.renew_combobox()  # 更新下拉选择框
         self.write_log_to_Text('清除文件成功！')
         # 清除图片显示框
-        self.figs = []  # 初始化图片列表
+        self.figs = OrderedDict()  # 初始化已绘制图片的缓存，键为图片序号
+        self.fig_specs = []  # 初始化图片绘图描述列表
         self.figs_type = []  # 初始化图片类型列表
         self.figs_data = []  # 初始化图片数据
         self.current_fig = None  # 初始化当前显示的图片
+        self.fig_idx = None  # 初始化当前显示的图片序号
+        self.fig_rendering = {}  # 初始化正在绘制的图片，值为绘图任务
         self.fig_title = []  # 初始化图片标题列表
         self.fig_title_current.set('图片显示')  # 初始化当前图片标题
         for widget in self.fig_frame.winfo_children():
@@ -246,8 +270,12 @@ class Static3D(tk.Frame):
     
 
     def plot_figs(self):
-        """绘制所有图片
+        """生成所有图片的绘图描述，图片在切换到该图时才作为独立任务提交到绘图进程池
         """
+        self.fig_batch = True
+        if len(self.fig_jobs) == 0:  # 上一次绘制已经完成，重新计数
+            self.fig_total, self.fig_done = 0, 0
+        self.fig_shown = False
         if self.odb_path.get() == '':  # 检查是否选了odb文件
             self.write_log_to_Text('没有选择结果文件，请读取结果文件')
         else:
@@ -274,23 +302,14 @@ class Static3D(tk.Frame):
                                 else:  # 其他剖面的局部坐标系
                                     coordinate_nodes = self.coord_all[sec]
                                 # 获取剖面的边界文件
-                                bounds = []
-                                for key in self.bounds:
-                                    if sec in key:
-                                        bounds.append(os.path.join(self.geo_path.get(), key))
+                                bounds = get_geo_files(self.geo, 'bound', sec)
                                 # 获取剖面的孔洞文件，没有则为None
-                                holes = None
-                                for key in self.holes:
-                                    if sec in key:
-                                        holes = os.path.join(self.geo_path.get(), key)
+                                holes = get_geo_file(self.geo, 'holes', sec)
                                 for direc in disp_direc:
                                     if direc != '全选':
                                         if len(bounds) > 0:  # 绘图
-                                            fig, xx, yy, zz, bds, hls, ccs = sta_disp_contour(fname, coordinate_nodes, bounds, self.nodes, direc, holes)
-                                            self.figs.append(fig)
-                                            self.figs_data.append([xx, yy, zz, bds, hls, ccs, coordinate_nodes])
-                                            self.figs_type.append('contour')
-                                            self.fig_title.append('%s剖面%s向位移等值线图(cm)' % (sec, direc))
+                                            title = '%s剖面%s向位移等值线图(cm)' % (sec, direc)
+                                            self.add_fig_spec('contour', title, fig_spec(sta_disp_contour, fname, coordinate_nodes, bounds, FIG_NODES, direc, holes, extra=[coordinate_nodes]))
                                         else:
                                             self.write_log_to_Text('没有找到%s剖面的边界文件')
                     
@@ -310,20 +329,11 @@ class Static3D(tk.Frame):
                                 else:  # 其他剖面的局部坐标系
                                     coordinate_nodes = self.coord_all[sec]
                                 # 获取剖面的边界文件
-                                bounds = []
-                                for key in self.bounds:
-                                    if sec in key:
-                                        bounds.append(os.path.join(self.geo_path.get(), key))
+                                bounds = get_geo_files(self.geo, 'bound', sec)
                                 # 获取剖面的孔洞文件，没有则为None
-                                holes = None
-                                for key in self.holes:
-                                    if sec in key:
-                                        holes = os.path.join(self.geo_path.get(), key)
+                                holes = get_geo_file(self.geo, 'holes', sec)
                                 # 获取剖面的应力集中区域文件，没有则为None
-                                concen = None
-                                for key in self.concens:
-                                    if sec in key:
-                                        concen = os.path.join(self.geo_path.get(), key)
+                                concen = get_geo_file(self.geo, 'delete', sec)
                                 for comp in stre_comp:
                                     if comp != '全选':
                                         if comp == '大主应力':
@@ -331,11 +341,8 @@ class Static3D(tk.Frame):
                                         if comp == '小主应力':
                                             comp_label = 'Smin'
                                         if len(bounds) > 0:  # 绘图
-                                            fig, xx, yy, zz, bds, hls, ccs = sta_stre_contour(fname, coordinate_nodes, bounds, self.nodes, comp_label, holes, concen=concen, concen_dist=0.01)
-                                            self.figs.append(fig)
-                                            self.figs_data.append([xx, yy, zz, bds, hls, ccs, coordinate_nodes])
-                                            self.figs_type.append('contour')
-                                            self.fig_title.append('%s剖面%s等值线图(MPa)' % (sec, comp))
+                                            title = '%s剖面%s等值线图(MPa)' % (sec, comp)
+                                            self.add_fig_spec('contour', title, fig_spec(sta_stre_contour, fname, coordinate_nodes, bounds, FIG_NODES, comp_label, holes, concen=concen, concen_dist=0.01, extra=[coordinate_nodes]))
                                         else:
                                             self.write_log_to_Text('没有找到%s剖面的边界文件')
                     # 横缝开度等值线图的绘制
@@ -347,55 +354,207 @@ class Static3D(tk.Frame):
                                 bounds = os.path.join(self.geo_path.get(), 'bound-%s-X1.out' % sec)  # 获取横缝边界
                                 coordinate = self.coord_all[sec]  # 获取横缝局部坐标系
                                 joint = sec + '-X1'
-                                fig, xx, yy, zz, bds, hls, ccs = sta_joint_contour(joint, bounds, coordinate, self.copen_data, self.copen_id, self.nodes)
-                                self.figs.append(fig)
-                                self.figs_data.append([xx, yy, zz, bds, hls, ccs, coordinate])
-                                self.figs_type.append('contour')
-                                self.fig_title.append('%s横缝开度等值线图' % sec)
+                                title = '%s横缝开度等值线图' % sec
+                                idx = find_joint(joint, self.copen_id)
+                                if idx is None:
+                                    self.write_log_to_Text('没有找到%s横缝的开度数据' % sec)
+                                    continue
+                                # 只把所绘横缝的开度数据放进绘图描述，每个绘图任务不必传递全部横缝的数据
+                                self.add_fig_spec('contour', title, fig_spec(sta_joint_contour, joint, bounds, coordinate, [self.copen_data[idx]], [self.copen_id[idx]], FIG_NODES, extra=[coordinate]))
                   
                     # 损伤因子分布图的绘制
                     dmgt_sec = self.dmgt_section_ddl.current_value  # 获取剖面
                     if dmgt_sec != '':
                         dmgt_sec = dmgt_sec.split(',')
+                        flist = os.listdir(odb_dir)
                         for sec in dmgt_sec:
                             if sec != '全选':
-                                flist = os.listdir(odb_dir)
-                                for f in flist:
-                                    if 'dmgt' in f and sec in f and f.endswith('.csv'):
-                                        fname = os.path.join(odb_dir, f)
-                                        frame = f.split('_')[-1].replace('.csv', '')
-                                        if 'downstream' in sec:  # 下游面的局部坐标系
-                                            coordinate_nodes = np.array([[-1, 0, 0], [0, 0, 1], [0, 0, 0]])
-                                        elif 'upstream' in sec:  # 上游面的局部坐标系
-                                            coordinate_nodes = np.array([[1, 0, 0], [0, 0, 1], [0, 0, 0]])
-                                        else:  # 其他剖面的局部坐标系
-                                            coordinate_nodes = self.coord_all[sec]
-                                        # 获取剖面边界文件
-                                        bounds = []
-                                        for key in self.bounds:
-                                            if sec in key:
-                                                bounds.append(os.path.join(self.geo_path.get(), key))
-                                        # 获取剖面孔洞文件，没有则为None
-                                        holes = None
-                                        for key in self.holes:
-                                            if sec in key:
-                                                holes = os.path.join(self.geo_path.get(), key)
-                                        if len(bounds) > 0:  # 绘图
-                                            if 'upstream' in sec or 'downstream' in sec:
-                                                fig, xx, yy, zz = dmgt_contour(fname, coordinate_nodes, bounds, self.nodes, holes=holes, cbar_ratio=0.5)
-                                            else:
-                                                fig, xx, yy, zz = dmgt_contour(fname, coordinate_nodes, bounds, self.nodes, holes=holes)
-                                            self.figs.append(fig)
-                                            self.figs_data.append([xx, yy, zz])
-                                            self.figs_type.append('contourf')
-                                            self.fig_title.append('%s剖面第%s帧损伤因子分布图图' % (sec, frame))
-                                        else:
-                                            self.write_log_to_Text('没有找到%s剖面的边界文件')
-        # 默认显示第一张图片
-        if len(self.figs) > 0:
-            self.current_fig = self.figs[0]
+                                dmgt_files = [f for f in flist if 'dmgt' in f and sec in f and f.endswith('.csv')]
+                                if len(dmgt_files) == 0:
+                                    continue
+                                if 'downstream' in sec:  # 下游面的局部坐标系
+                                    coordinate_nodes = np.array([[-1, 0, 0], [0, 0, 1], [0, 0, 0]])
+                                elif 'upstream' in sec:  # 上游面的局部坐标系
+                                    coordinate_nodes = np.array([[1, 0, 0], [0, 0, 1], [0, 0, 0]])
+                                else:  # 其他剖面的局部坐标系
+                                    coordinate_nodes = self.coord_all[sec]
+                                # 获取剖面边界文件
+                                bounds = get_geo_files(self.geo, 'bound', sec)
+                                # 获取剖面孔洞文件，没有则为None
+                                holes = get_geo_file(self.geo, 'holes', sec)
+                                if len(bounds) > 0:  # 各帧在一个任务中用同一个插值算子插值，完成后再加入各帧的图片
+                                    fnames = [os.path.join(odb_dir, f) for f in dmgt_files]
+                                    frames = [f.split('_')[-1].replace('.csv', '') for f in dmgt_files]
+                                    self.submit_fig_job(functools.partial(self.add_dmgt_figs, sec, frames), dmgt_fields, fnames, coordinate_nodes, bounds, FIG_NODES, holes)
+                                else:
+                                    self.write_log_to_Text('没有找到%s剖面的边界文件')
+
+
+    def add_dmgt_figs(self, sec, frames, result):
+        """同一剖面各帧损伤因子插值完成后，把各帧的损伤因子分布图加入图片列表，切换到图片时只需绘图
+
+        Args:
+            sec (string): 剖面名称
+            frames (list): 各帧的帧号
+            result (tuple): dmgt_fields的返回值，即各帧插值后的网格数据、边界和孔洞
+        """
+        fields, boundarys, holes = result
+        cbar_ratio = 0.5 if 'upstream' in sec or 'downstream' in sec else 1.0  # 上下游面的色标缩短一半
+        for frame, (xx, yy, damage, grids) in zip(frames, fields):
+            title = '%s剖面第%s帧损伤因子分布图图' % (sec, frame)
+            self.add_fig_spec('contourf', title, fig_spec(dmgt_grid_contour, xx, yy, damage, grids, boundarys, holes, cbar_ratio=cbar_ratio))
+
+
+    def submit_fig_job(self, handler, func, *args, **kwargs):
+        """把一个绘图任务提交到绘图进程池，界面不等待任务完成
+
+        Args:
+            handler (function): 任务完成后在界面线程中处理返回值的函数
+            func (function): 绘图或数据处理函数，须为模块级函数
+            *args: 位置参数，结点坐标数组用FIG_NODES占位，每个子进程只传一次
+            **kwargs: 关键字参数
+
+        Returns:
+            job (multiprocessing.pool.AsyncResult): 绘图任务
+        """
+        cache_dir = get_grid_cache_dir()
+        if self.fig_pool is None or self.fig_pool_nodes is not self.nodes or self.fig_pool_cache_dir != cache_dir:  # 结点坐标或几何信息文件夹变化后重新创建进程池
+            self.close_fig_pool()
+            self.fig_pool = get_fig_pool(self.nodes, cache_dir)
+            self.fig_pool_nodes = self.nodes
+            self.fig_pool_cache_dir = cache_dir
+        job = self.fig_pool.apply_async(run_fig_job, (func, args, kwargs))
+        self.fig_jobs[job] = handler
+        self.fig_total += 1
+        if self.fig_poll is None:
+            self.fig_poll = self.after(FIG_POLL_INTERVAL, self.poll_fig_jobs)
+        return job
+
+
+    def add_fig_spec(self, fig_type, title, spec, fig=None, fig_data=None):
+        """把图片的绘图描述加入图片列表，图片在切换到该图时才提交绘图任务，本次绘制的第一张图片立即显示
+
+        Args:
+            fig_type (string): 图片类型，'contour'、'contourf'或'history'
+            title (string): 图片标题
+            spec (tuple): 绘图描述，见fig_spec，结点坐标数组用FIG_NODES占位
+            fig (plt.figure, optional): 已绘制的图片，默认为None
+            fig_data (list, optional): 已绘制图片的重绘数据，默认为None
+        """
+        self.fig_specs.append(spec)
+        self.figs_data.append(fig_data)
+        self.figs_type.append(fig_type)
+        self.fig_title.append(title)
+        idx = len(self.fig_specs) - 1
+        if fig is not None:
+            plt.close(fig)
+            cache_fig(self.figs, idx, fig, self.fig_idx)
+        if not self.fig_shown or self.fig_idx is None:
+            self.fig_shown = True
+            self.show_fig(idx)
+        elif idx == self.fig_idx + 1:  # 紧接当前图片的图片预先绘制
+            self.request_fig(idx)
+
+
+    def show_fig(self, idx):
+        """显示图片，没有绘制的图片提交绘图任务，并预先绘制前后两张图片
+
+        Args:
+            idx (int): 图片序号
+        """
+        self.fig_idx = idx
+        for i in (idx, idx + 1, idx - 1):
+            if 0 <= i < len(self.fig_specs):
+                self.request_fig(i)
+        if idx in self.figs:
+            self.figs.move_to_end(idx)
+            self.current_fig = self.figs[idx]
             self.update_fig()
-            self.write_log_to_Text('绘图完成，共绘制了%d张图片' % len(self.figs))
+        else:  # 绘制完成后在set_fig中显示
+            for widget in self.fig_frame.winfo_children():
+                widget.destroy()
+            self.fig_title_current.set('%s（绘制中）' % self.fig_title[idx])
+
+
+    def request_fig(self, idx):
+        """提交一张图片的绘图任务，已在缓存中或正在绘制的图片不重复提交
+
+        Args:
+            idx (int): 图片序号
+        """
+        if idx in self.figs or self.fig_rendering.get(idx) in self.fig_jobs:
+            return
+        spec = self.fig_specs[idx]
+        func, args, kwargs, _ = spec
+        self.fig_rendering[idx] = self.submit_fig_job(functools.partial(self.set_fig, idx, spec), func, *args, **kwargs)
+
+
+    def set_fig(self, idx, spec, result):
+        """绘图任务完成后把图片加入图片缓存，如果是当前图片则立即显示
+
+        Args:
+            idx (int): 图片序号
+            spec (tuple): 提交任务时的绘图描述
+            result (tuple): 绘图函数的返回值
+        """
+        if idx >= len(self.fig_specs) or self.fig_specs[idx] is not spec:  # 图片列表已清除或图片已重绘
+            return
+        fig, self.figs_data[idx] = split_fig_result(result, spec[3])
+        cache_fig(self.figs, idx, fig, self.fig_idx)
+        if idx == self.fig_idx:
+            self.current_fig = fig
+            self.update_fig()
+
+
+    def poll_fig_jobs(self):
+        """定时检查绘图任务，完成的图片加入图片缓存，并更新进度条
+        """
+        self.fig_poll = None
+        for job in [job for job in self.fig_jobs if job.ready()]:
+            handler = self.fig_jobs.pop(job)
+            self.fig_done += 1
+            try:
+                handler(job.get())
+            except Exception as e:
+                self.write_log_to_Text('绘图任务失败：%s' % e)
+        self.fig_progress['maximum'] = max(self.fig_total, 1)
+        self.fig_progress['value'] = self.fig_done
+        self.fig_progress_text.set('%d/%d' % (self.fig_done, self.fig_total))
+        if len(self.fig_jobs) > 0:
+            if self.fig_poll is None:
+                self.fig_poll = self.after(FIG_POLL_INTERVAL, self.poll_fig_jobs)
+        elif self.fig_batch:
+            self.fig_batch = False
+            self.write_log_to_Text('图片列表共%d张图片，切换到图片时绘制' % len(self.fig_specs))
+
+
+    def cancel_figs(self):
+        """取消尚未完成的绘图任务，已经完成的图片保留
+        """
+        if len(self.fig_jobs) == 0:
+            self.write_log_to_Text('没有正在进行的绘图任务')
+        else:
+            num_jobs = len(self.fig_jobs)
+            self.close_fig_pool()
+            self.write_log_to_Text('已取消%d个绘图任务' % num_jobs)
+
+
+    def close_fig_pool(self):
+        """结束绘图进程池中的所有子进程，未完成的绘图任务全部丢弃
+        """
+        if self.fig_poll is not None:
+            self.after_cancel(self.fig_poll)
+            self.fig_poll = None
+        if self.fig_pool is not None:
+            self.fig_pool.terminate()
+            self.fig_pool = None
+            self.fig_pool_nodes = None
+            self.fig_pool_cache_dir = None
+        self.fig_jobs = {}
+        self.fig_total, self.fig_done = 0, 0
+        self.fig_save_left = 0
+        self.fig_progress['value'] = 0
+        self.fig_progress_text.set('')
 
     
     def update_fig(self):
@@ -409,8 +568,8 @@ class Static3D(tk.Frame):
         self.fig_canvas.get_tk_widget().pack(side='bottom')  # 调整图片显示位置
         self.toolbar = NavigationToolbar2Tk(self.fig_canvas, self.fig_frame)  # 创建图片工具栏
         self.toolbar.update()
-        self.fig_title_current.set(self.fig_title[self.figs.index(self.current_fig)])
-        if self.figs_type[self.figs.index(self.current_fig)] == 'contour':
+        self.fig_title_current.set(self.fig_title[self.fig_idx])
+        if self.figs_type[self.fig_idx] == 'contour':
             if not self.fig_change_frame.winfo_ismapped():
                 self.fig_change_frame.place(x=0.564 * self.width, y=0.66 * self.height)
         else:
@@ -421,13 +580,12 @@ class Static3D(tk.Frame):
     def next_fig(self):
         """下一张图片
         """
-        if len(self.figs) == 0:
+        if len(self.fig_specs) == 0:
             self.write_log_to_Text('图窗中没有图片')
         else:
-            idx = np.min([self.figs.index(self.current_fig) + 1, len(self.figs) - 1])  # 获取当前图片下一张图片的索引
-            self.current_fig = self.figs[idx]  # 将当前图片设置为下一张图片
-            self.update_fig()  # 更新图片显示框的图片
-            if idx == len(self.figs) - 1:  # 判断是否到达最后一张图片
+            idx = min(self.fig_idx + 1, len(self.fig_specs) - 1)  # 获取当前图片下一张图片的索引
+            self.show_fig(idx)  # 显示下一张图片，没有绘制的图片此时才绘制
+            if idx == len(self.fig_specs) - 1:  # 判断是否到达最后一张图片
                 self.write_log_to_Text('已到最后一张图片')
             else:
                 self.write_log_to_Text('下一张图片')
@@ -436,12 +594,11 @@ class Static3D(tk.Frame):
     def previous_fig(self):
         """上一张图片
         """
-        if len(self.figs) == 0:
+        if len(self.fig_specs) == 0:
             self.write_log_to_Text('图窗中没有图片')
         else:
-            idx = np.max([self.figs.index(self.current_fig) - 1, 0])  # 获取当前图片上一张图片的索引
-            self.current_fig = self.figs[idx]  # 将当前图片设置为上一张图片
-            self.update_fig()  # 更新图片显示框的图片
+            idx = max(self.fig_idx - 1, 0)  # 获取当前图片上一张图片的索引
+            self.show_fig(idx)  # 显示上一张图片，没有绘制的图片此时才绘制
             if idx == 0:  # 判断是否到达第一张图片
                 self.write_log_to_Text('已到第一张图片')
             else:
@@ -451,7 +608,10 @@ class Static3D(tk.Frame):
     def replot(self):
         """重新绘制当前的图片
         """
-        idx = self.figs.index(self.current_fig)  # 获取当前图片的索引
+        idx = self.fig_idx  # 获取当前图片的索引
+        if idx not in self.figs:
+            self.write_log_to_Text('图片尚未绘制完成，无法重绘')
+            return
         fig_data = self.figs_data[idx]  # 获取当前图片的数据
         num_float = 1  # 等值线数值小数点位数默认值
         dele_height = 0  # 删除数据区域高度的默认值
@@ -485,34 +645,23 @@ class Static3D(tk.Frame):
         xx, yy, zz = fig_data[0], fig_data[1], fig_data[2]
         # 如果应力集中区域不为None
         if fig_data[5] is not None:  
-            concen_nodes = np.loadtxt(fig_data[5])
-            concen_coord = change_coord(fig_data[6], concen_nodes, self.nodes)
-            xx_dele, yy_dele, zz_dele = [], [], []
-            for i in range(len(xx)):
-                dist = np.sqrt((concen_coord[:, 0] - xx[i]) ** 2 + (concen_coord[:, 1] - yy[i]) ** 2)
-                if np.min(dist) > con_dist:
-                    xx_dele.append(xx[i])
-                    yy_dele.append(yy[i])
-                    zz_dele.append(zz[i])
-            xx = np.array(xx_dele)
-            yy = np.array(yy_dele)
-            zz = np.array(zz_dele)
-        # 重新绘制图片
-        fig = plt.figure(figsize=(6.1, 4.4))
-        for boundary in fig_data[3]:
-            if dele_height > 0 and con_dist > 0:  # 如果存在去除部分结点数据的情况，则采用外插
-                _, _, _, _ = getContour(xx, yy, zz, boundary, holes=fig_data[4], dpi=100, Extrapolation=1, num_float=num_float, baseP=dele_height, numline=num_line, max_min=max_min)
-            else:
-                X, Y, ZS, hd = getContour(xx, yy, zz, boundary, holes=fig_data[4], dpi=100, Extrapolation=0, num_float=num_float, baseP=dele_height, numline=num_line, max_min=max_min)
-        plt.tight_layout()
-        self.figs[idx] = fig
-        self.current_fig = self.figs[idx]
-        self.update_fig()
-        self.write_log_to_Text('重绘成功')
+            mask = get_concen_mask(np.column_stack([xx, yy]), fig_data[5], fig_data[6], self.nodes, con_dist)  # 到集中点的距离已缓存，只需重新比较
+            xx = np.asarray(xx)[mask]
+            yy = np.asarray(yy)[mask]
+            zz = np.asarray(zz)[mask]
+        # 重新绘制图片，绘图描述一并更新，图片移出缓存后按新的参数重绘
+        extrapolation = 1 if dele_height > 0 and con_dist > 0 else 0  # 如果存在去除部分结点数据的情况，则采用外插
+        method = self.fig_specs[idx][2].get('method', 'cubic')  # 沿用原图的插值方法
+        spec = fig_spec(contour_fig, xx, yy, zz, fig_data[3], holes=fig_data[4], method=method, dpi=100, Extrapolation=extrapolation, num_float=num_float, baseP=dele_height, numline=num_line, max_min=max_min, extra=fig_data)
+        self.fig_specs[idx] = spec
+        self.figs.pop(idx, None)
+        self.fig_rendering.pop(idx, None)  # 原来的绘图任务完成后在set_fig中丢弃
+        self.show_fig(idx)  # 在绘图进程池中重绘，完成后在set_fig中显示
+        self.write_log_to_Text('已提交重绘任务')
 
 
     def save_all_figs(self):
-        """保存图框中的所有图片
+        """保存图框中的所有图片，缓存中的图片直接保存，其余图片提交到绘图进程池绘制并保存，界面不等待
         """
         if self.odb_path.get() == '':  # 检查是否选了odb文件
             self.write_log_to_Text('没有选择结果文件，请读取结果文件')
@@ -521,9 +670,31 @@ class Static3D(tk.Frame):
             fig_dir = os.path.join(odb_dir, 'figures')
             if not os.path.exists(fig_dir):
                 os.makedirs(fig_dir)
-            for idx, fig in enumerate(self.figs):
-                fig.savefig(os.path.join(fig_dir, '静力%s.svg' % self.fig_title[idx]), bbox_inches='tight')
-        self.write_log_to_Text('所有图片导出成功，共导出了%d张图片' % len(self.figs))
+            num_jobs = 0
+            for idx, spec in enumerate(self.fig_specs):
+                fpath = os.path.join(fig_dir, '静力%s.svg' % self.fig_title[idx])
+                if idx in self.figs:
+                    self.figs[idx].savefig(fpath, bbox_inches='tight')
+                else:
+                    func, args, kwargs, _ = spec
+                    self.submit_fig_job(self.fig_saved, save_fig, fpath, func, *args, **kwargs)
+                    num_jobs += 1
+            if num_jobs == 0:
+                self.write_log_to_Text('所有图片导出成功，共导出了%d张图片' % len(self.fig_specs))
+            else:
+                self.fig_save_left += num_jobs
+                self.write_log_to_Text('已导出%d张图片，其余%d张图片在后台绘制并导出' % (len(self.fig_specs) - num_jobs, num_jobs))
+
+
+    def fig_saved(self, fpath):
+        """后台导出的一张图片保存完成，全部完成后输出日志
+
+        Args:
+            fpath (string): 图片文件路径
+        """
+        self.fig_save_left -= 1
+        if self.fig_save_left == 0:
+            self.write_log_to_Text('所有图片导出成功，图片保存在%s' % os.path.dirname(fpath))
 
 
     def set_page(self):        
@@ -576,6 +747,14 @@ class Static3D(tk.Frame):
         # 绘图按钮
         plot_fig = tk.Button(self, text='绘制', font=('黑体', 18), width=5, height=2, bg='lightblue', command=self.plot_figs)
         plot_fig.place(x=0.471 * w, y=0.3 * h)
+        ## 取消绘图按钮
+        cancel_fig = tk.Button(self, text='取消', font=('黑体', 14), width=7, height=1, command=self.cancel_figs)
+        cancel_fig.place(x=0.471 * w, y=0.4 * h)
+        ## 绘图进度条
+        self.fig_progress = ttk.Progressbar(self, orient='horizontal', length=int(0.045 * w), mode='determinate')
+        self.fig_progress.place(x=0.471 * w, y=0.45 * h)
+        fig_progress_label = tk.Label(self, textvariable=self.fig_progress_text, font=('黑体', 12))
+        fig_progress_label.place(x=0.4935 * w, y=0.47 * h, anchor='n')
 
         # 分割线
         canvas = tk.Canvas(self, bg='white', highlightthickness=0, width=0.38 * w, height=5)
@@ -1,11 +1,22 @@
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
 import scipy
-from shapely.geometry import Point
+import scipy.interpolate
+import scipy.sparse
+import scipy.spatial
 from shapely.geometry.polygon import Polygon
+try:
+    from shapely import contains_xy  # shapely 2.0及以上版本
+except ImportError:
+    from shapely.vectorized import contains as contains_xy  # shapely 1.x版本
 import time
 import os
+import hashlib
+import re
+from collections import OrderedDict
 from matplotlib import cm
+from matplotlib.tri import Triangulation
 cmp = cm.get_cmap('jet')
 cmp.set_under('w')
 import seaborn as sns
@@ -13,6 +24,25 @@ sns.set_style('ticks')
 sns.set_context('notebook')
 plt.rcParams['font.sans-serif'] = 'Arial'
 
+GRID_CACHE_SIZE = 64  # 插值网格和掩膜内存缓存的最大数量
+_grid_cache = OrderedDict()  # 插值网格和掩膜的内存缓存，按最近使用顺序排列
+_grid_cache_dir = None  # 插值掩膜的磁盘缓存文件夹，None表示不使用磁盘缓存
+INTERP_CACHE_SIZE = 16  # 插值算子内存缓存的最大数量
+_interp_cache = OrderedDict()  # 插值算子的内存缓存，按最近使用顺序排列
+NODE_INDEX_CACHE_SIZE = 4  # 结点索引内存缓存的最大数量
+_node_index_cache = OrderedDict()  # 结点编号索引的内存缓存，键为结点数组的id
+MESH_CACHE_SIZE = 2  # 网格数据内存缓存的最大数量
+_mesh_cache = OrderedDict()  # 网格数据的内存缓存，键为网格文件路径、大小和修改时间
+FORCE_CACHE_SIZE = 16  # 滑面积分作用力内存缓存的最大数量
+_force_cache = OrderedDict()  # 滑面各帧法向力、切向力和面积的内存缓存，键见get_force_key
+NEAREST_CACHE_SIZE = 64  # 最近点距离内存缓存的最大数量
+_nearest_cache = OrderedDict()  # 数据点到最近应力集中点距离的内存缓存，键为两组坐标的哈希值
+GEO_FILE_CACHE_SIZE = 256  # 几何信息文件内存缓存的最大数量
+_geo_file_cache = OrderedDict()  # 几何信息文件内容的内存缓存，键为文件路径、大小和修改时间
+GEO_KINDS = ['bound', 'area', 'holes', 'delete']  # 几何信息文件的种类：边界、结点面积、孔洞、应力集中点
+FIG_CACHE_SIZE = 8  # 图片显示框中保留的已绘制图片的最大数量，其余图片只保留绘图描述，需要时重新绘制
+FIG_NODES = '<nodes>'  # 绘图描述参数中结点坐标数组的占位符，绘图时替换为结点坐标
+
 
 def get_current_time():
     """获取当前时间
@@ -37,24 +67,10 @@ def read_mesh(fpath):
     """
     Nset, Elset, Surface = [], [], []
     if fpath.endswith('.inp'):  # 判断文件格式
-        with open(fpath, encoding='gbk') as mesh_file:
-            for line in mesh_file.readlines():
-                # 读取结点集
-                if '*NSET' in line or '*Nset' in line:
-                    line = line.split('=')[1].split(',')
-                    name = line[0].replace('\n', '').replace(' ', '')  # 去换行符和空格
-                    Nset.append(name)
-                # 读取单元集
-                if '*ELSET' in line or '*Elset' in line:
-                    line = line.split('=')[1].split(',')
-                    name = line[0].replace(' ', '').replace('\n', '')  # 去换行符和空格
-                    if name[0] != '_':  # 去除定义表面时的一些单元集
-                        Elset.append(name)
-                # 读取表面集
-                if '*SURFACE' in line or '*Surface' in line:
-                    line = line.split('=')[1].split(',')
-                    name = line[0].replace('\n', '').replace(' ', '')  # 去换行符和空格
-                    Surface.append(name)
+        mesh = read_inp(fpath)
+        Nset = list(mesh['nset'])
+        Elset = [name for name in mesh['elset'] if name[0] != '_']  # 去除定义表面时的一些单元集
+        Surface = list(mesh['surface'])
     return Nset, Elset, Surface
 
 
@@ -101,43 +117,310 @@ def read_nodes(fpath, dims):
     Returns:
         nodes (np.array(n, 3 or 4)): 结点坐标数组，第一列为结点编号，后面几列为各节点坐标
     """
-    nodes = []
-    with open(fpath) as node_file:
-        line = node_file.readline()
-        while '*NODE' not in line.upper():
-            line = node_file.readline()
-        
-        line = node_file.readline()
-        while '*' not in line:
-            line = line.replace(',', '').split()
-            if dims == 2:
-                nodes.append([int(line[0]), float(line[1]), float(line[2])])
-            elif dims == 3:
-                nodes.append([int(line[0]), float(line[1]), float(line[2]), float(line[3])])
-            line = node_file.readline()
-    nodes = np.array(nodes)
-    nodes = nodes[np.argsort(nodes[:, 0])]
+    nodes = read_inp(fpath, dims)['nodes']
+    build_node_index(nodes)  # 建立结点编号索引，后面查找结点坐标时不用再遍历所有结点
     return nodes
 
 
+def read_plane_elements(fpath):
+    """从网格文件中读取二维实体单元（CPE、CPS、CAX系列）的角结点编号，用于直接在网格单元上绘制等值线
+
+    Args:
+        fpath (string): 网格文件路径
+
+    Returns:
+        elements (list): 各单元类型的角结点编号数组，三角形单元为numpy.array(m, 3)，四边形单元为numpy.array(m, 4)，见elements_to_triangles
+    """
+    elements = []
+    for etype, data in read_inp(fpath, dims=2)['elements'].items():
+        if etype.startswith(('CPE', 'CPS', 'CAX')):
+            num_nodes = int(re.search(r'\d+', etype).group())
+            corners = 3 if num_nodes in (3, 6) else 4  # 二次单元只取角结点
+            elements.append(data[:, 1:corners + 1])
+    return elements
+
+
+def build_node_index(nodes):
+    """建立结点编号到结点数组行号的索引
+
+    结点编号比较连续时用稠密数组直接查表，否则用排序后的编号二分查找；同一个编号出现多次时取第一次出现的行.
+
+    Args:
+        nodes (np.array(n, 3 or 4)): 结点坐标数组，第一列为结点编号，后面几列为各节点坐标
+
+    Returns:
+        index (tuple): 结点编号索引，('dense', 查找表)或('sorted', 排序后的编号, 排序序号)
+    """
+    labels = nodes[:, 0].astype(np.int64)
+    rows = np.arange(labels.size)
+    if labels.size > 0 and labels.min() >= 0 and labels.max() <= 4 * labels.size + 1024:
+        lut = np.full(labels.max() + 1, -1, dtype=np.int64)
+        lut[labels[::-1]] = rows[::-1]  # 倒序赋值，重复编号保留第一次出现的行
+        index = ('dense', lut)
+    else:
+        order = np.argsort(labels, kind='stable')
+        index = ('sorted', labels[order], order)
+    _lru_set(_node_index_cache, id(nodes), (nodes, index), NODE_INDEX_CACHE_SIZE)
+    return index
+
+
+def get_node_rows(nodes, labels):
+    """根据结点编号批量获取其在结点数组中的行号
+
+    Args:
+        nodes (np.array(n, 3 or 4)): 结点坐标数组，第一列为结点编号，后面几列为各节点坐标
+        labels (int or numpy.array): 结点编号，可以是单个编号或任意形状的编号数组
+
+    Returns:
+        rows (int or numpy.array): 行号，形状与labels相同
+    """
+    cached = _lru_get(_node_index_cache, id(nodes))
+    if cached is not None and cached[0] is nodes:
+        index = cached[1]
+    else:
+        index = build_node_index(nodes)
+    labels = np.asarray(labels).astype(np.int64)
+    flat = labels.ravel()
+    if index[0] == 'dense':
+        lut = index[1]
+        valid = (flat >= 0) & (flat < lut.size)
+        rows = np.full(flat.size, -1, dtype=np.int64)
+        rows[valid] = lut[flat[valid]]
+    else:
+        sorted_labels, order = index[1], index[2]
+        pos = np.clip(np.searchsorted(sorted_labels, flat), 0, max(sorted_labels.size - 1, 0))
+        rows = np.where(sorted_labels[pos] == flat, order[pos], -1)
+    if np.any(rows < 0):
+        raise KeyError('Node %d not found' % flat[np.argmax(rows < 0)])
+    return rows.reshape(labels.shape)
+
+
+def get_node_coords(nodes, labels):
+    """根据结点编号批量获取结点坐标
+
+    Args:
+        nodes (np.array(n, 3 or 4)): 结点坐标数组，第一列为结点编号，后面几列为各节点坐标
+        labels (int or numpy.array): 结点编号，可以是单个编号或一维编号数组
+
+    Returns:
+        coords (numpy.array): 结点坐标，单个编号时为一维数组，编号数组时每一行是一个结点的坐标
+    """
+    return nodes[get_node_rows(nodes, labels), 1:]
+
+
 def read_coordinate(fpath):
-    coord_all = {}
-    with open(fpath) as coord_file:
-        while True:
-            line = coord_file.readline()
-            if not line:
-                break
-            if '*ORIENTATION' in line:
-                line = line.split(',')
-                name = line[1]
-                name = name.split()[-1]
-                line = coord_file.readline()
-                line = line.split(',')
-                value = np.array([int(v) for v in line])
-                coord_all[name] = value
+    """读取网格文件中定义的所有局部坐标系
+
+    Args:
+        fpath (string): 网格文件路径
+
+    Returns:
+        coord_all (dict): 局部坐标系字典，键为局部坐标系名称，值为确定局部坐标系的三个结点编号
+    """
+    coord_all = dict(read_inp(fpath)['orientation'])
     return coord_all
 
 
+def _inp_params(line):
+    """解析inp文件关键字行的参数
+
+    Args:
+        line (string): 关键字行，如'*NSET, NSET=DAM, GENERATE'
+
+    Returns:
+        keyword (string): 大写的关键字，如'*NSET'
+        params (dict): 大写的参数名到参数值的字典，没有值的参数值为''
+    """
+    items = line.strip().split(',')
+    params = {}
+    for item in items[1:]:
+        if '=' in item:
+            key, value = item.split('=', 1)
+            params[key.strip().upper()] = value.strip()
+        elif item.strip() != '':
+            params[item.strip().upper()] = ''
+    return items[0].strip().upper(), params
+
+
+def _parse_inp_block(keyword, params, lines, mesh):
+    """解析inp文件中一个关键字下面的数据块，批量转换数值数据
+
+    Args:
+        keyword (string): 大写的关键字
+        params (dict): 关键字行的参数
+        lines (list): 数据行列表
+        mesh (dict): 网格数据字典，解析结果直接写入其中
+    """
+    text = ''.join(lines)
+    if keyword == '*NODE':
+        if 'nodes' in mesh or len(lines) == 0:  # 只读取第一个结点块
+            return
+        ncol = len(lines[0].replace(',', ' ').split())
+        mesh['nodes'] = np.fromstring(text.replace(',', ' '), sep=' ').reshape(-1, ncol)
+    elif keyword == '*ELEMENT':
+        if len(lines) == 0:
+            return
+        text = re.sub(r',\s*\n', ',', text)  # 以逗号结尾的行与下一行属于同一个单元
+        ncol = len(text.split('\n', 1)[0].replace(',', ' ').split())
+        elements = np.fromstring(text.replace(',', ' '), sep=' ', dtype=np.int64).reshape(-1, ncol)
+        etype = params.get('TYPE', '').upper()
+        if etype in mesh['elements']:
+            elements = np.vstack((mesh['elements'][etype], elements))
+        mesh['elements'][etype] = elements
+    elif keyword in ('*NSET', '*ELSET'):
+        key = keyword[1:].lower()
+        name = params.get(key.upper(), '')
+        tokens = text.replace(',', ' ').split()
+        try:
+            members = np.array(tokens, dtype=np.int64)
+        except ValueError:  # 集合中引用了其他集合
+            members = []
+            for token in tokens:
+                if token.lstrip('-').isdigit():
+                    members.append(np.array([int(token)], dtype=np.int64))
+                elif token in mesh[key]:
+                    members.append(mesh[key][token])
+            members = np.concatenate(members) if len(members) > 0 else np.zeros(0, dtype=np.int64)
+        if 'GENERATE' in params:
+            members = np.concatenate([np.arange(a, b + 1, c) for a, b, c in members.reshape(-1, 3)]) if members.size > 0 else members
+        if name in mesh[key]:
+            members = np.concatenate((mesh[key][name], members))
+        mesh[key][name] = members
+    elif keyword == '*SURFACE':
+        name = params.get('NAME', '')
+        members = [tuple(v.strip() for v in line.strip().rstrip(',').split(',')) for line in lines if line.strip() != '']
+        mesh['surface'][name] = mesh['surface'].get(name, []) + members
+    elif keyword == '*ORIENTATION':
+        if len(lines) == 0:
+            return
+        name = params.get('NAME', '')
+        mesh['orientation'][name] = np.array([int(v) for v in lines[0].split(',') if v.strip() != ''])
+
+
+def _inp_signature(fpath):
+    """获取网格文件的签名，用于判断网格缓存是否失效
+
+    Args:
+        fpath (string): 网格文件路径
+
+    Returns:
+        size (int): 文件大小
+        mtime (int): 文件修改时间，单位纳秒
+        digest (string): 文件开头和结尾各1MB内容的哈希值
+    """
+    stat = os.stat(fpath)
+    sha = hashlib.sha1()
+    with open(fpath, 'rb') as f:
+        sha.update(f.read(1 << 20))
+        if stat.st_size > 2 << 20:
+            f.seek(-(1 << 20), os.SEEK_END)
+            sha.update(f.read())
+    return stat.st_size, stat.st_mtime_ns, sha.hexdigest()
+
+
+def _save_inp_cache(cache_path, mesh, signature):
+    """将网格数据保存为.npz缓存文件
+
+    Args:
+        cache_path (string): 缓存文件路径
+        mesh (dict): 网格数据字典
+        signature (tuple): 网格文件签名，见_inp_signature
+    """
+    arrays = {'signature': np.array([str(v) for v in signature]), 'nodes': mesh['nodes']}
+    for kind in ('elements', 'nset', 'elset', 'orientation'):
+        arrays['order/%s' % kind] = np.array(list(mesh[kind]), dtype=str)
+        for i, value in enumerate(mesh[kind].values()):
+            arrays['%s/%d' % (kind, i)] = value
+    arrays['order/surface'] = np.array(list(mesh['surface']), dtype=str)
+    for i, value in enumerate(mesh['surface'].values()):
+        width = max([len(v) for v in value] + [1])
+        arrays['surface/%d' % i] = np.array([list(v) + [''] * (width - len(v)) for v in value], dtype=str).reshape(-1, width)
+    try:
+        with open(cache_path, 'wb') as f:
+            np.savez(f, **arrays)
+    except OSError:  # 网格文件夹不可写时不保存缓存
+        pass
+
+
+def _load_inp_cache(cache_path, signature):
+    """读取.npz网格缓存文件，文件大小、修改时间或内容哈希值任一不同时认为缓存失效
+
+    内容哈希值只覆盖文件开头和结尾，不能发现中间的同长度修改，因此修改时间不同时缓存一律失效.
+
+    Args:
+        cache_path (string): 缓存文件路径
+        signature (tuple): 网格文件签名，见_inp_signature
+
+    Returns:
+        mesh (dict): 网格数据字典，缓存失效时返回None
+    """
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with np.load(cache_path) as data:
+            size, mtime, digest = data['signature']
+            if int(size) != signature[0] or int(mtime) != signature[1] or digest != signature[2]:
+                return None
+            mesh = {'nodes': data['nodes']}
+            for kind in ('elements', 'nset', 'elset', 'orientation'):
+                mesh[kind] = {str(name): data['%s/%d' % (kind, i)] for i, name in enumerate(data['order/%s' % kind])}
+            mesh['surface'] = {str(name): [tuple(str(v) for v in row if v != '') for row in data['surface/%d' % i]] for i, name in enumerate(data['order/surface'])}
+    except (OSError, ValueError, KeyError):  # 缓存文件损坏则重新解析
+        return None
+    return mesh
+
+
+def read_inp(fpath, dims=3, cache=True):
+    """一次读取Abaqus的inp网格文件中的结点、单元、结点集、单元集、表面集和局部坐标系
+
+    逐行读取文件，每个关键字下的数值数据整块转换；解析结果保存在网格文件旁边的.npz缓存文件中，网格文件不变时直接读取缓存.
+
+    Args:
+        fpath (string): 网格文件路径
+        dims (int, optional): 模型维度，分二维和三维，默认为3
+        cache (bool, optional): 是否使用.npz缓存文件，默认为True
+
+    Returns:
+        mesh (dict): 网格数据字典，包括:
+            'nodes' (np.array(n, 3 or 4)): 结点坐标数组，第一列为结点编号，按结点编号排序，只读取第一个*NODE块
+            'elements' (dict): 单元类型到单元数组的字典，单元数组第一列为单元编号，后面几列为结点编号
+            'nset' (dict): 结点集名称到结点编号数组的字典
+            'elset' (dict): 单元集名称到单元编号数组的字典
+            'surface' (dict): 表面集名称到组成表面的(单元集, 面)列表的字典
+            'orientation' (dict): 局部坐标系名称到三个结点编号的字典
+    """
+    signature = _inp_signature(fpath)
+    key = (os.path.abspath(fpath), signature[0], signature[1])
+    mesh = _lru_get(_mesh_cache, key)
+    cache_path = fpath + '.npz'
+    if mesh is None and cache:
+        mesh = _load_inp_cache(cache_path, signature)
+    if mesh is None:
+        mesh = {'elements': {}, 'nset': {}, 'elset': {}, 'surface': {}, 'orientation': {}}
+        keyword, params, lines = None, {}, []
+        with open(fpath, encoding='gbk', errors='ignore') as mesh_file:
+            for line in mesh_file:
+                if line.startswith('**'):  # 注释行
+                    continue
+                if line.startswith('*'):
+                    if keyword is not None:
+                        _parse_inp_block(keyword, params, lines, mesh)
+                    keyword, params = _inp_params(line)
+                    lines = []
+                elif keyword is not None and line.strip() != '':
+                    lines.append(line)
+            if keyword is not None:
+                _parse_inp_block(keyword, params, lines, mesh)
+        nodes = mesh.get('nodes', np.zeros((0, dims + 1)))
+        mesh['nodes'] = nodes[np.argsort(nodes[:, 0], kind='stable')]
+        if cache:
+            _save_inp_cache(cache_path, mesh, signature)
+    _lru_set(_mesh_cache, key, mesh, MESH_CACHE_SIZE)
+    mesh = dict(mesh)
+    mesh['nodes'] = mesh['nodes'][:, :dims + 1]
+    return mesh
+
+
 def find_csv_file(dir_path):
     csv_list = []
     flist = os.listdir(dir_path)
@@ -147,6 +430,283 @@ def find_csv_file(dir_path):
     return csv_list
 
 
+def normalize_header(columns):
+    """去掉Abaqus场变量表格表头中补齐用的空格，并将'结点编号'改为'node'
+
+    Args:
+        columns (list): 表头列名
+
+    Returns:
+        list: 处理后的列名
+    """
+    names = [col.strip() for col in columns]
+    return ['node' if name == '结点编号' else name for name in names]
+
+
+def index_frames_csv(fname):
+    """建立多帧场变量表格的帧索引，记录每一帧第一行数据的字节位置和数据行数
+
+    索引保存在表格所在文件夹的cache子文件夹中，表格大小和修改时间不变时直接读取索引.
+
+    Args:
+        fname (string): 表格文件路径
+
+    Returns:
+        index (numpy.array(帧数, 2)): 每一帧第一行数据的字节位置和数据行数
+    """
+    index_path = get_csv_cache_path(fname)[:-4] + '-frames.npy'
+    if os.path.exists(index_path):
+        try:
+            return np.load(index_path)
+        except (OSError, ValueError):  # 索引文件损坏则重新建立
+            pass
+    index = []
+    with open(fname, 'rb') as csv_file:
+        header = csv_file.readline()
+        offset = len(header)
+        index.append([offset, 0])
+        for line in csv_file:
+            offset += len(line)
+            if line == header:  # 重复的表头行是下一帧的开始
+                index.append([offset, 0])
+            elif line.strip() != b'':
+                index[-1][1] += 1
+    index = np.array(index, dtype=np.int64)
+    try:
+        if not os.path.exists(os.path.dirname(index_path)):
+            os.makedirs(os.path.dirname(index_path))
+        np.save(index_path, index)
+    except OSError:  # 结果文件夹不可写时不保存索引
+        pass
+    return index
+
+
+def select_frames(num_frames, frames=None):
+    """将帧的选择方式转换为帧序号数组
+
+    Args:
+        num_frames (int): 总帧数
+        frames (int, slice or numpy.array, optional): 单独一帧的序号、时间窗口或间隔取帧（如slice(100, 500, 5)）、或帧序号数组，默认为None，即所有帧
+
+    Returns:
+        numpy.array: 选中的帧序号
+    """
+    if frames is None:
+        return np.arange(num_frames)
+    if isinstance(frames, slice):
+        return np.arange(num_frames)[frames]
+    return np.arange(num_frames)[np.atleast_1d(frames)]
+
+
+def absolute_frames(fname, frames, idx):
+    """把在所选帧中的序号（如get_envelope返回的帧序号）转换为表格中的绝对帧序号
+
+    Args:
+        fname (string): 表格文件路径
+        frames (int, slice or numpy.array): 读取表格时选择的帧，见select_frames，None表示所有帧
+        idx (numpy.array): 在所选帧中的序号
+
+    Returns:
+        numpy.array: 表格中的绝对帧序号，形状与idx相同
+    """
+    if frames is None:
+        return idx
+    return select_frames(index_frames_csv(fname).shape[0], frames)[idx]
+
+
+def _read_frame_lines(csv_file, offset, rows):
+    """从表格的某个字节位置开始读取一帧的数据行，字节位置只对二进制方式打开的文件有效，读出后再按gbk解码
+
+    Args:
+        csv_file (file): 以二进制方式打开的表格文件
+        offset (int): 帧第一行数据的字节位置
+        rows (int): 帧的数据行数
+
+    Returns:
+        lines (list): 数据行列表
+    """
+    csv_file.seek(offset)
+    lines = []
+    while len(lines) < rows:
+        line = csv_file.readline()
+        if line == b'':  # 表格比索引记录的短，如被截断或建立索引后被改写
+            raise ValueError('%s: frame at byte %d ends after %d of %d rows' % (csv_file.name, offset, len(lines), rows))
+        if line.strip() != b'':
+            lines.append(line.decode('gbk'))
+    return lines
+
+
+def read_frames_csv(fname, columns, frames=None):
+    """读取Abaqus导出的多帧场变量表格，每一帧数据前面都有一行表头
+
+    读取全部帧时逐行读取，以重复的表头行作为帧的分界，数值行直接转换为数组，不经过pandas.Dataframe；
+    只读取部分帧时根据帧索引（见index_frames_csv）直接跳到所选的帧.
+
+    Args:
+        fname (string): 表格文件路径
+        columns (list): 需要读取的列名（见normalize_header）或列序号
+        frames (int, slice or numpy.array, optional): 需要读取的帧，见select_frames，默认为None，即所有帧
+
+    Returns:
+        data (numpy.array(帧数, 结点数, 列数)): 各帧各结点的数据
+    """
+    if frames is not None:
+        return np.array(list(iter_frames_csv(fname, columns, frames)))
+    with open(fname, encoding='gbk') as csv_file:
+        header = csv_file.readline()
+        names = normalize_header(header.split(','))
+        usecols = [names.index(col) if isinstance(col, str) else col for col in columns]
+        num_frames = [1]
+
+        def data_lines():
+            for line in csv_file:
+                if line == header:  # 重复的表头行是下一帧的开始
+                    num_frames[0] += 1
+                elif line.strip() != '':
+                    yield line
+
+        data = np.loadtxt(data_lines(), delimiter=',', usecols=usecols, dtype=np.float64, ndmin=2)
+    if data.shape[0] % num_frames[0] != 0:
+        raise ValueError('%s: %d rows cannot be split into %d frames' % (fname, data.shape[0], num_frames[0]))
+    return data.reshape(num_frames[0], -1, len(usecols))
+
+
+def iter_frames_csv(fname, columns, frames=None):
+    """逐帧读取Abaqus导出的多帧场变量表格，每次只在内存中保留一帧数据
+
+    Args:
+        fname (string): 表格文件路径
+        columns (list): 需要读取的列名（见normalize_header）或列序号
+        frames (int, slice or numpy.array, optional): 需要读取的帧，见select_frames，默认为None，即所有帧
+
+    Yields:
+        frame (numpy.array(结点数, 列数)): 一帧各结点的数据
+    """
+    with open(fname, encoding='gbk') as csv_file:
+        header = csv_file.readline()
+        names = normalize_header(header.split(','))
+        usecols = [names.index(col) if isinstance(col, str) else col for col in columns]
+        if frames is not None:  # 根据帧索引只读取所选的帧
+            index = index_frames_csv(fname)
+            with open(fname, 'rb') as bin_file:
+                for i in select_frames(index.shape[0], frames):
+                    lines = _read_frame_lines(bin_file, index[i, 0], index[i, 1])
+                    yield np.loadtxt(lines, delimiter=',', usecols=usecols, dtype=np.float64, ndmin=2)
+            return
+        lines = []
+        for line in csv_file:
+            if line == header:  # 重复的表头行是下一帧的开始
+                yield np.loadtxt(lines, delimiter=',', usecols=usecols, dtype=np.float64, ndmin=2)
+                lines = []
+            elif line.strip() != '':
+                lines.append(line)
+        if len(lines) > 0:
+            yield np.loadtxt(lines, delimiter=',', usecols=usecols, dtype=np.float64, ndmin=2)
+
+
+def get_envelope(frames, ref_row=None):
+    """逐帧计算各结点各分量的最大、最小值包络，以及出现最大、最小值的帧序号
+
+    Args:
+        frames (iterable): 各帧数据，每一帧为numpy.array(结点数, 分量数)，可以是生成器
+        ref_row (int, optional): 参考结点所在的行，每一帧都先减去参考结点的值，默认为None，即不减
+
+    Returns:
+        env_max (numpy.array(结点数, 分量数)): 最大值包络
+        env_min (numpy.array(结点数, 分量数)): 最小值包络
+        idx_max (numpy.array(结点数, 分量数)): 最大值第一次出现的帧序号
+        idx_min (numpy.array(结点数, 分量数)): 最小值第一次出现的帧序号
+    """
+    env_max = env_min = idx_max = idx_min = None
+    for i, frame in enumerate(frames):
+        if ref_row is not None:
+            frame = frame - frame[ref_row]
+        if env_max is None:
+            env_max, env_min = np.array(frame, dtype=np.float64), np.array(frame, dtype=np.float64)
+            idx_max, idx_min = np.zeros(env_max.shape, dtype=np.int64), np.zeros(env_min.shape, dtype=np.int64)
+            continue
+        update = frame > env_max
+        env_max[update] = frame[update]
+        idx_max[update] = i
+        update = frame < env_min
+        env_min[update] = frame[update]
+        idx_min[update] = i
+    return env_max, env_min, idx_max, idx_min
+
+
+def get_csv_cache_path(fname, dtype=np.float64):
+    """获取数据表格缓存文件的路径，缓存放在表格所在文件夹的cache子文件夹中，文件名包含表格的大小和修改时间
+
+    Args:
+        fname (string): 表格文件路径
+        dtype (numpy.dtype, optional): 缓存中数值列的类型，不是np.float64时文件名带类型后缀，默认为np.float64
+
+    Returns:
+        cache_path (string): 缓存文件路径
+    """
+    stat = os.stat(fname)
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(fname)), 'cache')
+    suffix = '' if np.dtype(dtype) == np.float64 else '-' + np.dtype(dtype).name
+    return os.path.join(cache_dir, '%s-%d-%d%s.npy' % (os.path.basename(fname), stat.st_size, stat.st_mtime_ns, suffix))
+
+
+def read_field_csv(fname, drop_duplicates=False, dtype=np.float64):
+    """读取Abaqus导出的单帧场变量表格，去掉表头中的空格，并将'结点编号'列改名为'node'
+
+    第一次读取后将表格保存为按列类型存储的.npy缓存（结点编号为int32，数值为dtype），之后直接读取缓存，不再解析表格.
+    每种dtype各有一个缓存，取np.float32时缓存文件和读取量都减半.
+    缓存不用内存映射读取：缓存是按行存放的结构化数组，每一列在文件中不连续，构造DataFrame时pandas会把每一列复制到内存，
+    内存映射省不下内存，只会增加缺页开销，因此直接整体读入.
+
+    Args:
+        fname (string): 表格文件路径
+        drop_duplicates (bool, optional): 是否删除重复的结点，只保留第一次出现的结点，默认为False
+        dtype (numpy.dtype, optional): 坐标和数值列的类型，取np.float32时内存减半，默认为np.float64
+
+    Returns:
+        data (pandas.Dataframe): 表格数据
+    """
+    cache_path = get_csv_cache_path(fname, dtype)
+    records = None
+    if os.path.exists(cache_path):
+        try:
+            records = np.load(cache_path)
+        except (OSError, ValueError):  # 缓存文件损坏则重新读取表格
+            records = None
+    if records is None:
+        data = pd.read_csv(fname, encoding='gbk')
+        data.columns = normalize_header(data.columns)
+        dtypes = []
+        for col in data.columns:
+            if col == 'node':
+                dtypes.append((col, np.int32))
+            elif data[col].dtype.kind in 'iuf':
+                dtypes.append((col, dtype if data[col].dtype.kind == 'f' else np.int64))
+            else:
+                dtypes.append((col, 'U%d' % max(data[col].astype(str).str.len().max(), 1)))
+        records = np.empty(len(data), dtype=dtypes)
+        for col in data.columns:
+            records[col] = data[col].to_numpy()
+        cache_dir = os.path.dirname(cache_path)
+        try:
+            if not os.path.exists(cache_dir):
+                os.makedirs(cache_dir)
+            # 删除同一表格之前版本的缓存，当前版本其他dtype的缓存保留
+            prefix = os.path.basename(fname) + '-'
+            version = os.path.basename(get_csv_cache_path(fname))[len(prefix):-4]
+            for f in os.listdir(cache_dir):
+                match = re.fullmatch(r'(\d+-\d+)(-float\d+)?', f[len(prefix):-4]) if f.startswith(prefix) and f.endswith('.npy') else None
+                if match is not None and match.group(1) != version:
+                    os.remove(os.path.join(cache_dir, f))
+            np.save(cache_path, records)
+        except OSError:  # 结果文件夹不可写时不保存缓存
+            pass
+    data = pd.DataFrame({name: records[name] for name in records.dtype.names})
+    if drop_duplicates:
+        data.drop_duplicates(subset='node', keep='first', inplace=True)
+    return data
+
+
 def find_geo_file(geo_path):
     bound_list = []
     area_list = []
@@ -166,6 +726,106 @@ def find_geo_file(geo_path):
     return bound_list, area_list, hole_list, concen_list
 
 
+def split_geo_name(fname):
+    """把几何信息文件名按分隔符（-、_、.、空格）拆分为若干段，去掉扩展名
+
+    Args:
+        fname (string): 文件名
+
+    Returns:
+        list: 文件名的各段
+    """
+    return [token for token in re.split(r'[-_.\s]+', os.path.splitext(fname)[0]) if token != '']
+
+
+def _contains_tokens(tokens, sub):
+    """判断sub是否为tokens中连续的若干段"""
+    n = len(sub)
+    return n > 0 and any(tokens[i : i + n] == sub for i in range(len(tokens) - n + 1))
+
+
+def scan_geo_folder(geo_path, sections=None):
+    """扫描几何信息文件夹一次，建立剖面到边界、孔洞、应力集中点和结点面积文件的索引
+
+    文件与剖面按分隔符拆分后的整段匹配，'dam1'不会匹配到'bound-dam10.out'；
+    给出所有剖面名称时，一个文件同时匹配多个剖面（如'dam1'和'dam1-2'）只归属于段数最多的剖面.
+
+    Args:
+        geo_path (string): 几何信息文件夹路径
+        sections (list, optional): 所有剖面（局部坐标系）名称，默认为None
+
+    Returns:
+        geo (dict): 几何信息索引，'path'为文件夹路径，'bound'、'area'、'holes'、'delete'为各类文件名列表，查询见get_geo_files
+    """
+    bound_list, area_list, hole_list, concen_list = find_geo_file(geo_path)
+    geo = {'path': geo_path, 'bound': sorted(bound_list), 'area': sorted(area_list), 'holes': sorted(hole_list), 'delete': sorted(concen_list)}
+    geo['sections'] = [split_geo_name(sec) for sec in sections] if sections is not None else []
+    geo['match'] = {}  # 查询结果缓存，键为(文件种类, 剖面名称)
+    return geo
+
+
+def get_geo_files(geo, kind, sec):
+    """查询某个剖面某类几何信息文件的完整路径
+
+    Args:
+        geo (dict): 几何信息索引，见scan_geo_folder
+        kind (string): 文件种类，'bound'、'area'、'holes'或'delete'
+        sec (string): 剖面名称
+
+    Returns:
+        list: 按文件名排序的文件路径列表
+    """
+    key = (kind, sec)
+    if key not in geo['match']:
+        sub = split_geo_name(sec)
+        files = []
+        for fname in geo[kind]:
+            tokens = split_geo_name(fname)
+            if not _contains_tokens(tokens, sub):
+                continue
+            # 有更长的剖面名称也匹配该文件时，该文件属于更长的剖面
+            if any(len(other) > len(sub) and _contains_tokens(other, sub) and _contains_tokens(tokens, other) for other in geo['sections']):
+                continue
+            files.append(os.path.join(geo['path'], fname))
+        geo['match'][key] = files
+    return geo['match'][key]
+
+
+def get_geo_file(geo, kind, sec):
+    """查询某个剖面的某类几何信息文件（每个剖面只有一个的孔洞、应力集中点和结点面积文件）
+
+    Args:
+        geo (dict): 几何信息索引，见scan_geo_folder
+        kind (string): 文件种类，'area'、'holes'或'delete'
+        sec (string): 剖面名称
+
+    Returns:
+        string: 文件路径，没有找到返回None
+    """
+    files = get_geo_files(geo, kind, sec)
+    return files[0] if len(files) > 0 else None
+
+
+def load_geo_file(fpath, **kwargs):
+    """读取几何信息文件（边界、孔洞、应力集中点和结点面积），同一文件只读取一次，文件修改后重新读取
+
+    Args:
+        fpath (string): 文件路径
+        **kwargs: 传给np.loadtxt的参数，如结点面积文件的skiprows和encoding
+
+    Returns:
+        numpy.array: 文件中的数据，只读
+    """
+    stat = os.stat(fpath)
+    key = (os.path.abspath(fpath), stat.st_size, stat.st_mtime_ns, tuple(sorted(kwargs.items())))
+    data = _lru_get(_geo_file_cache, key)
+    if data is None:
+        data = np.loadtxt(fpath, **kwargs)
+        data.flags.writeable = False
+        _lru_set(_geo_file_cache, key, data, GEO_FILE_CACHE_SIZE)
+    return data
+
+
 def get_boundary(bound, nodes):
     """根据边界结点编号和所有结点坐标获取边界
 
@@ -176,13 +836,535 @@ def get_boundary(bound, nodes):
     Returns:
         boundary (list): 边界列表，每个元素是一个元组，表示结点坐标，结点按逆时针或者顺时针排序
     """
-    boundary = []
-    for node_id in bound:
-        boundary.append(tuple(nodes[nodes[:, 0] == node_id][0, 1:]))
+    boundary = [tuple(v) for v in get_node_coords(nodes, bound)]
     return boundary
 
 
-def getContour(x, y, z, boundary, vmin=None, vmax=None, dpi=100, flag=1, num_float=1, method='cubic', numline=10, max_min='abs', color=0, baseP=0, Extrapolation=1, holes=None, fontsize=14):
+def get_mask(X, Y, boundary, holes=None):
+    """批量判断网格点是否位于边界外或孔洞内
+
+    Args:
+        X (numpy.array(m, n)): 网格点的横坐标.
+        Y (numpy.array(m, n)): 网格点的纵坐标.
+        boundary (list): 边界点坐标的列表，需按顺时针或逆时针顺序排列，每个点是元组.
+        holes (list, optional): 所有孔洞边界坐标点数据，每个元素是一个孔洞的边界点列表，默认无孔洞.
+
+    Returns:
+        mask (numpy.array(m, n)): 布尔数组，True表示该网格点在边界外或孔洞内，需要置为nan
+    """
+    mask = ~contains_xy(Polygon(boundary), X, Y)  # 边界外（包括边界上）的点
+    if holes is not None:
+        for hole in holes:
+            mask |= contains_xy(Polygon(hole), X, Y)  # 孔洞内（不包括孔洞边界上）的点
+    return mask
+
+
+def _lru_get(cache, key):
+    """从LRU缓存中取值，命中时将其移到最近使用的位置
+
+    Args:
+        cache (OrderedDict): 缓存字典
+        key (string): 缓存键
+
+    Returns:
+        缓存的值，没有命中则返回None
+    """
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _lru_set(cache, key, value, max_size):
+    """向LRU缓存中存值，超过最大数量时删除最久未使用的值
+
+    Args:
+        cache (OrderedDict): 缓存字典
+        key (string): 缓存键
+        value: 需要缓存的值
+        max_size (int): 缓存的最大数量
+    """
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > max_size:
+        cache.popitem(last=False)
+
+
+def get_force_key(fname, *params):
+    """根据应力表格文件和积分参数生成滑面作用力缓存键，表格修改后缓存自动失效
+
+    Args:
+        fname (string): 滑面应力表格文件路径
+        *params: 影响积分结果的其它参数，如结点面积数组、法向量等
+
+    Returns:
+        key (string): 缓存键
+    """
+    sha = hashlib.sha1()
+    sha.update(get_csv_cache_path(fname).encode('utf-8'))
+    for param in params:
+        sha.update(b'param')
+        sha.update(np.ascontiguousarray(param, dtype=np.float64).tobytes())
+    return sha.hexdigest()
+
+
+def get_cached_forces(key):
+    """从内存缓存中取出滑面作用力
+
+    Args:
+        key (string): 缓存键，见get_force_key
+
+    Returns:
+        forces (tuple): 缓存的作用力，没有命中则返回None
+    """
+    return _lru_get(_force_cache, key)
+
+
+def set_cached_forces(key, forces):
+    """将滑面作用力存入内存缓存
+
+    Args:
+        key (string): 缓存键，见get_force_key
+        forces (tuple): 作用力
+    """
+    _lru_set(_force_cache, key, forces, FORCE_CACHE_SIZE)
+
+
+def _sweep_values(value, num_plane):
+    """把抗剪断参数整理为每个滑面一组扫描值的列表"""
+    if num_plane == 1 and np.ndim(value) <= 1:
+        value = [value]
+    if len(value) != num_plane:
+        raise ValueError('Expected parameters for %d planes, got %d' % (num_plane, len(value)))
+    return [np.atleast_1d(np.asarray(v, dtype=np.float64)) for v in value]
+
+
+def kanghua_K(W, P, A, f, c, phi=1.0, gamma_0=1.1, gamma_d=1.5, gamma_f=1.7, gamma_c=2.0):
+    """由积分好的滑面作用力批量计算多组抗剪断参数下各帧的抗滑稳定安全系数，参数扫描和可靠度分析共用
+
+    K = (1e6 * Σ(c / gamma_c * A) + Σ(f / gamma_f * W⁺)) / (gamma_0 * phi * gamma_d * Σ|P|)，W⁺为法向压力，受拉时取0.
+
+    Args:
+        W (numpy.array(帧数, 滑面数)): 各帧各滑面的法向作用力，静力工况帧数为1.
+        P (numpy.array(帧数, 滑面数)): 各帧各滑面的切向作用力.
+        A (numpy.array(滑面数)): 各滑面面积.
+        f (numpy.array(组数, 滑面数)): 各组参数各滑面的摩擦系数.
+        c (numpy.array(组数, 滑面数)): 各组参数各滑面的凝聚力系数.
+        phi (float or numpy.array(组数)): 设计状况系数，持久状况取1.0，偶然状况取0.85.
+        gamma_0 (float or numpy.array(组数)): 结构重要性系数,分级I级取1.1.
+        gamma_d (float or numpy.array(组数)): 抗滑稳定结构系数，静力工况取1.5，动力工况取0.65.
+        gamma_f (float or numpy.array(组数)): 摩擦系数材料性能分项系数，取1.7.
+        gamma_c (float or numpy.array(组数)): 粘聚力材料性能分项系数，取2.0.
+
+    Returns:
+        K (numpy.array(组数, 帧数)): 各组参数各帧的抗滑稳定安全系数
+    """
+    W = np.atleast_2d(W)
+    P = np.atleast_2d(P)
+    A = np.atleast_1d(A)
+    f = np.atleast_2d(f)
+    c = np.atleast_2d(c)
+
+    def col(v):
+        return np.reshape(v, (-1, 1))
+
+    W_pos = ((W > 0) * W).T  # (滑面数, 帧数)
+    R = 1e6 * (c / col(gamma_c)).dot(A)[:, None] + (f / col(gamma_f)).dot(W_pos)  # (组数, 帧数)
+    return R / (np.sum(np.abs(P), axis=1) * col(gamma_0 * phi * gamma_d))
+
+
+def kanghua_sweep(W, P, A, f, c, phi=1.0, gamma_0=1.1, gamma_d=1.5, gamma_f=1.7, gamma_c=2.0, chunk_size=10000000):
+    """在抗剪断参数和分项系数组成的网格上计算所有参数组合的抗滑稳定安全系数
+
+    W、P、A与这些参数无关，只需积分一次，所有参数组合和所有帧一起广播计算.
+    每个参数可以是单个值，也可以是一组需要扫描的值.
+
+    Args:
+        W (numpy.array(帧数, 滑面数)): 各帧各滑面的法向作用力，静力工况帧数为1.
+        P (numpy.array(帧数, 滑面数)): 各帧各滑面的切向作用力.
+        A (numpy.array(滑面数)): 各滑面面积.
+        f (list): 各滑面的摩擦系数，长度等于滑面数，每个元素为单个值或一组值；只有一个滑面时可以直接传单个值或一组值.
+        c (list): 各滑面的凝聚力系数，格式同f.
+        phi (float or list): 设计状况系数，持久状况取1.0，偶然状况取0.85.
+        gamma_0 (float or list): 结构重要性系数,分级I级取1.1.
+        gamma_d (float or list): 抗滑稳定结构系数，静力工况取1.5，动力工况取0.65.
+        gamma_f (float or list): 摩擦系数材料性能分项系数，取1.7.
+        gamma_c (float or list): 粘聚力材料性能分项系数，取2.0.
+        chunk_size (int, optional): 每次计算的参数组合数乘以帧数的上限，用于控制内存，默认为10000000.
+
+    Returns:
+        table (pandas.Dataframe): 每行为一组参数，参数列为f、c（多个滑面时为f1、c1、f2、c2...）、phi、gamma_0、gamma_d、gamma_f、gamma_c，
+            'K'列为各帧中最小的抗滑稳定安全系数，'fail'列为安全系数小于1的帧数.
+    """
+    W = np.atleast_2d(W)
+    P = np.atleast_2d(P)
+    A = np.atleast_1d(A)
+    num_plane = W.shape[1]
+    if num_plane == 1:
+        names = ['f', 'c']
+    else:
+        names = ['f%d' % (i + 1) for i in range(num_plane)] + ['c%d' % (i + 1) for i in range(num_plane)]
+    names += ['phi', 'gamma_0', 'gamma_d', 'gamma_f', 'gamma_c']
+    values = _sweep_values(f, num_plane) + _sweep_values(c, num_plane)
+    values += [np.atleast_1d(np.asarray(v, dtype=np.float64)) for v in [phi, gamma_0, gamma_d, gamma_f, gamma_c]]
+    grids = [grid.ravel() for grid in np.meshgrid(*values, indexing='ij')]
+    table = pd.DataFrame(dict(zip(names, grids)))
+    ff = np.column_stack(grids[:num_plane])  # (组合数, 滑面数)
+    cc = np.column_stack(grids[num_plane : 2 * num_plane])
+    factors = grids[2 * num_plane:]  # phi, gamma_0, gamma_d, gamma_f, gamma_c
+    K_min = np.zeros(len(table))
+    fail = np.zeros(len(table), dtype=np.int64)
+    step = max(1, chunk_size // W.shape[0])
+    for i in range(0, len(table), step):
+        K = kanghua_K(W, P, A, ff[i : i + step], cc[i : i + step], *[v[i : i + step] for v in factors])  # (组合数, 帧数)
+        K_min[i : i + step] = np.min(K, axis=1)
+        fail[i : i + step] = np.sum(K < 1.0, axis=1)
+    table['K'] = K_min
+    table['fail'] = fail
+    return table
+
+
+def plot_sweep(table, x, y, fontsize=16):
+    """绘制参数敏感性热力图，其它参数有多个取值时取最小的安全系数
+
+    Args:
+        table (pandas.Dataframe): kanghua_sweep得到的参数敏感性表格
+        x (string): 横轴参数名，如'f1'
+        y (string): 纵轴参数名，如'c1'
+        fontsize (int, optional): 字体大小，默认为16.
+
+    Returns:
+        fig (plt.figure): 图片句柄
+        K (pandas.Dataframe): 热力图数据，行为y参数取值，列为x参数取值
+    """
+    K = table.pivot_table(index=y, columns=x, values='K', aggfunc='min').sort_index(ascending=False)
+    fig = plt.figure(figsize=(6.1, 4.4))
+    ax = sns.heatmap(K, annot=K.size <= 100, fmt='.2f', cmap='RdYlGn', center=1.0)
+    ax.set_xlabel(x, fontsize=fontsize)
+    ax.set_ylabel(y, fontsize=fontsize)
+    plt.tick_params(labelsize=fontsize - 4)
+    plt.tight_layout()
+    return fig, K
+
+
+def get_nearest_dist(xy, points):
+    """求各数据点到一组点中最近点的距离，用cKDTree一次查询所有数据点，同样的两组坐标只计算一次
+
+    Args:
+        xy (numpy.array(n, 2)): 数据点坐标
+        points (numpy.array(m, 2)): 被查询的点坐标，如应力集中点
+
+    Returns:
+        dist (numpy.array(n)): 各数据点到最近点的距离，用dist > d即可筛选出距离大于d的数据点
+    """
+    xy = np.ascontiguousarray(xy, dtype=np.float64)
+    points = np.ascontiguousarray(points, dtype=np.float64).reshape(-1, xy.shape[1])
+    sha = hashlib.sha1()
+    sha.update(xy.tobytes())
+    sha.update(b'points')
+    sha.update(points.tobytes())
+    key = sha.hexdigest()
+    dist = _lru_get(_nearest_cache, key)
+    if dist is None:
+        dist, _ = scipy.spatial.cKDTree(points).query(xy)
+        _lru_set(_nearest_cache, key, dist, NEAREST_CACHE_SIZE)
+    return dist
+
+
+def set_grid_cache_dir(path):
+    """设置插值掩膜的磁盘缓存文件夹，一般放在几何信息文件夹中
+
+    Args:
+        path (string): 缓存文件夹路径，None表示不使用磁盘缓存
+    """
+    global _grid_cache_dir
+    if path is not None and not os.path.exists(path):
+        os.makedirs(path)
+    _grid_cache_dir = path
+
+
+def get_grid_cache_dir():
+    """获取插值掩膜的磁盘缓存文件夹，绘图子进程用同一个文件夹
+
+    Returns:
+        path (string): 缓存文件夹路径，None表示不使用磁盘缓存
+    """
+    return _grid_cache_dir
+
+
+def get_grid_key(boundary, holes=None, dpi=100):
+    """根据边界、孔洞和插值分辨率生成网格缓存键
+
+    Args:
+        boundary (list): 边界点坐标的列表，每个点是元组.
+        holes (list, optional): 所有孔洞边界坐标点数据，默认无孔洞.
+        dpi (int, optional): 插值分辨率，默认为100.
+
+    Returns:
+        key (string): 缓存键
+    """
+    sha = hashlib.sha1()
+    sha.update(np.ascontiguousarray(boundary, dtype=np.float64).tobytes())
+    if holes is not None:
+        for hole in holes:
+            sha.update(b'hole')
+            sha.update(np.ascontiguousarray(hole, dtype=np.float64).tobytes())
+    sha.update(b'dpi%d' % dpi)
+    return sha.hexdigest()
+
+
+def get_grid(boundary, holes=None, dpi=100):
+    """获取边界范围内的插值网格和掩膜，同一几何只计算一次
+
+    先查内存缓存，再查磁盘缓存，都没有命中时才重新计算掩膜.
+
+    Args:
+        boundary (list): 边界点坐标的列表，需按顺时针或逆时针顺序排列，每个点是元组.
+        holes (list, optional): 所有孔洞边界坐标点数据，每个元素是一个孔洞的边界点列表，默认无孔洞.
+        dpi (int, optional): 插值分辨率，默认为100，即插值出来100x100的网格.
+
+    Returns:
+        X (numpy.array(dpi, dpi)): 网格点的横坐标，只读.
+        Y (numpy.array(dpi, dpi)): 网格点的纵坐标，只读.
+        mask (numpy.array(dpi, dpi)): 布尔数组，True表示该网格点在边界外或孔洞内，只读.
+    """
+    key = get_grid_key(boundary, holes, dpi)
+    grid = _lru_get(_grid_cache, key)
+    if grid is not None:
+        return grid
+    bd = np.array(boundary)
+    cmax = np.max(bd, axis=0)
+    cmin = np.min(bd, axis=0)
+    xi = np.linspace(cmin[0], cmax[0], dpi)
+    yi = np.linspace(cmin[1], cmax[1], dpi)
+    X, Y = np.meshgrid(xi, yi)
+    mask = None
+    cache_file = None
+    if _grid_cache_dir is not None:
+        cache_file = os.path.join(_grid_cache_dir, 'mask-%s.npy' % key)
+        if os.path.exists(cache_file):
+            try:
+                mask = np.load(cache_file)
+            except (OSError, ValueError):  # 缓存文件损坏则重新计算
+                mask = None
+    if mask is None or mask.shape != X.shape:
+        mask = get_mask(X, Y, boundary, holes)
+        if cache_file is not None:
+            np.save(cache_file, mask)
+    for arr in (X, Y, mask):
+        arr.flags.writeable = False  # 缓存的数组被多张图片共用，不允许修改
+    grid = (X, Y, mask)
+    _lru_set(_grid_cache, key, grid, GRID_CACHE_SIZE)
+    return grid
+
+
+def get_interp_op(x, y, X, Y, method='linear'):
+    """获取从数据点到网格点的插值算子，同一组数据点和网格只三角剖分一次
+
+    linear插值时算子为稀疏矩阵，每行是网格点所在三角形三个顶点的重心坐标权重；
+    nearest插值时算子为每个网格点最近数据点的编号；cubic插值时复用三角剖分.
+
+    Args:
+        x (numpy.array(1, n)): 数据点的横坐标值.
+        y (numpy.array(1, n)): 数据点的纵坐标值.
+        X (numpy.array(m, n)): 网格点的横坐标.
+        Y (numpy.array(m, n)): 网格点的纵坐标.
+        method (str, optional): 插值方法，可选'linear'、'nearest'和'cubic'，与scipy.interpolate.griddata一致，默认为'linear'.
+
+    Returns:
+        op (dict): 插值算子，用apply_interp_op作用到数据上.
+    """
+    points = np.column_stack((x, y)).astype(np.float64)
+    grid_points = np.column_stack((np.ravel(X), np.ravel(Y))).astype(np.float64)
+    sha = hashlib.sha1(points.tobytes())
+    sha.update(grid_points.tobytes())
+    sha.update(method.encode())
+    key = sha.hexdigest()
+    op = _lru_get(_interp_cache, key)
+    if op is not None:
+        return op
+    op = {'method': method, 'shape': np.shape(X), 'num': points.shape[0]}
+    if method == 'nearest':
+        _, op['index'] = scipy.spatial.cKDTree(points).query(grid_points)
+    else:
+        tri = scipy.spatial.Delaunay(points)
+        if method == 'linear':
+            simplex = tri.find_simplex(grid_points)
+            inside = simplex >= 0
+            trans = tri.transform[simplex[inside]]
+            bary = np.einsum('ijk,ik->ij', trans[:, :2, :], grid_points[inside] - trans[:, 2, :])
+            weights = np.column_stack((bary, 1.0 - bary.sum(axis=1)))  # 三个顶点的重心坐标权重
+            rows = np.repeat(np.nonzero(inside)[0], 3)
+            cols = tri.simplices[simplex[inside]].ravel()
+            op['W'] = scipy.sparse.csr_matrix((weights.ravel(), (rows, cols)), shape=(grid_points.shape[0], points.shape[0]))
+            op['outside'] = ~inside
+        elif method == 'cubic':
+            op['tri'] = tri
+            op['grid_points'] = grid_points
+        else:
+            raise ValueError('Unknown interpolation method: %s' % method)
+    _lru_set(_interp_cache, key, op, INTERP_CACHE_SIZE)
+    return op
+
+
+def apply_interp_op(op, z):
+    """将插值算子作用到数据点上，得到网格点上的数值
+
+    Args:
+        op (dict): get_interp_op得到的插值算子.
+        z (numpy.array(n) or numpy.array(n, k)): 数据点的数值，二维数组时每一列是一组数据.
+
+    Returns:
+        Z (numpy.array(m, n) or numpy.array(k, m, n)): 网格点上的数值，多组数据时第一维是数据组.
+    """
+    z = np.asarray(z, dtype=np.float64)
+    if op['method'] == 'linear':
+        Z = op['W'] @ z
+        Z[op['outside']] = np.nan  # 凸包外的网格点置为nan，与griddata一致
+    elif op['method'] == 'nearest':
+        Z = z[op['index']]
+    else:
+        Z = scipy.interpolate.CloughTocher2DInterpolator(op['tri'], z)(op['grid_points'])
+    if z.ndim == 1:
+        return Z.reshape(op['shape'])
+    return np.moveaxis(Z, -1, 0).reshape((z.shape[1],) + op['shape'])
+
+
+def interp_fields(x, y, zs, boundary, holes=None, dpi=100, method='linear', baseP=0):
+    """用同一个插值算子将多组数据插值到网格上，如多个时刻的损伤因子或多个包络分量
+
+    Args:
+        x (numpy.array(1, n)): 数据点的横坐标值.
+        y (numpy.array(1, n)): 数据点的纵坐标值.
+        zs (numpy.array(k, n)): 多组数据点的数值，每一行是一组数据.
+        boundary (list): 边界点坐标的列表，需按顺时针或逆时针顺序排列，每个点是元组.
+        holes (list, optional): 所有孔洞边界坐标点数据，默认无孔洞.
+        dpi (int, optional): 插值分辨率，默认为100.
+        method (str, optional): 插值方法，默认为'linear'.
+        baseP (int, optional): 数据起始位置高度，默认为0.
+
+    Returns:
+        X (numpy.array(m, n)): 网格点的横坐标.
+        Y (numpy.array(m, n)): 网格点的纵坐标.
+        Zs (numpy.array(k, m, n)): 每组数据插值后网格点上的数值.
+    """
+    zs = np.atleast_2d(zs)
+    idx = y >= baseP
+    X, Y, mask = get_grid(boundary, holes, dpi)
+    op = get_interp_op(x[idx], y[idx], X, Y, method)
+    Zs = apply_interp_op(op, zs[:, idx].T)
+    Zs[:, mask] = np.nan  # 将边界外和孔洞内的网格点置为nan
+    return X, Y, Zs
+
+
+RBF_KERNELS = {'multiquadric': 'multiquadric', 'inverse': 'inverse_multiquadric', 'gaussian': 'gaussian', 'linear': 'linear',
+               'cubic': 'cubic', 'quintic': 'quintic', 'thin_plate': 'thin_plate_spline'}  # scipy.interpolate.Rbf的函数名与RBFInterpolator核函数名的对应关系
+
+
+def rbf_interp(x, y, z, xi, yi, method='cubic', neighbors=50):
+    """局部径向基函数插值（外插），每个插值点只用最近的若干个数据点，内存和时间随数据点数线性增长
+
+    Args:
+        x (numpy.array(1, n)): 数据点的横坐标值.
+        y (numpy.array(1, n)): 数据点的纵坐标值.
+        z (numpy.array(1, n)): 数据点的数值大小.
+        xi (numpy.array): 插值点的横坐标.
+        yi (numpy.array): 插值点的纵坐标，形状与xi相同.
+        method (str, optional): 径向基函数，与scipy.interpolate.Rbf的function参数一致，默认为'cubic'.
+        neighbors (int, optional): 每个插值点使用的最近数据点个数，默认为50；为None时采用全局径向基函数插值（scipy.interpolate.Rbf）.
+
+    Returns:
+        zi (numpy.array): 插值点上的数值，形状与xi相同.
+    """
+    if neighbors is None:
+        func = scipy.interpolate.Rbf(x, y, z, function=method)
+        return func(xi, yi)
+    points = np.column_stack((x, y)).astype(np.float64)
+    # 形状参数与scipy.interpolate.Rbf的默认值保持一致，即数据点的平均间距
+    edges = np.ptp(points, axis=0)
+    edges = edges[edges > 0]
+    epsilon = np.power(np.prod(edges) / points.shape[0], 1.0 / edges.size) if edges.size > 0 else 1.0
+    kernel = RBF_KERNELS.get(method, method)
+    if kernel in ('multiquadric', 'inverse_multiquadric', 'gaussian'):
+        func = scipy.interpolate.RBFInterpolator(points, z, neighbors=min(neighbors, points.shape[0]), kernel=kernel, epsilon=1.0 / epsilon)
+    else:
+        func = scipy.interpolate.RBFInterpolator(points, z, neighbors=min(neighbors, points.shape[0]), kernel=kernel)
+    xi = np.asarray(xi)
+    zi = func(np.column_stack((np.ravel(xi), np.ravel(yi))))
+    return zi.reshape(xi.shape)
+
+
+def elements_to_triangles(elements, node_ids):
+    """将网格单元的结点连接关系转换为三角形，四边形单元沿对角线分成两个三角形
+
+    Args:
+        elements (numpy.array(m, 3) or numpy.array(m, 4) or list): 单元的结点编号，每一行是一个三角形或四边形单元；三角形和四边形单元混合时为数组的列表，见read_plane_elements.
+        node_ids (numpy.array(n)): 数据点对应的结点编号.
+
+    Returns:
+        triangles (numpy.array(k, 3)): 三角形三个顶点在数据点中的序号，包含不在数据点中的结点的单元会被删除.
+    """
+    if isinstance(elements, list):
+        return np.vstack([np.zeros((0, 3), dtype=np.int64)] + [elements_to_triangles(e, node_ids) for e in elements])
+    elements = np.atleast_2d(np.asarray(elements, dtype=np.int64))
+    node_ids = np.asarray(node_ids, dtype=np.int64)
+    if elements.shape[1] == 4:
+        elements = np.vstack((elements[:, [0, 1, 2]], elements[:, [0, 2, 3]]))
+    order = np.argsort(node_ids)
+    pos = np.clip(np.searchsorted(node_ids[order], elements), 0, node_ids.size - 1)
+    found = (node_ids[order][pos] == elements).all(axis=1)
+    return order[pos[found]]
+
+
+def get_tri(x, y, boundary, holes=None, triangles=None):
+    """获取数据点的三角剖分，并用边界和孔洞掩去边界外和孔洞内的三角形，同一组数据点只剖分一次
+
+    Args:
+        x (numpy.array(1, n)): 数据点的横坐标值.
+        y (numpy.array(1, n)): 数据点的纵坐标值.
+        boundary (list): 边界点坐标的列表，需按顺时针或逆时针顺序排列，每个点是元组.
+        holes (list, optional): 所有孔洞边界坐标点数据，默认无孔洞.
+        triangles (numpy.array(k, 3), optional): 网格单元转换的三角形，见elements_to_triangles，默认无，即对数据点做Delaunay三角剖分.
+
+    Returns:
+        tri (matplotlib.tri.Triangulation): 掩去边界外和孔洞内三角形之后的三角剖分.
+    """
+    sha = hashlib.sha1(b'tri')
+    sha.update(np.column_stack((x, y)).astype(np.float64).tobytes())
+    sha.update(get_grid_key(boundary, holes).encode())
+    if triangles is not None:
+        sha.update(np.ascontiguousarray(triangles, dtype=np.int64).tobytes())
+    key = sha.hexdigest()
+    tri = _lru_get(_interp_cache, key)
+    if tri is not None:
+        return tri
+    tri = Triangulation(x, y, triangles)
+    # 三角形形心在边界外或孔洞内的三角形不参与绘图
+    cx = np.mean(tri.x[tri.triangles], axis=1)
+    cy = np.mean(tri.y[tri.triangles], axis=1)
+    tri.set_mask(get_mask(cx, cy, boundary, holes))
+    _lru_set(_interp_cache, key, tri, INTERP_CACHE_SIZE)
+    return tri
+
+
+def plot_contourf(X, Y, Z, **kwargs):
+    """绘制填色等值线图，X为三角剖分时（getContour的'tri'模式）直接在三角形上绘制
+
+    Args:
+        X (numpy.array(m, n) or matplotlib.tri.Triangulation): 网格点的横坐标或三角剖分.
+        Y (numpy.array(m, n)): 网格点的纵坐标，三角剖分时为None.
+        Z (numpy.array): 网格点或数据点上的数值.
+        **kwargs: 传给plt.contourf或plt.tricontourf的参数.
+
+    Returns:
+        Cd (matplotlib.contour.ContourSet): matplotlib图形句柄.
+    """
+    if isinstance(X, Triangulation):
+        return plt.tricontourf(X, Z, **kwargs)
+    return plt.contourf(X, Y, Z, **kwargs)
+
+
+def getContour(x, y, z, boundary, vmin=None, vmax=None, dpi=100, flag=1, num_float=1, method='cubic', numline=10, max_min='abs', color=0, baseP=0, Extrapolation=1, holes=None, fontsize=14, neighbors=50, triangles=None):
     """绘制等值线图
 
     Args:
@@ -195,62 +1377,50 @@ def getContour(x, y, z, boundary, vmin=None, vmax=None, dpi=100, flag=1, num_flo
         dpi (int, optional): 插值分辨率，默认为100，即插值出来100x100的网格.
         flag (int, optional): 是否绘图，默认为1，即绘图.
         num_float (int, optional): 等值线数值中显示小数点位数，默认为1.
-        method (str, optional): 插值方法，默认为'cubic'，即三次样条插值.
+        method (str, optional): 插值方法，默认为'cubic'，即三次样条插值；为'tri'时不插值到网格，直接在数据点的三角剖分上绘制等值线.
         numline (int or np.array(1, n), optional): 输入正整数则为等值线条数，输入数组则规定等值线数据，默认为10.
         max_min (str, optional): 标注极值点的类型，'max'为标注最大值点，'min'为标注最小值点，'abs'为标注绝对值最大值点，其他则为不标注，默认为'abs'.
         color (int, optional): 是否为等值线图上色，0为不上色，1为上色，默认为0.
         baseP (int, optional): 数据起始位置高度，默认为0.该参数是为了防止建基面上应力集中导致建基面上应力过大，绘制出来的等值线图不准确.
         Extrapolation (int, optional): 是否采用外插算法，0为不采用，1为采用，默认为1.
         holes (list, optional): 所有孔洞边界坐标点数据，列表里面的元素仍然是列表，每个列表代表一个孔洞边界；单个孔洞边界列表里是边界点元组，默认无孔洞.
+        fontsize (int, optional): 等值线数值和极值点数据的字体大小，默认为14.
+        neighbors (int, optional): 外插时每个网格点使用的最近数据点个数，默认为50；为None时采用全局径向基函数插值.
+        triangles (numpy.array(k, 3), optional): 'tri'模式下使用的网格单元三角形，见elements_to_triangles，默认无，即对数据点做Delaunay三角剖分.
 
     Returns:
-        X (numpy.array(m, n)): 插值后网格点的横坐标.
-        Y (numpy.array(m, n)): 插值后网格点的纵坐标.
-        Z (numpy.array(m, n)): 插值后网格点上的数值.
+        X (numpy.array(m, n)): 插值后网格点的横坐标，'tri'模式下为三角剖分(matplotlib.tri.Triangulation).
+        Y (numpy.array(m, n)): 插值后网格点的纵坐标，'tri'模式下为None.
+        Z (numpy.array(m, n)): 插值后网格点上的数值，'tri'模式下为数据点上的数值.
         hd (matplotlib.contour.QuadContourSet): matplotlib图形句柄，只有选择绘图时才会输出.
     """
     bd = np.array(boundary)
-    cmax = np.max(bd, axis=0)
-    cmin = np.min(bd, axis=0)
-    xi = np.linspace(cmin[0], cmax[0], dpi)
-    yi = np.linspace(cmin[1], cmax[1], dpi)
-    # idx = (x >= cmin[0]) * (x <= cmax[0]) * (y >= cmin[1]) * (y <= cmax[1])
-    # x, y, z = x[idx], y[idx], z[idx]
-
-    x = x[y >= baseP]
-    z = z[y >= baseP]
-    y = y[y >= baseP]
-    # xi = np.linspace(np.min(x), np.max(x), dpi)
-    # yi = np.linspace(np.min(y)+1, np.max(y), dpi)
-    X, Y = np.meshgrid(xi, yi)
-    if Extrapolation == 0:
-        Z = scipy.interpolate.griddata((x, y), z, (X, Y), method=method)
+    keep = y >= baseP
+    if triangles is not None:
+        # 删除包含被删去数据点的三角形，并重新编号
+        triangles = np.asarray(triangles)
+        triangles = (np.cumsum(keep) - 1)[triangles[keep[triangles].all(axis=1)]]
+    x = x[keep]
+    z = z[keep]
+    y = y[keep]
+    if method == 'tri':
+        X, Y, Z = get_tri(x, y, boundary, holes, triangles), None, z  # 直接用数据点的三角剖分，不插值到网格
+    elif Extrapolation == 0:
+        X, Y, mask = get_grid(boundary, holes, dpi)  # 获取插值网格和边界、孔洞掩膜
+        Z = apply_interp_op(get_interp_op(x, y, X, Y, method), z)  # 同一组数据点和网格复用插值算子
+        Z[mask] = np.nan  # 将边界外和孔洞内的网格点置为nan
     else:
-        func = scipy.interpolate.Rbf(x,y,z,function=method)
-        Z = func(X, Y)
-
-    bound = Polygon(boundary)
-    # pbar = tqdm.tqdm(range(xi.size), desc='wait', ncols=100)
-    if holes is None:
-        for i in range(xi.size):
-            for j in range(yi.size):
-                pp = Point(xi[i], yi[j])
-                if not bound.contains(pp):
-                    Z[j, i] = np.nan
-    else:
-        for i in range(xi.size):
-            for j in range(yi.size):
-                pp = Point(xi[i], yi[j])
-                if not bound.contains(pp):
-                    Z[j, i] = np.nan
-                for hole in holes:
-                    if Polygon(hole).contains(pp):
-                        Z[j, i] = np.nan
+        X, Y, mask = get_grid(boundary, holes, dpi)  # 获取插值网格和边界、孔洞掩膜
+        Z = np.full(X.shape, np.nan)
+        Z[~mask] = rbf_interp(x, y, z, X[~mask], Y[~mask], method=method, neighbors=neighbors)  # 只在边界内的网格点上外插
 
     if flag == 1:
-        hd = plt.contour(X, Y, Z, vmin=vmin, vmax=vmax, levels=numline, linestyles='-', colors='k', linewidths=1, zorder=1)
+        if method == 'tri':
+            hd = plt.tricontour(X, Z, vmin=vmin, vmax=vmax, levels=numline, linestyles='-', colors='k', linewidths=1, zorder=1)
+        else:
+            hd = plt.contour(X, Y, Z, vmin=vmin, vmax=vmax, levels=numline, linestyles='-', colors='k', linewidths=1, zorder=1)
         if color == 1:
-            Cd = plt.contourf(X, Y, Z, vmin=vmin, vmax=vmax, levels=numline, cmap='jet')
+            Cd = plot_contourf(X, Y, Z, vmin=vmin, vmax=vmax, levels=numline, cmap='jet')
         plt.plot(bd[:, 0], bd[:, 1], color='k', linewidth=2)
         if holes is not None:
             for hole in holes:
@@ -281,4 +1451,121 @@ def getContour(x, y, z, boundary, vmin=None, vmax=None, dpi=100, flag=1, num_flo
         plt.gca().set_axis_off()
         return X, Y, Z, hd
     else:
-        return X, Y, Z
\ No newline at end of file
+        return X, Y, Z
+
+
+def fig_spec(func, *args, extra=(), **kwargs):
+    """生成图片的绘图描述，图片在切换到该图或导出时才绘制
+
+    Args:
+        func (function): 绘图函数，须为模块级函数，返回值的第一个元素（或返回值本身）为图片，其余元素为重绘数据
+        *args: 位置参数，结点坐标数组可以用FIG_NODES占位
+        extra (list, optional): 附加在重绘数据末尾的数据，如等值线图的局部坐标系
+        **kwargs: 关键字参数
+
+    Returns:
+        spec (tuple): 绘图描述(func, args, kwargs, extra)
+    """
+    return (func, args, kwargs, list(extra))
+
+
+def fill_fig_nodes(args, nodes_data):
+    """把绘图参数中的FIG_NODES占位符替换为结点坐标数组
+
+    Args:
+        args (tuple): 位置参数
+        nodes_data (numpy.array(n, 4)): 所有结点的编号和坐标
+
+    Returns:
+        list: 替换后的位置参数
+    """
+    return [nodes_data if isinstance(arg, str) and arg == FIG_NODES else arg for arg in args]
+
+
+def split_fig_result(result, extra=()):
+    """把绘图函数的返回值拆分为图片和重绘数据，图片不在pyplot中保留，由图片显示框的缓存管理
+
+    Args:
+        result (tuple or plt.figure): 绘图函数的返回值
+        extra (list, optional): 附加在重绘数据末尾的数据
+
+    Returns:
+        fig (plt.figure): 图片句柄
+        fig_data (list): 重绘数据
+    """
+    if not isinstance(result, tuple):
+        result = (result,)
+    plt.close(result[0])
+    return result[0], list(result[1:]) + list(extra)
+
+
+def render_fig(spec, nodes_data=None):
+    """根据绘图描述绘制图片
+
+    Args:
+        spec (tuple): 绘图描述，见fig_spec
+        nodes_data (numpy.array(n, 4), optional): 替换FIG_NODES占位符的结点坐标数组，默认为None
+
+    Returns:
+        fig (plt.figure): 图片句柄
+        fig_data (list): 重绘数据
+    """
+    func, args, kwargs, extra = spec
+    result = func(*fill_fig_nodes(args, nodes_data), **kwargs)
+    return split_fig_result(result, extra)
+
+
+def save_fig(fpath, func, *args, **kwargs):
+    """绘制图片并直接保存为文件，用于在绘图子进程中导出不在缓存中的图片，图片不传回界面进程
+
+    Args:
+        fpath (string): 图片文件路径
+        func (function): 绘图函数，见fig_spec
+        *args: 位置参数
+        **kwargs: 关键字参数
+
+    Returns:
+        fpath (string): 图片文件路径
+    """
+    fig, _ = split_fig_result(func(*args, **kwargs))
+    fig.savefig(fpath, bbox_inches='tight')
+    return fpath
+
+
+def cache_fig(figs, idx, fig, keep=None, max_size=FIG_CACHE_SIZE):
+    """把已绘制的图片加入图片缓存，超出数量时移出最久没有显示的图片，需要时再根据绘图描述重新绘制
+
+    Args:
+        figs (OrderedDict): 图片缓存，键为图片序号
+        idx (int): 图片序号
+        fig (plt.figure): 图片句柄
+        keep (int, optional): 正在显示的图片序号，不会被移出，默认为None
+        max_size (int, optional): 缓存图片的最大数量，默认为FIG_CACHE_SIZE
+    """
+    figs[idx] = fig
+    figs.move_to_end(idx)
+    for key in list(figs):
+        if len(figs) <= max_size:
+            break
+        if key != keep and key != idx:
+            del figs[key]
+
+
+def contour_fig(xx, yy, zz, boundarys, **kwargs):
+    """在新图片中绘制各边界内的等值线图，用于位移包络图和重绘
+
+    Args:
+        xx (numpy.array(n)): 数据点的横坐标
+        yy (numpy.array(n)): 数据点的纵坐标
+        zz (numpy.array(n)): 数据点的值
+        boundarys (list): 边界列表，每个边界为结点坐标元组的列表
+        **kwargs: 传给getContour的参数
+
+    Returns:
+        fig (plt.figure): 图片句柄
+    """
+    fig = plt.figure(figsize=(6.1, 4.4))
+    for boundary in boundarys:
+        getContour(xx, yy, zz, boundary, **kwargs)
+    plt.tight_layout()
+    return fig
@@ -1,6 +1,9 @@
 import numpy as np
+import itertools
+import os
 import tqdm
 import pandas as pd
+from functions import get_node_coords, read_field_csv, read_frames_csv, get_force_key, get_cached_forces, set_cached_forces, kanghua_sweep
 
 
 def nodes2xyz(nodeP, nodeQ, nodeR):
@@ -23,6 +26,41 @@ def nodes2xyz(nodeP, nodeQ, nodeR):
     return vec_x, vec_y, vec_z
 
 
+def get_section_frame(coordinate_nodes, nodes_data=None):
+    """求局部坐标系（剖面、滑面的*ORIENTATION）的原点和三个基准单位向量，每个坐标系只需计算一次，之后用to_section转换坐标.
+
+    Args:
+        coordinate_nodes (numpy.array): 局部坐标系，如果为一维数组，则表示确定局部坐标系的三个结点的编号；如果为二维数组，则表示三个结点的坐标。三个结点依次为x轴上的结点、xy平面上的结点和坐标原点.
+        nodes_data (numpy.array(n, 4), optional): 总结点坐标列表，第一列为结点编号，后三列分别为xyz坐标值，局部坐标系给的是结点编号时才需要.
+
+    Returns:
+        frame (numpy.array(4, 3)): 第一行为原点坐标，后三行依次为x、y、z方向单位向量.
+    """
+    coordinate_nodes = np.asarray(coordinate_nodes)
+    if coordinate_nodes.ndim == 1:  # 局部坐标系给的是结点编号
+        nodeQ, nodeR, nodeP = get_node_coords(nodes_data, coordinate_nodes)
+    else:
+        nodeQ, nodeR, nodeP = coordinate_nodes[0, :], coordinate_nodes[1, :], coordinate_nodes[2, :]
+    return np.vstack([nodeP, *nodes2xyz(nodeP, nodeQ, nodeR)])
+
+
+def to_section(frame, nodes, nodes_data=None):
+    """将结点转换为局部坐标系xy平面上的坐标，所有结点一次矩阵乘法完成.
+
+    Args:
+        frame (numpy.array(4, 3)): 局部坐标系，见get_section_frame.
+        nodes (numpy.array): 需要转换的结点，一维数组表示结点编号（需要nodes_data），二维数组表示结点坐标.
+        nodes_data (numpy.array(n, 4), optional): 总结点坐标列表，第一列为结点编号，后三列分别为xyz坐标值.
+
+    Returns:
+        numpy.array(n, 2): 转换后的坐标数组.
+    """
+    nodes = np.asarray(nodes)
+    if nodes.ndim < 2 and nodes_data is not None:  # 结点编号
+        nodes = get_node_coords(nodes_data, np.atleast_1d(nodes))
+    return (np.atleast_2d(nodes) - frame[0]).dot(frame[1:3].T)
+
+
 def get_vec_xyz(node_id, nodes_data):
     """根据坐标系结点编号，从总结点坐标列表里求坐标系三个基准单位向量.
 
@@ -33,10 +71,21 @@ def get_vec_xyz(node_id, nodes_data):
     Returns:
         numpy.array(1, 3): 坐标系的三个基准单位向量.
     """
-    nodeP = nodes_data[nodes_data[:, 0] == node_id[2]][0, 1:]
-    nodeQ = nodes_data[nodes_data[:, 0] == node_id[0]][0, 1:]
-    nodeR = nodes_data[nodes_data[:, 0] == node_id[1]][0, 1:]
-    return nodes2xyz(nodeP, nodeQ, nodeR)
+    frame = get_section_frame(node_id, nodes_data)
+    return frame[1], frame[2], frame[3]
+
+
+def get_plane_normals(orientations, nodes_data=None):
+    """由各滑面的*ORIENTATION坐标系求各滑面的单位法向量，即各坐标系的z方向.
+
+    Args:
+        orientations (list): 各滑面的局部坐标系，每个为三个结点的编号或坐标，见get_section_frame.
+        nodes_data (numpy.array(n, 4), optional): 总结点坐标列表，局部坐标系给的是结点编号时才需要.
+
+    Returns:
+        vec_ns (numpy.array(滑面数, 3)): 各滑面单位法向量.
+    """
+    return np.array([get_vec_xyz(orientation, nodes_data)[2] for orientation in orientations])
 
 
 def get_area_norm(area, vec_n):
@@ -50,37 +99,73 @@ def get_area_norm(area, vec_n):
         area_norm (numpy.array(n, 2)): 结点面积数组，第一列为结点编号，第二列为结点面积.
     """
     area = area[np.argsort(area[:, 0])]
-    area_norm = np.zeros((area.shape[0], 2))
-    for i in range(area.shape[0]):
-        area_norm[i, 0] = area[i, 0]
-        area_norm[i, 1] = np.abs(vec_n.dot(area[i, 1:]))
+    area_norm = np.column_stack([area[:, 0], np.abs(area[:, 1:].dot(vec_n))])
     return area_norm
 
 
+STRE_COLUMNS = ['node', 'S11', 'S22', 'S33', 'S12', 'S13', 'S23']  # 应力数据表中结点编号和六个应力分量的列名
+TENSOR_INDEX = np.array([[0, 3, 4], [3, 1, 5], [4, 5, 2]])  # 六个应力分量(S11, S22, S33, S12, S13, S23)组成应力张量的序号
+
+
+def get_traction(S, vec_n, vec_t):
+    """根据应力分量批量求平面上的法向应力和沿平面上某个向量方向的切向应力.
+
+    Args:
+        S (numpy.array(..., 6)): 应力分量，最后一维依次为S11、S22、S33、S12、S13、S23，前面可以是任意维（如帧数、结点数）.
+        vec_n (numpy.array(1, 3)): 平面的单位法向量.
+        vec_t (numpy.array(1, 3)): 平面上的一个单位向量.
+
+    Returns:
+        sigma_n (numpy.array(...)): 法向应力.
+        sigma_t (numpy.array(...)): 沿vec_t方向的切向应力.
+    """
+    sigma = S[..., TENSOR_INDEX]  # 应力张量，(..., 3, 3)
+    sigma_e = np.einsum('...ij,j->...i', sigma, vec_n)  # 平面上的应力矢量
+    sigma_n = sigma_e.dot(vec_n)
+    sigma_t = (sigma_e - sigma_n[..., None] * vec_n).dot(vec_t)
+    return sigma_n, sigma_t
+
+
+def get_node_area(node_id, area):
+    """按结点编号批量查找结点面积.
+
+    Args:
+        node_id (numpy.array(...)): 结点编号，可以是任意形状.
+        area (numpy.array(m, 2)): 结点面积数组，第一列为结点编号，第二列为法向面积.
+
+    Returns:
+        numpy.array(...): 各结点的面积，形状与node_id相同.
+    """
+    order = np.argsort(area[:, 0], kind='stable')
+    labels = area[order, 0]
+    pos = np.clip(np.searchsorted(labels, node_id), 0, labels.size - 1)
+    missing = labels[pos] != node_id
+    if np.any(missing):
+        raise KeyError('Node %d has no area' % node_id[missing][0])
+    return area[order[pos], 1]
+
+
 def get_SF_WP(stre_data, area,  vec_n, vec_t):
     """根据某个平面上各点的应力，求作用在该平面上的法向反力和沿着平面上某个向量方向的反力.
 
     Args:
-        stre_data (pandas.Dataframe): 应力数据表.
+        stre_data (pandas.Dataframe or numpy.array(..., n, 7)): 应力数据表，或依次为结点编号和S11、S22、S33、S12、S13、S23的数组，
+            数组前面可以多一维帧数（见get_stre_frames），此时一次求出所有帧的反力.
         area (numpy.array(n, 2)): 结点面积数组，第一列为结点编号，第二列为法向面积.
         vec_n (numpy.array(1, 3)): 该平面的单位法向量.
         vec_t (numpy.array(1, 3)): 该平面上的一个单位向量.
 
     Returns:
-        W (float): 作用在该平面上的法向反力.
-        P (float): 作用在该平面上沿某个向量方向的反力.
-    """
-    W, P = 0, 0
-    for i in range(area.shape[0]):
-        sigma = np.array([[stre_data.iloc[i]['S11'], stre_data.iloc[i]['S12'], stre_data.iloc[i]['S13']],
-                        [stre_data.iloc[i]['S12'], stre_data.iloc[i]['S22'], stre_data.iloc[i]['S23']],
-                        [stre_data.iloc[i]['S13'], stre_data.iloc[i]['S23'], stre_data.iloc[i]['S33']]])
-        A = area[area[:, 0] == stre_data.iloc[i]['node']][0, 1]
-        sigma_e = vec_n.dot(sigma)
-        sigma_n = sigma_e.dot(vec_n)
-        sigma_t = (sigma_e - sigma_n * vec_n).dot(vec_t)
-        W -= sigma_n * A
-        P += sigma_t * A
+        W (float or numpy.array(帧数)): 作用在该平面上的法向反力.
+        P (float or numpy.array(帧数)): 作用在该平面上沿某个向量方向的反力.
+    """
+    if isinstance(stre_data, pd.DataFrame):
+        stre_data = stre_data[STRE_COLUMNS].to_numpy(dtype=np.float64)
+    stre = stre_data[..., :area.shape[0], :]  # 取与面积数组结点数相同的前几个结点
+    A = get_node_area(stre[..., 0], area)
+    sigma_n, sigma_t = get_traction(stre[..., 1:], vec_n, vec_t)
+    W = -np.sum(sigma_n * A, axis=-1)
+    P = np.sum(sigma_t * A, axis=-1)
     return W, P
 
 
@@ -93,18 +178,66 @@ def get_stre_data(file_path):
     Returns:
         pandas.Dataframe: 按结点编号排序后的表格数据.
     """
-    stre_data = pd.read_csv(file_path, encoding='gbk')
-    stre_data.rename(columns={'      结点编号': 'node', '         S-S11': 'S11', '         S-S22': 'S22', '         S-S33': 'S33', '         S-S12': 'S12', '         S-S13': 'S13', '         S-S23': 'S23'}, inplace=True)
-    stre_data.drop_duplicates(subset='node', keep='first', inplace=True)
+    stre_data = read_field_csv(file_path, drop_duplicates=True)
+    stre_data.rename(columns={'S-S11': 'S11', 'S-S22': 'S22', 'S-S33': 'S33', 'S-S12': 'S12', 'S-S13': 'S13', 'S-S23': 'S23'}, inplace=True)
     return stre_data.sort_values(by='node')
 
 
+def get_stre_frames(file_path, frames=None):
+    """读取多帧应力表格，得到各帧各结点的应力数组.
+
+    Args:
+        file_path (string): 表格文件的路径.
+        frames (int, slice or numpy.array, optional): 需要读取的帧，可以是某一帧、时间窗口或间隔取帧，默认为None，即所有帧.
+
+    Returns:
+        numpy.array(帧数, 结点数, 7): 各帧各结点的应力，7列分别为结点编号和S11、S22、S33、S12、S13、S23.
+    """
+    return read_frames_csv(file_path, ['node', 'S-S11', 'S-S22', 'S-S33', 'S-S12', 'S-S13', 'S-S23'], frames)
+
+
+def to_stre_frames(stre_data):
+    """把多帧应力数据转换为(帧数, 结点数, 7)的数组.
+
+    Args:
+        stre_data (pandas.Dataframe or numpy.array(帧数, 结点数, 7)): 用pandas.read_csv直接读取的多帧应力数据表（各帧之间有重复的表头行），
+            或get_stre_frames得到的数组.
+
+    Returns:
+        numpy.array(帧数, 结点数, 7): 各帧各结点的应力，7列分别为结点编号和S11、S22、S33、S12、S13、S23.
+    """
+    if not isinstance(stre_data, pd.DataFrame):
+        return np.asarray(stre_data, dtype=np.float64)
+    is_header = (stre_data['X'] == 'X').to_numpy()  # 重复的表头行
+    numstep = int(np.sum(is_header)) + 1
+    stre = stre_data.loc[~is_header, STRE_COLUMNS].apply(pd.to_numeric).to_numpy(dtype=np.float64)
+    return stre.reshape(numstep, -1, len(STRE_COLUMNS))
+
+
+def unique_frame_nodes(stre, sort_nodes=False):
+    """去掉各帧中重复的结点，只保留每个结点第一次出现的行，各帧结点顺序相同.
+
+    Args:
+        stre (numpy.array(帧数, 结点数, 7)): 各帧各结点的应力.
+        sort_nodes (bool, optional): 是否按结点编号排序（与get_stre_data相同），默认为False，即保持原来的顺序.
+
+    Returns:
+        numpy.array(帧数, 不重复结点数, 7): 去重后的应力.
+    """
+    _, first = np.unique(stre[0, :, 0], return_index=True)
+    if sort_nodes:
+        return stre[:, first]
+    if first.size == stre.shape[1]:
+        return stre
+    return stre[:, np.sort(first)]
+
+
 def kanghua(W, P, A, f, c, phi=1.0, gamma_0=1.1, gamma_d=1.5, gamma_f=1.7, gamma_c=2.0):
     """根据法向力和切向力以及抗滑参数计算抗滑稳定安全系数.
 
     Args:
-        W (float or numpy.array(1, 2)): 两个滑面的法向作用力.
-        P (float or numpy.array(1, 2)): 切向作用力.
+        W (float or numpy.array(..., 2)): 两个滑面的法向作用力，前面可以多一维帧数，此时逐帧求安全系数.
+        P (float or numpy.array(..., 2)): 切向作用力.
         A (float or numpy.array(1, 2)): 面积.
         f (float or numpy.array(1, 2)): 摩擦系数.
         c (float or numpy.array(1, 2)): 凝聚力系数.
@@ -115,13 +248,13 @@ def kanghua(W, P, A, f, c, phi=1.0, gamma_0=1.1, gamma_d=1.5, gamma_f=1.7, gamma
         gamma_c (float): 粘聚力材料性能分项系数，取2.0.
 
     Returns:
-        result (float): 抗滑稳定安全系数，大于1表示校核通过.
+        result (float or numpy.array(帧数)): 抗滑稳定安全系数，大于1表示校核通过.
     """
     ff = f / gamma_f
     cc = c / gamma_c    
     R = 1e6 * cc * A + ff * (W > 0) * W
     # result = np.sum(R) / (np.abs(np.sum(P)) * gamma_0 * phi * gamma_d)
-    result = np.sum(R) / (np.sum(np.abs(P)) * gamma_0 * phi * gamma_d)
+    result = np.sum(R, axis=-1) / (np.sum(np.abs(P), axis=-1) * gamma_0 * phi * gamma_d)
     return result
 
 
@@ -160,12 +293,157 @@ def kanghua3D_2P_static(stre_data1, stre_data2, area_data1, area_data2, vec_n1,
     return K
 
 
+def get_stress_weights(vec_n, vec_t):
+    """求把六个应力分量换算为法向应力和切向应力的系数，即sigma_n = S.dot(wn)，sigma_t = S.dot(wt).
+
+    Args:
+        vec_n (numpy.array(..., 3)): 平面的单位法向量，前面可以多一维滑面数.
+        vec_t (numpy.array(..., 3)): 平面上的单位向量（滑动方向）.
+
+    Returns:
+        wn (numpy.array(..., 6)): 法向应力系数.
+        wt (numpy.array(..., 6)): 切向应力系数.
+    """
+    def weights(a, b):
+        m = np.einsum('...i,...j->...ij', a, b)  # a_i * b_j，乘以应力张量后求和即为a.sigma.b
+        return np.stack([m[..., 0, 0], m[..., 1, 1], m[..., 2, 2], m[..., 0, 1] + m[..., 1, 0], m[..., 0, 2] + m[..., 2, 0], m[..., 1, 2] + m[..., 2, 1]], axis=-1)
+
+    vec_n = np.asarray(vec_n, dtype=np.float64)
+    vec_t = np.asarray(vec_t, dtype=np.float64)
+    wn = weights(vec_n, vec_n)
+    wt = weights(vec_t, vec_n) - np.sum(vec_n * vec_t, axis=-1)[..., None] * wn
+    return wn, wt
+
+
+def get_plane_resultant(file_path, area_data, vec_n, sort_nodes=False):
+    """读取滑面应力表格，求各帧按结点面积加权的应力分量之和，结果按表格文件和积分参数缓存.
+
+    滑面上的法向力和任意方向的切向力都是这六个分量的线性组合（见get_stress_weights），与滑动方向无关，只需积分一次.
+
+    Args:
+        file_path (string): 滑面应力表格文件路径，可以是单帧或多帧表格.
+        area_data (numpy.array(n, 4)): 结点面积数组，第一列为结点编号，后三列分别为三方向面积值.
+        vec_n (numpy.array(1, 3)): 滑面单位法向量.
+        sort_nodes (bool, optional): 是否先按结点编号排序，静力工况取True（与kanghua3D_2P_static相同），动力工况取False.
+
+    Returns:
+        SA (numpy.array(帧数, 6)): 各帧S11、S22、S33、S12、S13、S23乘以结点面积之和.
+        A (float): 滑面面积.
+    """
+    key = get_force_key(file_path, area_data, vec_n, [sort_nodes])
+    resultant = get_cached_forces(key)
+    if resultant is None:
+        area = get_area_norm(area_data, vec_n)
+        stre = unique_frame_nodes(get_stre_frames(file_path), sort_nodes)[:, :area.shape[0]]  # 取与面积数组结点数相同的前几个结点
+        A = get_node_area(stre[0, :, 0], area)
+        resultant = (np.einsum('fnk,n->fk', stre[..., 1:], A), np.sum(area[:, 1]))
+        set_cached_forces(key, resultant)
+    return resultant
+
+
+def get_plane_forces(file_path, area_data, vec_n, vec_t, sort_nodes=False):
+    """读取滑面应力表格并积分得到各帧的法向力、切向力和滑面面积.
+
+    Args:
+        file_path (string): 滑面应力表格文件路径，可以是单帧或多帧表格.
+        area_data (numpy.array(n, 4)): 结点面积数组，第一列为结点编号，后三列分别为三方向面积值.
+        vec_n (numpy.array(1, 3)): 滑面单位法向量.
+        vec_t (numpy.array(1, 3)): 滑块滑动方向单位向量.
+        sort_nodes (bool, optional): 是否先按结点编号排序，静力工况取True（与kanghua3D_2P_static相同），动力工况取False.
+
+    Returns:
+        W (numpy.array(帧数)): 各帧作用在滑面上的法向反力.
+        P (numpy.array(帧数)): 各帧作用在滑面上沿滑动方向的反力.
+        A (float): 滑面面积.
+    """
+    SA, A = get_plane_resultant(file_path, area_data, vec_n, sort_nodes)
+    wn, wt = get_stress_weights(vec_n, vec_t)
+    return -SA.dot(wn), SA.dot(wt), A
+
+
+def get_wedge_resultant(file_paths, area_datas, vec_ns, sort_nodes=False):
+    """求多滑面滑块各滑面各帧按结点面积加权的应力分量之和，见get_plane_resultant.
+
+    Args:
+        file_paths (list): 各滑面应力表格文件路径.
+        area_datas (list): 各滑面结点面积数组，每个为numpy.array(n, 4)，第一列为结点编号，后三列分别为三方向面积值.
+        vec_ns (numpy.array(滑面数, 3)): 各滑面单位法向量.
+        sort_nodes (bool, optional): 是否先按结点编号排序，静力工况取True，动力工况取False.
+
+    Returns:
+        SA (numpy.array(滑面数, 帧数, 6)): 各滑面各帧S11、S22、S33、S12、S13、S23乘以结点面积之和.
+        A (numpy.array(滑面数)): 各滑面面积.
+    """
+    resultants = [get_plane_resultant(fpath, area_data, vec_n, sort_nodes) for fpath, area_data, vec_n in zip(file_paths, area_datas, vec_ns)]
+    numsteps = [SA.shape[0] for SA, _ in resultants]
+    if len(set(numsteps)) > 1:
+        raise ValueError('Sliding planes have different numbers of frames: %s' % ', '.join('%s has %d' % (os.path.basename(fpath), num) for fpath, num in zip(file_paths, numsteps)))
+    SA = np.stack([SA for SA, _ in resultants])
+    A = np.array([area for _, area in resultants])
+    return SA, A
+
+
+def get_wedge_forces(file_paths, area_datas, vec_ns, vec_t=None, sort_nodes=False):
+    """求多滑面滑块各帧各滑面的法向力、切向力和各滑面面积，所有滑面一起做张量运算.
+
+    Args:
+        file_paths (list): 各滑面应力表格文件路径.
+        area_datas (list): 各滑面结点面积数组，每个为numpy.array(n, 4)，第一列为结点编号，后三列分别为三方向面积值.
+        vec_ns (list): 各滑面单位法向量，可由各滑面的*ORIENTATION坐标系用get_vec_xyz求得.
+        vec_t (numpy.array(1, 3), optional): 滑块滑动方向单位向量，默认为None，即取前两个滑面法向量叉乘的单位向量.
+        sort_nodes (bool, optional): 是否先按结点编号排序，静力工况取True，动力工况取False.
+
+    Returns:
+        W (numpy.array(帧数, 滑面数)): 各帧各滑面的法向作用力.
+        P (numpy.array(帧数, 滑面数)): 各帧各滑面沿滑动方向的作用力.
+        A (numpy.array(滑面数)): 各滑面面积.
+    """
+    vec_ns = np.asarray(vec_ns, dtype=np.float64)
+    if vec_t is None:
+        if vec_ns.shape[0] < 2:
+            raise ValueError('Sliding direction is required for a single plane')
+        vec_t = np.cross(vec_ns[0], vec_ns[1])
+        vec_t /= np.linalg.norm(vec_t)
+    SA, A = get_wedge_resultant(file_paths, area_datas, vec_ns, sort_nodes)
+    wn, wt = get_stress_weights(vec_ns, vec_t)  # (滑面数, 6)
+    W = -np.einsum('pfk,pk->fp', SA, wn)
+    P = np.einsum('pfk,pk->fp', SA, wt)
+    return W, P, A
+
+
+def kanghua3D_2P_sweep(file_path1, file_path2, area_data1, area_data2, vec_n1, vec_n2, vec_t, f, c, phi=1.0, gamma_0=1.1, gamma_d=1.5, gamma_f=1.7, gamma_c=2.0, static=True):
+    """三维滑块双滑面抗滑稳定安全系数的参数敏感性分析，滑面作用力只积分一次.
+
+    Args:
+        file_path1 (string): 滑面1应力表格文件路径.
+        file_path2 (string): 滑面2应力表格文件路径.
+        area_data1 (numpy.array(n, 4)): 滑面1结点面积数组，第一列为结点编号，后三列分别为三方向面积值.
+        area_data2 (numpy.array(n, 4)): 滑面2结点面积数组，第一列为结点编号，后三列分别为三方向面积值.
+        vec_n1 (numpy.array(1, 3)): 滑面1单位法向量.
+        vec_n2 (numpy.array(1, 3)): 滑面2单位法向量.
+        vec_t (numpy.array(1, 3)): 滑块滑动方向单位向量.
+        f (list): 滑面1、2的摩擦系数，每个元素为单个值或一组需要扫描的值.
+        c (list): 滑面1、2的凝聚力系数，格式同f.
+        phi (float or list): 设计状况系数，持久状况取1.0，偶然状况取0.85.
+        gamma_0 (float or list): 结构重要性系数,分级I级取1.1.
+        gamma_d (float or list): 抗滑稳定结构系数，静力工况取1.5，动力工况取0.65.
+        gamma_f (float or list): 摩擦系数材料性能分项系数，取1.7.
+        gamma_c (float or list): 粘聚力材料性能分项系数，取2.0.
+        static (bool, optional): 是否为静力工况，默认为True；动力工况时'K'列为时程中的最小值.
+
+    Returns:
+        table (pandas.Dataframe): 参数敏感性表格，见kanghua_sweep.
+    """
+    W, P, A = get_wedge_forces([file_path1, file_path2], [area_data1, area_data2], [vec_n1, vec_n2], vec_t, sort_nodes=static)
+    return kanghua_sweep(W, P, A, f, c, phi, gamma_0, gamma_d, gamma_f, gamma_c)
+
+
 def kanghua3D_2P_dyn(stre_data1, stre_data2, area_data1, area_data2, vec_n1, vec_n2, vec_t, f, c, phi=0.85, gamma_0=1.1, gamma_d=0.65, gamma_f=1.7, gamma_c=2.0):
     """求解动力工况三维滑块双滑面抗滑稳定安全系数.
 
     Args:
-        stre_data1 (pandas.Dataframe): 滑面1结点应力数据表.
-        stre_data2 (pandas.Dataframe): 滑面2结点应力数据表.
+        stre_data1 (numpy.array(帧数, 结点数, 7) or pandas.Dataframe): 滑面1各帧结点应力（见get_stre_frames和to_stre_frames）.
+        stre_data2 (numpy.array(帧数, 结点数, 7) or pandas.Dataframe): 滑面2各帧结点应力.
         area_data1 (numpy.array(n, 4)): 滑面1结点面积数组，第一列为结点编号，后三列分别为三方向面积值.
         area_data2 (numpy.array(n, 4)): 滑面2结点面积数组，第一列为结点编号，后三列分别为三方向面积值.
         vec_n1 (numpy.array(1, 3)): 滑面1单位法向量.
@@ -189,39 +467,147 @@ def kanghua3D_2P_dyn(stre_data1, stre_data2, area_data1, area_data2, vec_n1, vec
     area2 = get_area_norm(area_data2, vec_n2)
     A = np.array([np.sum(area1[:, 1]), np.sum(area2[:, 1])])
 
-    i = 0
-    while stre_data1.iloc[i]['X'] != 'X':
-        i += 1
-    numnode1 = i
-    numstep1 = int((len(stre_data1) + 1) / (numnode1 + 1))
+    stre1 = unique_frame_nodes(to_stre_frames(stre_data1))
+    stre2 = unique_frame_nodes(to_stre_frames(stre_data2))
+    numstep = min(stre1.shape[0], stre2.shape[0])
+    if stre1.shape[0] != stre2.shape[0]:
+        print('不同面的计算步数不一样！')
 
-    i = 0
-    while stre_data2.iloc[i]['X'] != 'X':
-        i += 1
-    numnode2 = i
-    numstep2 = int((len(stre_data2) + 1) / (numnode2 + 1))
+    # 一次求出所有帧两个滑面的作用力，W、P为(帧数, 2)
+    W1, P1 = get_SF_WP(stre1[:numstep], area1, vec_n1, vec_t)
+    W2, P2 = get_SF_WP(stre2[:numstep], area2, vec_n2, vec_t)
+    W = np.column_stack([W1, W2])
+    P = np.column_stack([P1, P2])
+    K = kanghua(W, P, A, f, c, phi, gamma_0, gamma_d, gamma_f, gamma_c)
+    fail_time = int(np.sum(K < 1.0))
+    return K, fail_time
 
-    if numstep1 != numstep2:
-        print('不同面的计算步数不一样！')
 
-    K_list = []
-    fail_time = 0
-    # pbar = tqdm.tqdm(range(numstep1), desc='Calculate', ncols=100)
-    name_list = ['node', 'S11', 'S22', 'S33', 'S12', 'S13', 'S23']
-    for step in range(numstep1):
-        stre1 = stre_data1.iloc[step * (numnode1 + 1) : (step + 1) * (numnode1 + 1) - 1]
-        stre1.drop_duplicates(subset='node', keep='first', inplace=True)
-        stre2 = stre_data2.iloc[step * (numnode2 + 1) : (step + 1) * (numnode2 + 1) - 1]
-        stre2.drop_duplicates(subset='node', keep='first', inplace=True)
-        for name in name_list:
-            stre1[name] = pd.to_numeric(stre1[name])
-            stre2[name] = pd.to_numeric(stre2[name])
-        W1, P1 = get_SF_WP(stre1, area1, vec_n1, vec_t)
-        W2, P2 = get_SF_WP(stre2, area2, vec_n2, vec_t)
-        W = np.array([W1, W2])
-        P = np.array([P1, P2])
-        K = kanghua(W, P, A, f, c, phi, gamma_0, gamma_d, gamma_f, gamma_c)
-        K_list.append(K)
-        if K < 1.0:
-            fail_time += 1
-    return np.array(K_list), fail_time
\ No newline at end of file
+def kanghua3D_NP_static(file_paths, area_datas, orientations, f, c, nodes_data=None, vec_t=None, phi=1.0, gamma_0=1.1, gamma_d=1.5, gamma_f=1.7, gamma_c=2.0):
+    """求解静力工况三维滑块多滑面抗滑稳定安全系数，滑面数不限.
+
+    Args:
+        file_paths (list): 各滑面应力表格文件路径.
+        area_datas (list): 各滑面结点面积数组，每个为numpy.array(n, 4)，第一列为结点编号，后三列分别为三方向面积值.
+        orientations (list): 各滑面的*ORIENTATION局部坐标系，每个为三个结点的编号或坐标，见get_section_frame，滑面法向量为坐标系的z方向.
+        f (float or list): 摩擦系数，传入列表时分别代表各滑面的摩擦系数.
+        c (float or list): 凝聚力系数，传入列表时分别代表各滑面的凝聚力系数.
+        nodes_data (numpy.array(n, 4), optional): 总结点坐标列表，局部坐标系给的是结点编号时才需要.
+        vec_t (numpy.array(1, 3), optional): 滑块滑动方向单位向量，默认为None，即取前两个滑面法向量叉乘的单位向量.
+        phi (float): 设计状况系数，持久状况取1.0，偶然状况取0.85.
+        gamma_0 (float): 结构重要性系数,分级I级取1.1.
+        gamma_d (float): 抗滑稳定结构系数，静力工况取1.5，动力工况取0.65.
+        gamma_f (float): 摩擦系数材料性能分项系数，取1.7.
+        gamma_c (float): 粘聚力材料性能分项系数，取2.0.
+
+    Returns:
+        K (float): 抗滑稳定安全系数，大于1表示校核通过.
+    """
+    vec_ns = get_plane_normals(orientations, nodes_data)
+    W, P, A = get_wedge_forces(file_paths, area_datas, vec_ns, vec_t, sort_nodes=True)
+    K = kanghua(W[0], P[0], A, np.array(f), np.array(c), phi, gamma_0, gamma_d, gamma_f, gamma_c)
+    return K
+
+
+def kanghua3D_NP_dyn(file_paths, area_datas, orientations, f, c, nodes_data=None, vec_t=None, phi=0.85, gamma_0=1.1, gamma_d=0.65, gamma_f=1.7, gamma_c=2.0):
+    """求解动力工况三维滑块多滑面抗滑稳定安全系数时程，滑面数不限，所有帧所有滑面一起计算.
+
+    Args:
+        file_paths (list): 各滑面多帧应力表格文件路径.
+        area_datas (list): 各滑面结点面积数组，每个为numpy.array(n, 4)，第一列为结点编号，后三列分别为三方向面积值.
+        orientations (list): 各滑面的*ORIENTATION局部坐标系，每个为三个结点的编号或坐标，见get_section_frame，滑面法向量为坐标系的z方向.
+        f (float or list): 摩擦系数，传入列表时分别代表各滑面的摩擦系数.
+        c (float or list): 凝聚力系数，传入列表时分别代表各滑面的凝聚力系数.
+        nodes_data (numpy.array(n, 4), optional): 总结点坐标列表，局部坐标系给的是结点编号时才需要.
+        vec_t (numpy.array(1, 3), optional): 滑块滑动方向单位向量，默认为None，即取前两个滑面法向量叉乘的单位向量.
+        phi (float): 设计状况系数，持久状况取1.0，偶然状况取0.85.
+        gamma_0 (float): 结构重要性系数,分级I级取1.1.
+        gamma_d (float): 抗滑稳定结构系数，静力工况取1.5，动力工况取0.65.
+        gamma_f (float): 摩擦系数材料性能分项系数，取1.7.
+        gamma_c (float): 粘聚力材料性能分项系数，取2.0.
+
+    Returns:
+        K (numpy.array(1, n)): 抗滑稳定安全系数，大于1表示校核通过.
+        fail_time (int): 不通过的数据点个数.
+    """
+    vec_ns = get_plane_normals(orientations, nodes_data)
+    W, P, A = get_wedge_forces(file_paths, area_datas, vec_ns, vec_t, sort_nodes=False)
+    K = kanghua(W, P, A, np.array(f), np.array(c), phi, gamma_0, gamma_d, gamma_f, gamma_c)
+    fail_time = int(np.sum(K < 1.0))
+    return K, fail_time
+
+
+def get_shear_resultant(SA, vec_ns):
+    """由各滑面应力分量之和求各滑面的法向力和切向力矢量.
+
+    Args:
+        SA (numpy.array(滑面数, 帧数, 6)): 各滑面各帧按结点面积加权的应力分量之和，见get_wedge_resultant.
+        vec_ns (numpy.array(滑面数, 3)): 各滑面单位法向量.
+
+    Returns:
+        W (numpy.array(帧数, 滑面数)): 各帧各滑面的法向作用力.
+        tau (numpy.array(帧数, 滑面数, 3)): 各帧各滑面的切向作用力矢量，沿任意方向t的切向力为tau.dot(t).
+    """
+    sigma_e = np.einsum('pfij,pj->fpi', SA[..., TENSOR_INDEX], vec_ns)  # 滑面上的合力矢量
+    sigma_n = np.einsum('fpi,pi->fp', sigma_e, vec_ns)
+    tau = sigma_e - sigma_n[..., None] * vec_ns
+    return -sigma_n, tau
+
+
+def critical_direction(tau, vec_m=None):
+    """求使各滑面切向力绝对值之和最大（即安全系数最小）的滑动方向.
+
+    sum(|tau_p.dot(t)|)对单位向量t的最大值等于各滑面切向力矢量取正负号组合后合矢量长度的最大值，
+    方向即该合矢量的方向，因此只需比较2^(滑面数-1)种符号组合，计算量与结点数无关.
+
+    Args:
+        tau (numpy.array(帧数, 滑面数, 3)): 各帧各滑面的切向作用力矢量，见get_shear_resultant.
+        vec_m (numpy.array(1, 3), optional): 滑动方向需要垂直的单位向量（如各层面共同的法向量），默认为None，即不限制.
+
+    Returns:
+        vec_t (numpy.array(帧数, 3)): 各帧的最危险滑动方向单位向量.
+        P_sum (numpy.array(帧数)): 各帧沿该方向的各滑面切向力绝对值之和.
+    """
+    num_plane = tau.shape[1]
+    signs = np.array(list(itertools.product([1.0, -1.0], repeat=num_plane - 1))).reshape(2 ** (num_plane - 1), num_plane - 1)
+    signs = np.column_stack([np.ones(signs.shape[0]), signs])  # 第一个滑面固定取正号，t与-t等价
+    V = np.einsum('sp,fpi->fsi', signs, tau)  # (帧数, 符号组合数, 3)
+    if vec_m is not None:
+        vec_m = np.asarray(vec_m, dtype=np.float64)
+        V = V - V.dot(vec_m)[..., None] * vec_m
+    norm = np.linalg.norm(V, axis=-1)
+    idx = np.argmax(norm, axis=1)
+    frames = np.arange(tau.shape[0])
+    P_sum = norm[frames, idx]
+    vec_t = V[frames, idx] / np.where(P_sum > 0, P_sum, 1.0)[:, None]
+    return vec_t, P_sum
+
+
+def kanghua3D_critical(file_paths, area_datas, vec_ns, f, c, vec_m=None, phi=1.0, gamma_0=1.1, gamma_d=1.5, gamma_f=1.7, gamma_c=2.0, static=True):
+    """求最危险滑动方向及该方向的抗滑稳定安全系数，适用于单滑面、多个层面等滑动方向不确定的情况.
+
+    Args:
+        file_paths (list): 各滑面应力表格文件路径.
+        area_datas (list): 各滑面结点面积数组，每个为numpy.array(n, 4)，第一列为结点编号，后三列分别为三方向面积值.
+        vec_ns (list): 各滑面单位法向量，可由各滑面的*ORIENTATION坐标系用get_vec_xyz求得.
+        f (float or list): 摩擦系数，传入列表时分别代表各滑面的摩擦系数.
+        c (float or list): 凝聚力系数，传入列表时分别代表各滑面的凝聚力系数.
+        vec_m (numpy.array(1, 3), optional): 滑动方向需要垂直的单位向量，默认为None，即不限制；单滑面时不限制即在滑面内搜索.
+        phi (float): 设计状况系数，持久状况取1.0，偶然状况取0.85.
+        gamma_0 (float): 结构重要性系数,分级I级取1.1.
+        gamma_d (float): 抗滑稳定结构系数，静力工况取1.5，动力工况取0.65.
+        gamma_f (float): 摩擦系数材料性能分项系数，取1.7.
+        gamma_c (float): 粘聚力材料性能分项系数，取2.0.
+        static (bool, optional): 是否为静力工况，默认为True；动力工况逐帧求最危险方向.
+
+    Returns:
+        vec_t (numpy.array(帧数, 3)): 各帧的最危险滑动方向单位向量，静力工况帧数为1.
+        K (numpy.array(帧数)): 各帧沿最危险方向的抗滑稳定安全系数.
+    """
+    vec_ns = np.asarray(vec_ns, dtype=np.float64)
+    SA, A = get_wedge_resultant(file_paths, area_datas, vec_ns, sort_nodes=static)
+    W, tau = get_shear_resultant(SA, vec_ns)
+    vec_t, _ = critical_direction(tau, vec_m)
+    P = np.einsum('fpi,fi->fp', tau, vec_t)
+    K = kanghua(W, P, A, np.array(f), np.array(c), phi, gamma_0, gamma_d, gamma_f, gamma_c)
+    return vec_t, K
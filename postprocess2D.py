@@ -1,6 +1,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
+import itertools
 from matplotlib import cm
 cmp = cm.get_cmap('jet')
 cmp.set_under('w')
@@ -8,7 +9,56 @@ import seaborn as sns
 sns.set_style('ticks')
 sns.set_context('notebook')
 plt.rcParams['font.sans-serif'] = 'Arial'
-from functions import getContour
+from functions import getContour, plot_contourf, get_node_coords, read_field_csv, read_frames_csv, iter_frames_csv, get_envelope, absolute_frames, get_force_key, get_cached_forces, set_cached_forces, kanghua_sweep, elements_to_triangles
+
+
+def get_tributary_length(node, X):
+    """求层面各结点的从属长度，重复的结点只保留第一次出现的，结点按横坐标排序
+
+    Args:
+        node (numpy.array(n)): 结点编号
+        X (numpy.array(n)): 结点横坐标
+
+    Returns:
+        idx (numpy.array(m)): 去重并排序后的结点在原数组中的序号
+        A (numpy.array(m)): 各结点的从属长度
+    """
+    _, first = np.unique(node, return_index=True)
+    first = np.sort(first)
+    idx = first[np.argsort(X[first])]
+    X = X[idx]
+    A = np.zeros_like(X)
+    A[1 : -1] = (X[2:] - X[:-2]) / 2
+    A[0] = (X[1] - X[0]) / 2
+    A[-1] = (X[-1] - X[-2]) / 2
+    return idx, A
+
+
+def kanghua_frames(S22, S12, A, f, c, phi, gamma_0, gamma_d, gamma_f, gamma_c):
+    """根据层面结点应力和从属长度计算二维层面抗滑稳定安全系数，可以一次计算多帧
+
+    Args:
+        S22 (numpy.array(..., n)): 结点法向应力，前面可以多一维帧数
+        S12 (numpy.array(..., n)): 结点切向应力
+        A (numpy.array(n)): 结点从属长度，见get_tributary_length
+        f (float): 抗剪断参数f'
+        c (float): 抗剪断参数c'
+        phi (float): 设计状况系数，持久状况取1.0，偶然状况取0.85.
+        gamma_0 (float): 结构重要性系数,分级I级取1.1.
+        gamma_d (float): 抗滑稳定结构系数，静力工况取1.5，动力工况取0.65.
+        gamma_f (float): 摩擦系数材料性能分项系数，取1.7.
+        gamma_c (float): 粘聚力材料性能分项系数，取2.0.
+
+    Returns:
+        result (float or numpy.array(帧数)): 抗滑稳定安全系数，大于1表示校核通过.
+    """
+    f = f / gamma_f
+    c = c / gamma_c
+    R = np.sum(S22 * A, axis=-1)
+    S = np.sum(S12 * A, axis=-1)
+    R = c * np.sum(A) * 1.0e6 - f * np.minimum(0.0, R)
+    result = R / (np.abs(S) * gamma_0 * phi * gamma_d)
+    return result
 
 
 def kanghua(data, f, c, phi, gamma_0, gamma_d, gamma_f, gamma_c):
@@ -27,57 +77,93 @@ def kanghua(data, f, c, phi, gamma_0, gamma_d, gamma_f, gamma_c):
     Returns:
         result (float): 抗滑稳定安全系数，大于1表示校核通过.
     """
-    f /= gamma_f
-    c /= gamma_c    
-    data.drop_duplicates(subset='node', keep='first', inplace=True)
-    data['X'] = pd.to_numeric(data['X'])
-    data = data.sort_values(by='X')
-    X = np.array(data['X']).astype(np.float64)
-    S22 = np.array(data['S-S22']).astype(np.float64)
-    S12 = np.array(data['S-S12']).astype(np.float64)
-    A = np.zeros_like(X)
-    A[1 : -1] = (X[2:] - X[:-2]) / 2
-    A[0] = (X[1] - X[0]) / 2
-    A[-1] = (X[-1] - X[-2]) / 2
-    R = np.sum(S22 * A)
-    S = np.sum(S12 * A)
-    R = c * np.sum(A) * 1.0e6 - f * np.min([0.0, R])
-    result = R / (np.abs(S) * gamma_0 * phi * gamma_d)
-    return result
-    
+    node = pd.to_numeric(data['node']).to_numpy(dtype=np.float64)
+    X = pd.to_numeric(data['X']).to_numpy(dtype=np.float64)
+    idx, A = get_tributary_length(node, X)
+    S22 = pd.to_numeric(data['S-S22']).to_numpy(dtype=np.float64)[idx]
+    S12 = pd.to_numeric(data['S-S12']).to_numpy(dtype=np.float64)[idx]
+    return kanghua_frames(S22, S12, A, f, c, phi, gamma_0, gamma_d, gamma_f, gamma_c)
 
-def sta_disp_contour(fname, boundary, direc='X'):
+
+def get_slide_forces(fname):
+    """读取层面应力表格并积分得到各帧的法向力、切向力和层面长度，结果按表格文件缓存
+
+    Args:
+        fname (string): 抗滑稳定数据文件路径，可以是静力（单帧）或动力（多帧）表格
+
+    Returns:
+        W (numpy.array(帧数, 1)): 各帧层面法向作用力，受压为正
+        P (numpy.array(帧数, 1)): 各帧层面切向作用力
+        A (numpy.array(1)): 层面长度
+    """
+    key = get_force_key(fname)
+    forces = get_cached_forces(key)
+    if forces is None:
+        data = read_frames_csv(fname, ['node', 'X', 'S-S22', 'S-S12'])
+        idx, A = get_tributary_length(data[0, :, 0], data[0, :, 1])
+        S22, S12 = np.ascontiguousarray(data[:, idx, 2:].transpose(2, 0, 1))
+        W = -np.sum(S22 * A, axis=-1)
+        P = np.sum(S12 * A, axis=-1)
+        forces = (W[:, None], P[:, None], np.array([np.sum(A)]))
+        set_cached_forces(key, forces)
+    return forces
+
+
+def slide_sweep(fname, f, c, phi=1.0, gamma_0=1.1, gamma_d=1.5, gamma_f=1.7, gamma_c=2.0):
+    """二维层面抗滑稳定安全系数的参数敏感性分析，层面作用力只积分一次
+
+    Args:
+        fname (string): 抗滑稳定数据文件路径，可以是静力或动力表格
+        f (float or list): 抗剪断参数f'，单个值或一组需要扫描的值
+        c (float or list): 抗剪断参数c'，单个值或一组需要扫描的值
+        phi (float or list): 设计状况系数，持久状况取1.0，偶然状况取0.85.
+        gamma_0 (float or list): 结构重要性系数,分级I级取1.1.
+        gamma_d (float or list): 抗滑稳定结构系数，静力工况取1.5，动力工况取0.65.
+        gamma_f (float or list): 摩擦系数材料性能分项系数，取1.7.
+        gamma_c (float or list): 粘聚力材料性能分项系数，取2.0.
+
+    Returns:
+        table (pandas.Dataframe): 参数敏感性表格，见kanghua_sweep
+    """
+    W, P, A = get_slide_forces(fname)
+    return kanghua_sweep(W, P, A, f, c, phi, gamma_0, gamma_d, gamma_f, gamma_c)
+
+
+def sta_disp_contour(fname, boundary, direc='X', method='cubic', elements=None):
     """绘制静力位移等值线图
 
     Args:
         fname (string): 静力位移数据文件路径
         boundary (list): 边界列表，每个元素是一个元组，表示结点坐标，结点按逆时针或者顺时针排序
         direc (string): 位移方向，分X向和Y向，默认为'X'.
+        method (string): 插值方法，'tri'表示不插值到网格，直接在结点三角剖分上绘制等值线，默认为'cubic'
+        elements (list, optional): 'tri'模式下使用的网格单元，见read_plane_elements，默认为None，即对结点做Delaunay三角剖分
 
     Returns:
         fig (plt.figure): 图片句柄
         xxU (np.array(n)): 数据点的横坐标数组
         yyU (np.array(n)): 数据点的纵坐标数组
         zzU (np.array(n)): 数据点的值
+        triangles (np.array(k, 3)): 网格单元转换的三角形，没有网格单元时为None，重绘时沿用
     """
-    disp_data = pd.read_csv(fname, encoding='gbk')
-    disp_data.rename(columns={'      结点编号': 'node', '          U-U1': 'U-U1', '          U-U2': 'U-U2'}, inplace=True)
+    disp_data = read_field_csv(fname)
     xxU = np.array(disp_data['X'])
     yyU = np.array(disp_data['Y'])
     if direc == 'X':
         zzU = np.array(disp_data['U-U1'] * 100)
     else:
         zzU = np.array(disp_data['U-U2'] * 100)
+    triangles = None if elements is None else elements_to_triangles(elements, disp_data['node'])
     fig = plt.figure(figsize=(6.1, 4.4))
     try:
-        X, Y, ZU, hd = getContour(xxU, yyU, zzU, boundary, dpi=100, Extrapolation=0)
+        X, Y, ZU, hd = getContour(xxU, yyU, zzU, boundary, dpi=100, Extrapolation=0, method=method, triangles=triangles)
     except:
-        X, Y, ZU, hd = getContour(xxU, yyU, zzU, boundary, dpi=100, Extrapolation=1)
+        X, Y, ZU, hd = getContour(xxU, yyU, zzU, boundary, dpi=100, Extrapolation=1, method=method, triangles=triangles)
     plt.tight_layout()
-    return fig, xxU, yyU, zzU
+    return fig, xxU, yyU, zzU, triangles
 
 
-def sta_stre_contour(fname, boundary, component='Smax', max_min='abs'):
+def sta_stre_contour(fname, boundary, component='Smax', max_min='abs', method='cubic', elements=None):
     """绘制静力应力等值线图
 
     Args:
@@ -85,16 +171,17 @@ def sta_stre_contour(fname, boundary, component='Smax', max_min='abs'):
         boundary (list): 边界列表，每个元素是一个元组，表示结点坐标，结点按逆时针或者顺时针排序
         component (string): 应力分量，Smax表示大主应力，Smin表示小主应力，默认为Smax
         max_min (string): 极值点显示类别，abs表示显示绝对值最大，max表示最大值，min表示最小值，默认为abs
+        method (string): 插值方法，'tri'表示不插值到网格，直接在结点三角剖分上绘制等值线，默认为'cubic'
+        elements (list, optional): 'tri'模式下使用的网格单元，见read_plane_elements，默认为None，即对结点做Delaunay三角剖分
 
     Returns:
         fig (plt.figure): 图片句柄
         xxS (np.array(n)): 数据点的横坐标数组
         yyS (np.array(n)): 数据点的纵坐标数组
         zzS (np.array(n)): 数据点的值
+        triangles (np.array(k, 3)): 网格单元转换的三角形，没有网格单元时为None，重绘时沿用
     """
-    stre_data = pd.read_csv(fname, encoding='gbk')
-    stre_data.rename(columns={'      结点编号': 'node'}, inplace=True)
-    stre_data.drop_duplicates(subset='node', keep='first', inplace=True)
+    stre_data = read_field_csv(fname, drop_duplicates=True)
     xxS = np.array(stre_data['X'])
     yyS = np.array(stre_data['Y'])
     if component == 'Smax':
@@ -103,13 +190,14 @@ def sta_stre_contour(fname, boundary, component='Smax', max_min='abs'):
     elif component == 'Smin':
         zzS = np.array(stre_data['S-Min. In-Plane Principal'] / 1e6)
         max_min = 'min'
+    triangles = None if elements is None else elements_to_triangles(elements, stre_data['node'])
     fig = plt.figure(figsize=(6.1, 4.4))
     try:
-        X, Y, ZS, hd = getContour(xxS, yyS, zzS, boundary, dpi=100, Extrapolation=1, max_min=max_min)
+        X, Y, ZS, hd = getContour(xxS, yyS, zzS, boundary, dpi=100, Extrapolation=1, max_min=max_min, method=method, triangles=triangles)
     except:
-        X, Y, ZS, hd = getContour(xxS, yyS, zzS, boundary, dpi=100, Extrapolation=0, max_min=max_min)
+        X, Y, ZS, hd = getContour(xxS, yyS, zzS, boundary, dpi=100, Extrapolation=0, max_min=max_min, method=method, triangles=triangles)
     plt.tight_layout()
-    return fig, xxS, yyS, zzS
+    return fig, xxS, yyS, zzS, triangles
 
 
 def sta_slide(fname, ff, cc, phi=1.0, gamma_0=1.1, gamma_d=1.5, gamma_f=1.7, gamma_c=2.0):
@@ -131,19 +219,20 @@ def sta_slide(fname, ff, cc, phi=1.0, gamma_0=1.1, gamma_d=1.5, gamma_f=1.7, gam
     Returns:
         result (float): 抗滑稳定安全系数，大于1表示校核通过.
     """
-    data0 = pd.read_csv(fname, encoding='gbk')
-    data0.rename(columns={'      结点编号': 'node', '         S-S22': 'S-S22', '         S-S12': 'S-S12'}, inplace=True)
+    data0 = read_field_csv(fname)
     result = kanghua(data=data0, f=ff, c=cc, phi=phi, gamma_0=gamma_0, gamma_d=gamma_d, gamma_f=gamma_f, gamma_c=gamma_c)
     return result
 
 
-def dmgt_contour(fname, boundary, fontsize=16):
+def dmgt_contour(fname, boundary, fontsize=16, method='cubic', elements=None):
     """绘制损伤分布图
 
     Args:
         fname (string): 损伤数据文件路径
         boundary (list): 边界列表，每个元素是一个元组，表示结点坐标，结点按逆时针或者顺时针排序
         fontsize (int, optional): 极值点数据字体大小，默认为16.
+        method (string): 插值方法，'tri'表示不插值到网格，直接在结点三角剖分上绘制等值线，默认为'cubic'
+        elements (list, optional): 'tri'模式下使用的网格单元，见read_plane_elements，默认为None，即对结点做Delaunay三角剖分
 
     Returns:
         fig (plt.figure): 图片句柄
@@ -151,17 +240,17 @@ def dmgt_contour(fname, boundary, fontsize=16):
         yy (np.array(n)): 数据点的纵坐标数组
         damage (np.array(n)): 数据点的值
     """
-    damage_data = pd.read_csv(fname, encoding='gbk')
-    damage_data.rename(columns={'      结点编号': 'node', '       DAMAGET': 'damage'}, inplace=True)
-    damage_data.drop_duplicates(subset='node', keep='first', inplace=True)
+    damage_data = read_field_csv(fname, drop_duplicates=True)
+    damage_data.rename(columns={'DAMAGET': 'damage'}, inplace=True)
     xx = np.array(damage_data['X'])
     yy = np.array(damage_data['Y'])
     damage = np.array(damage_data['damage'])
     damage[damage > 1.0] = 1.0
 
+    triangles = None if elements is None else elements_to_triangles(elements, damage_data['node'])
     fig = plt.figure(figsize=(6.1, 4.4))
-    X, Y, vdamage = getContour(xx, yy, damage, boundary, baseP=-100, flag=0)
-    Cd = plt.contourf(X, Y, vdamage, vmin=0.2, cmap=cmp, levels=np.linspace(0.0, 1.0, 11))
+    X, Y, vdamage = getContour(xx, yy, damage, boundary, baseP=-100, flag=0, method=method, triangles=triangles)
+    Cd = plot_contourf(X, Y, vdamage, vmin=0.2, cmap=cmp, levels=np.linspace(0.0, 1.0, 11))
     bd = np.array(boundary)
     cmax = np.max(bd, axis=0)
     cmin = np.min(bd, axis=0)
@@ -236,58 +325,52 @@ def acc_history(fname, node, direc, PGA=None, fontsize=16):
     return fig, t, acc
 
 
-def dyn_disp(fname, ref_node='0,0', nodes=None):
+def dyn_disp(fname, ref_node='0,0', nodes=None, stream=False, frames=None, return_frames=False):
     """动力位移数据处理
 
     Args:
         fname (string): 动力位移数据文件路径
         ref_node (string, optional): 参考结点坐标或者编号，默认为'0,0'，输入一个整数则表示编号，输入一个坐标则表示坐标.
         nodes (numpy.array(n, 3), optional): 所有结点的坐标，默认为None，当ref_node为结点编号时才需要用到.
+        stream (bool, optional): 是否逐帧读取数据计算包络，内存中只保留一帧数据，默认为False.
+        frames (int, slice or numpy.array, optional): 参与计算包络的帧，可以是某一帧、时间窗口或间隔取帧，默认为None，即所有帧.
+        return_frames (bool, optional): 是否同时返回各结点各方向出现最大、最小位移的帧序号，默认为False.
 
     Returns:
         disp_max (numpy.array(n, 2)): 最大位移包络数据
         disp_min (numpy.array(n, 2)): 最小位移包络数据
         xx (numpy.array(n)): 数据结点的横坐标
         yy (numpy.array(n)): 数据结点的纵坐标
+        frame_max (numpy.array(n, 2)): 出现最大位移的帧在表格中的序号，只有return_frames为True时返回
+        frame_min (numpy.array(n, 2)): 出现最小位移的帧在表格中的序号，只有return_frames为True时返回
     """
-    disp_data = pd.read_csv(fname, encoding='gbk')
-    # 获取结点数
-    num_node = 0
-    while disp_data.iloc[num_node]['X'] != 'X':
-        num_node += 1
-    # 获取帧数
-    frames = int(len(disp_data) / (num_node + 1))
-    # 将位移数据整理成三维数组
-    disp = []
-    for i in range(frames):
-        a = np.array(disp_data.iloc[(num_node + 1)*i : (num_node + 1)*(i+1)-1, 4:7]).astype(float)
-        b = np.array(disp_data.iloc[(num_node + 1)*i : (num_node + 1)*(i+1)-1, 11:13]).astype(float)
-        c = np.concatenate((a, b), axis=1)
-        disp.append(c)
-    disp = np.array(disp)
-    # 减去参考点（一般是坝踵）位移，求相对位移
+    selected = frames  # 所选的帧，用于把包络的帧序号换算为表格中的帧序号
+    columns = ['node', 'X', 'Y', 'U-U1', 'U-U2']  # 结点编号、坐标和位移
+    if stream:
+        frames = iter_frames_csv(fname, columns, frames)
+        first = next(frames)
+        frames = itertools.chain([first], frames)
+    else:
+        frames = read_frames_csv(fname, columns, frames)
+        first = frames[0]
+    # 找到参考点（一般是坝踵）
     if nodes is not None and ',' in ref_node:  # 如果输入是一个坐标
         ref = ref_node.split(',')
         ref = [float(val) for val in ref]
-        org_node = np.where((disp[0, :, 1] - ref[0]) ** 2 + (disp[0, :, 2] - ref[1]) ** 2 < 1)
-        org_node = np.min(org_node)
-        for i in range(disp.shape[0]):
-            disp[i, :, 3:] -= disp[i, org_node, 3:]
     else:  # 如果输入是一个结点编号
-        ref = nodes[nodes[:, 0] == int(ref_node)][0, 1:]
-        org_node = np.where((disp[0, :, 1] - ref[0]) ** 2 + (disp[0, :, 2] - ref[1]) ** 2 < 1)
-        org_node = np.min(org_node)
-        for i in range(disp.shape[0]):
-            disp[i, :, 3:] -= disp[i, org_node, 3:]
-    # 求最大最小位移包络
-    disp_max = np.max(disp[:, :, 3 : 5], axis=0)
-    disp_min = np.min(disp[:, :, 3 : 5], axis=0)
-    xx = disp[0, :, 1]
-    yy = disp[0, :, 2]
+        ref = get_node_coords(nodes, int(ref_node))
+    org_node = np.where((first[:, 1] - ref[0]) ** 2 + (first[:, 2] - ref[1]) ** 2 < 1)
+    org_node = np.min(org_node)
+    # 减去参考点位移求相对位移，并求最大最小位移包络
+    disp_max, disp_min, idx_max, idx_min = get_envelope((frame[:, 3:] for frame in frames), ref_row=org_node)
+    xx = first[:, 1]
+    yy = first[:, 2]
+    if return_frames:
+        return disp_max, disp_min, xx, yy, absolute_frames(fname, selected, idx_max), absolute_frames(fname, selected, idx_min)
     return disp_max, disp_min, xx, yy
 
 
-def dyn_S_env_contour(fname, boundary, component='Smax', max_min='abs'):
+def dyn_S_env_contour(fname, boundary, component='Smax', max_min='abs', method='cubic', elements=None):
     """绘制动力大小主应力包络图
 
     Args:
@@ -295,29 +378,31 @@ def dyn_S_env_contour(fname, boundary, component='Smax', max_min='abs'):
         boundary (list): 边界列表，每个元素是一个元组，表示结点坐标，结点按逆时针或者顺时针排序
         component (string, optional): 应力分量，Smax表示大主应力，Smin表示小主应力，默认为Smax
         max_min (string, optional): 极值点显示类别，abs表示显示绝对值最大，max表示最大值，min表示最小值，默认为abs
+        method (string): 插值方法，'tri'表示不插值到网格，直接在结点三角剖分上绘制等值线，默认为'cubic'
+        elements (list, optional): 'tri'模式下使用的网格单元，见read_plane_elements，默认为None，即对结点做Delaunay三角剖分
 
     Returns:
         fig (plt.figure): 图片句柄
         xxS (np.array(n)): 数据点的横坐标数组
         yyS (np.array(n)): 数据点的纵坐标数组
         zzS (np.array(n)): 数据点的值
+        triangles (np.array(k, 3)): 网格单元转换的三角形，没有网格单元时为None，重绘时沿用
     """
-    stre_data = pd.read_csv(fname, encoding='gbk')
-    stre_data.rename(columns={'      结点编号': 'node'}, inplace=True)
-    stre_data.drop_duplicates(subset='node', keep='first', inplace=True)
+    stre_data = read_field_csv(fname, drop_duplicates=True)
     xxS = np.array(stre_data['X'])
     yyS = np.array(stre_data['Y'])
     if component == 'Smax':
         zzS = np.array(stre_data['S_max-Max. In-Plane Principal'] / 1e6)
     elif component == 'Smin':
         zzS = np.array(stre_data['S_min-Min. In-Plane Principal'] / 1e6)
+    triangles = None if elements is None else elements_to_triangles(elements, stre_data['node'])
     fig = plt.figure(figsize=(6.1, 4.4))
     try:
-        X, Y, ZS, hd = getContour(xxS, yyS, zzS, boundary, dpi=100, Extrapolation=1, max_min=max_min)
+        X, Y, ZS, hd = getContour(xxS, yyS, zzS, boundary, dpi=100, Extrapolation=1, max_min=max_min, method=method, triangles=triangles)
     except:
-        X, Y, ZS, hd = getContour(xxS, yyS, zzS, boundary, dpi=100, Extrapolation=0, max_min=max_min)
+        X, Y, ZS, hd = getContour(xxS, yyS, zzS, boundary, dpi=100, Extrapolation=0, max_min=max_min, method=method, triangles=triangles)
     plt.tight_layout()
-    return fig, xxS, yyS, zzS
+    return fig, xxS, yyS, zzS, triangles
 
 
 def dyn_slide(fname, ff, cc, phi=0.85, gamma_0=1.1, gamma_d=0.65, gamma_f=1.7, gamma_c=2.0, dt=0.01, fontsize=16):
@@ -359,24 +444,14 @@ def dyn_slide(fname, ff, cc, phi=0.85, gamma_0=1.1, gamma_d=0.65, gamma_f=1.7, g
         yd (numpy.array(n)): 抗滑稳定安全系数数组
         fail_time (float): 抗滑稳定安全校核不通过时长
     """
-    data = pd.read_csv(fname, encoding='gbk')
-    data.rename(columns={'      结点编号': 'node', '         S-S22': 'S-S22', '         S-S12': 'S-S12'}, inplace=True)
-    # 获取层面结点数量
-    i = 0
-    while data.iloc[i]['X'] != 'X':
-        i += 1
-    numnode = i
-    # 获取帧数
-    numstep = int((len(data) + 1) / (numnode + 1))
-    yd = []
-    fail_time = 0
-    for step in range(numstep):
-        datai = data.iloc[step * (numnode + 1) : (step + 1) * (numnode + 1) - 1]  # 当前帧的数据表格
-        ydi = kanghua(data=datai, f=ff, c=cc, phi=phi, gamma_0=gamma_0, gamma_d=gamma_d, gamma_f=gamma_f, gamma_c=gamma_c)
-        if ydi < 1.0:
-            fail_time += 1
-        yd.append(ydi)
-    fail_time *= dt
+    data = read_frames_csv(fname, ['node', 'X', 'S-S22', 'S-S12'])  # (帧数, 结点数, 4)
+    numstep = data.shape[0]
+    # 结点位置各帧相同，只用第一帧求一次从属长度和排序
+    idx, A = get_tributary_length(data[0, :, 0], data[0, :, 1])
+    # 每帧的应力连续存放，逐帧求和的顺序与单帧计算时相同
+    S22, S12 = np.ascontiguousarray(data[:, idx, 2:].transpose(2, 0, 1))
+    yd = kanghua_frames(S22, S12, A, ff, cc, phi, gamma_0, gamma_d, gamma_f, gamma_c)
+    fail_time = np.sum(yd < 1.0) * dt
     t = np.arange(0, dt * numstep, dt)
     idx = np.argmin(yd)
     # 绘图
@@ -1,6 +1,11 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
+import os
+import itertools
+import re
+import multiprocessing
+from collections import OrderedDict
 from matplotlib import cm
 cmp = cm.get_cmap('jet')
 cmp.set_under('w')
@@ -8,113 +13,182 @@ import seaborn as sns
 sns.set_style('ticks')
 sns.set_context('notebook')
 plt.rcParams['font.sans-serif'] = 'Arial'
-from functions import getContour
+from functions import getContour, plot_contourf, get_node_coords, read_field_csv, read_frames_csv, iter_frames_csv, get_envelope, absolute_frames, get_nearest_dist, load_geo_file, interp_fields, _lru_get, _lru_set, FIG_NODES, fill_fig_nodes, set_grid_cache_dir
 from kanghua3D import *
 
 
-def read_joint_dat_sta(fname):
+CONTACT_STATUS = {'CL': '0', 'OP': '1'}  # .dat文件中接触状态的数值表示，CL为闭合，OP为张开
+SECTION_GEO_CACHE_SIZE = 256  # 几何信息在局部坐标系下坐标的内存缓存的最大数量
+_section_geo_cache = OrderedDict()  # 几何信息在局部坐标系下坐标的内存缓存，键为文件、局部坐标系和结点数组
+FIG_WORKERS = max(1, (os.cpu_count() or 2) - 1)  # 绘图子进程数，留一个核给界面
+FIG_POLL_INTERVAL = 100  # 界面检查绘图任务是否完成的时间间隔(ms)
+_fig_worker_nodes = None  # 绘图子进程中的结点坐标数组
+
+
+def read_contact_block(dat_file):
+    """读取.dat文件中一个CONTACT OUTPUT块的数据，文件指针位于CONTACT OUTPUT标题行之后
+
+    Args:
+        dat_file (file): 已打开的.dat文件
+
+    Returns:
+        copen (numpy.array(n, m)): 接触面各结点的数据，第二列为接触状态，0为闭合，1为张开
+    """
+    for i in range(5):
+        line = dat_file.readline()
+    rows = []
+    while line.strip() != '':
+        rows.append(line)
+        line = dat_file.readline()
+    tokens = ''.join(rows).split()
+    copen = np.array([CONTACT_STATUS.get(token, token) for token in tokens], dtype=np.float64)
+    return copen.reshape(len(rows), -1)
+
+
+def index_dat(fname):
+    """建立.dat文件的字节位置索引，记录每个分析步、增量步和CONTACT OUTPUT块在文件中的位置
+
+    索引保存在.dat文件旁边的.idx.npz文件中，.dat文件大小和修改时间不变时直接读取索引.
+
+    Args:
+        fname (string): odb结果文件对应的.dat文件
+
+    Returns:
+        index (dict): 字节位置索引，包括:
+            'steps' (numpy.array(n, 2)): 每个分析步的编号和标题行位置
+            'increments' (numpy.array(m, 2)): 每个增量步所在的分析步编号和INCREMENT SUMMARY行位置
+            'contacts' (numpy.array(k, 3)): 每个CONTACT OUTPUT块所在的分析步编号、增量步序号（之前没有增量步时为-1）和标题行位置
+            'titles' (numpy.array(k)): 每个CONTACT OUTPUT块的标题行
+    """
+    stat = os.stat(fname)
+    index_path = fname + '.idx.npz'
+    if os.path.exists(index_path):
+        try:
+            with np.load(index_path) as data:
+                if tuple(data['signature']) == (stat.st_size, stat.st_mtime_ns):
+                    return {key: data[key] for key in ('steps', 'increments', 'contacts', 'titles')}
+        except (OSError, ValueError, KeyError):  # 索引文件损坏则重新建立
+            pass
+    steps, increments, contacts, titles = [], [], [], []
+    step = 0
+    offset = 0
+    with open(fname, 'rb') as dat_file:
+        for line in dat_file:
+            if b'S T E P' in line:
+                match = re.search(rb'S T E P +(\d+)', line)
+                if match is not None:
+                    step = int(match.group(1))
+                    steps.append((step, offset))
+            elif b'INCREMENT' in line and b'SUMMARY' in line:
+                increments.append((step, offset))
+            elif b'CONTACT OUTPUT' in line:
+                contacts.append((step, len(increments) - 1, offset))
+                titles.append(line.decode('gbk', errors='ignore').rstrip('\r\n') + '\n')
+            offset += len(line)
+    index = {'steps': np.array(steps, dtype=np.int64).reshape(-1, 2),
+             'increments': np.array(increments, dtype=np.int64).reshape(-1, 2),
+             'contacts': np.array(contacts, dtype=np.int64).reshape(-1, 3),
+             'titles': np.array(titles, dtype=str)}
+    try:
+        with open(index_path, 'wb') as f:
+            np.savez(f, signature=np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64), **index)
+    except OSError:  # 结果文件夹不可写时不保存索引
+        pass
+    return index
+
+
+def select_joints(titles, joints=None):
+    """从CONTACT OUTPUT块标题中选出需要读取的横缝
+
+    Args:
+        titles (numpy.array(n)): 一个增量步中所有CONTACT OUTPUT块的标题行
+        joints (list, optional): 横缝名称列表，默认为None，即全部横缝
+
+    Returns:
+        numpy.array: 选中横缝在增量步中的序号
+    """
+    if joints is None:
+        return np.arange(len(titles))
+    return np.array([i for i, title in enumerate(titles) if any(joint.upper() in title for joint in joints)], dtype=np.int64)
+
+
+def read_joint_dat_sta(fname, step=4, joints=None):
     """读取静力.dat文件中的横缝开度数据
 
     Args:
         fname (string): odb结果文件对应的.dat文件
+        step (int, optional): 读取的分析步编号，一般是最后一个分析步，默认为4
+        joints (list, optional): 需要读取的横缝名称列表，默认为None，即读取全部横缝
 
     Returns:
         copen_data (list): 所有横缝的开度数据数组列表
         copen_id (list): 所有横缝的标签
     """
+    index = index_dat(fname)
+    rows = np.nonzero(index['contacts'][:, 0] == step)[0]
+    rows = rows[select_joints(index['titles'][rows], joints)]
+    copen_data = []
+    copen_id = []
     with open(fname, encoding='gbk') as dat_file:
-        line = dat_file.readline()
-        while 'S T E P       4' not in line:  # 最后一个分析步，如果分析步更多则要修改
-            line = dat_file.readline()
-        copen_data = []
-        copen_id = []
-        while 'ANALYSIS COMPLETE' not in line:
-            if 'CONTACT OUTPUT' in line:
-                copen_id.append(line)
-                copen = []
-                for i in range(5):
-                    line = dat_file.readline()
-                while line not in ['\n','\r\n']:
-                    line = line.replace('CL', '0').replace('OP', '1')
-                    line = line.split()
-                    copen.append(line)
-                    line = dat_file.readline()
-                copen = np.array(copen).astype(np.float64)
-                copen_data.append(copen)
-            else:
-                line = dat_file.readline()
-        dat_file.close()
+        for row in rows:
+            dat_file.seek(index['contacts'][row, 2])  # 直接跳到该CONTACT OUTPUT块
+            copen_id.append(dat_file.readline())
+            copen_data.append(read_contact_block(dat_file))
     return copen_data, copen_id
 
 
-def read_joint_dat_dyn(fname):
+def read_joint_dat_dyn(fname, step=4, joints=None, increments=None):
     """读取动力.dat文件中的横缝开度数据
 
     Args:
         fname (string): odb结果文件对应的.dat文件
+        step (int, optional): 动力分析前的静力分析步编号，其横缝数据作为第一帧，之后分析步中每个有CONTACT OUTPUT的增量步为一帧，默认为4
+        joints (list, optional): 需要读取的横缝名称列表，默认为None，即读取全部横缝
+        increments (slice or numpy.array, optional): 需要读取的动力增量步序号（从0开始），只计有CONTACT OUTPUT的增量步，默认为None，即读取全部增量步
 
     Returns:
-        copen_data (list): 所有横缝的开度数据数组列表
+        copen_data (list): 所有横缝的开度数据数组列表，每个数组为(结点数, 数据列数, 帧数)
         copen_id (list): 所有横缝的标签
+
+    Raises:
+        ValueError: 某个增量步的CONTACT OUTPUT块数与静力分析步的横缝数不一致.
     """
+    index = index_dat(fname)
+    contacts = index['contacts']
+    # 静力分析步的横缝数据
+    rows = np.nonzero(contacts[:, 0] == step)[0]
+    num_joint = len(rows)
+    selected = select_joints(index['titles'][rows], joints)
+    rows = rows[selected]
+    # 之后分析步中有CONTACT OUTPUT的增量步，接触输出频率大于1时并非每个增量步都有输出
+    inc_rows = np.nonzero(contacts[:, 0] > step)[0]
+    dyn_incs, inc_first, inc_count = np.unique(contacts[inc_rows, 1], return_index=True, return_counts=True)
+    bad = np.nonzero(inc_count != num_joint)[0]
+    if len(bad) > 0:
+        raise ValueError('%s: increment %d has %d CONTACT OUTPUT blocks, expected %d' % (fname, dyn_incs[bad[0]] + 1, inc_count[bad[0]], num_joint))
+    if increments is not None:
+        inc_first = inc_first[increments]
+    num_frame = len(inc_first) + 1  # 每条横缝的帧数，即静力分析步和选中增量步中该横缝的CONTACT OUTPUT块数
+    # 每个增量步中CONTACT OUTPUT块按横缝顺序排列，第i条横缝是该增量步中第i个块
+    copen_data = []
+    copen_id = []
     with open(fname, encoding='gbk') as dat_file:
-        line = dat_file.readline()
-        while 'S T E P       4' not in line:
-            line = dat_file.readline()
-        copen_data = []
-        copen_id = []
-        while 'S T E P       5' not in line:
-            if 'CONTACT OUTPUT' in line:
-                copen_id.append(line)
-                copen = []
-                for i in range(5):
-                    line = dat_file.readline()
-                while line not in ['\n','\r\n']:
-                    line = line.replace('CL', '0').replace('OP', '1')
-                    line = line.split()
-                    copen.append(line)
-                    line = dat_file.readline()
-                copen = np.array(copen).astype(np.float64)
-                copen_data.append(copen)
-            else:
-                line = dat_file.readline()
-
-        joint_id = 0
-        increment = 0
-        while True:
-            if 'INCREMENT' in line and 'SUMMARY' in line:
-                increment += 1
-                joint_id = 0
-                line = dat_file.readline()
-                while 'INCREMENT' not in line or 'SUMMARY' not in line:
-                    if 'CONTACT OUTPUT' in line:
-                        copen = []
-                        for i in range(5):
-                            line = dat_file.readline()
-                        while line not in ['\n', '\r\n']:
-                            line = line.replace('CL', '0').replace('OP', '1')
-                            line = line.split()
-                            copen.append(line)
-                            line = dat_file.readline()
-                        copen = np.array(copen).astype(np.float64)
-                        if increment == 1:
-                            copen_data[joint_id] = np.stack((copen_data[joint_id], copen), axis=2)
-                        else:
-                            copen_data[joint_id] = np.append(copen_data[joint_id], copen[:, :, None], axis=2)
-                        joint_id += 1
-                    else:
-                        line = dat_file.readline()
-                    if not line:
-                        break
-            else:
-                line = dat_file.readline()
-            if not line:
-                break
+        for joint_id, row in zip(selected, rows):
+            dat_file.seek(contacts[row, 2])
+            copen_id.append(dat_file.readline())
+            copen = read_contact_block(dat_file)
+            history = np.zeros(copen.shape + (num_frame,))  # 结点数和帧数都已统计，预先分配
+            history[:, :, 0] = copen
+            for k, first in enumerate(inc_first):
+                dat_file.seek(contacts[inc_rows[first + joint_id], 2])
+                dat_file.readline()
+                history[:, :, k + 1] = read_contact_block(dat_file)
+            copen_data.append(history)
     return copen_data, copen_id
 
 
 def change_coord(coordinate_nodes, nodes, all_nodes=None):
-    """将结点坐标转换为在局部坐标系z向法平面的坐标
+    """将结点坐标转换为在局部坐标系z向法平面的坐标，同一坐标系需要转换多组结点时先用get_section_frame求坐标系再用to_section转换
 
     Args:
         coordinate_nodes (numpy.array): 局部坐标系，如果为一维数组，则表示确定局部坐标系的三个结点的编号；如果为二维数组，则表示确定局部坐标系三个结点的坐标。三个结点依次为x轴上的结点、xy平面上的结点和坐标原点
@@ -124,35 +198,7 @@ def change_coord(coordinate_nodes, nodes, all_nodes=None):
     Returns:
         numpy.array(n, 2): 转换后的坐标数组
     """
-    if all_nodes is None:  # 如果没有给所有结点坐标
-        nodeP = coordinate_nodes[2, :]  # 获取坐标原点坐标
-        nodeQ = coordinate_nodes[0, :]  # 获取x轴上的点坐标
-        nodeR = coordinate_nodes[1, :]  # 获取xy平面上的点坐标
-        vec_x = (nodeQ - nodeP) / np.linalg.norm((nodeQ - nodeP))  # 获取局部坐标系的x轴方向向量
-        vec_y = (nodeR - nodeP) - (nodeR - nodeP).dot(vec_x) * vec_x
-        vec_y = vec_y / np.linalg.norm(vec_y)  # 获取局部坐标系的y轴方向向量
-        xx, yy = (nodes - nodeP).dot(vec_x), (nodes - nodeP).dot(vec_y)  # 获取转换后的坐标
-        return np.column_stack([xx, yy])
-    else:  # 如果给了所有结点的坐标
-        if len(coordinate_nodes.shape) == 1:  # 如果局部坐标系给的是结点编号
-            nodeP = all_nodes[all_nodes[:, 0] == coordinate_nodes[2]][0, 1:]  # 获取坐标原点坐标
-            nodeQ = all_nodes[all_nodes[:, 0] == coordinate_nodes[0]][0, 1:]  # 获取x轴上的点坐标
-            nodeR = all_nodes[all_nodes[:, 0] == coordinate_nodes[1]][0, 1:]  # 获取xy平面上的点坐标
-        else:  # 如果局部坐标系给的是结点坐标
-            nodeP = coordinate_nodes[2, :]  # 获取坐标原点坐标
-            nodeQ = coordinate_nodes[0, :]  # 获取x轴上的点坐标
-            nodeR = coordinate_nodes[1, :]  # 获取xy平面上的点坐标
-        vec_x = (nodeQ - nodeP) / np.linalg.norm((nodeQ - nodeP))  # 获取局部坐标系的x轴方向向量
-        vec_y = (nodeR - nodeP) - (nodeR - nodeP).dot(vec_x) * vec_x
-        vec_y = vec_y / np.linalg.norm(vec_y)  # 获取局部坐标系的y轴方向向量
-        try:  # 如果需要转换结点给的是坐标值
-            xx, yy = (nodes - nodeP).dot(vec_x), (nodes - nodeP).dot(vec_y)  # 获取转换后的坐标
-        except:  # 如果需要转换结点给的是结点编号
-            nodes_coord = np.zeros((len(nodes), all_nodes.shape[1] - 1))
-            for i, id in enumerate(nodes):
-                nodes_coord[i, :] = all_nodes[all_nodes[:, 0] == id][0, 1:]
-            xx, yy = (nodes_coord - nodeP).dot(vec_x), (nodes_coord - nodeP).dot(vec_y)  # 获取转换后的坐标
-        return np.column_stack([xx, yy])
+    return to_section(get_section_frame(coordinate_nodes, all_nodes), nodes, all_nodes)
 
 
 def transform_coord(coordinate_nodes, bound_nodes, section_nodes_coord, nodes_data):
@@ -169,29 +215,58 @@ def transform_coord(coordinate_nodes, bound_nodes, section_nodes_coord, nodes_da
         YY (numpy.array(n)): 剖面结点在局部坐标系上的纵坐标
         boundary (list): 边界列表，每个元素是一个元组，表示结点坐标，结点按逆时针或者顺时针排序
     """
-    all_nodes_id = nodes_data[:, 0].astype(np.int64)  # 获取所有结点编号
-    all_nodes_coord = nodes_data[:, 1:]  # 获取所有结点坐标
-    nodeP = all_nodes_coord[all_nodes_id == coordinate_nodes[2]].ravel()  # 局部坐标系原点的结点坐标
-    nodeQ = all_nodes_coord[all_nodes_id == coordinate_nodes[0]].ravel()  # 局部坐标系x轴上的结点坐标
-    nodeR = all_nodes_coord[all_nodes_id == coordinate_nodes[1]].ravel()  # 局部坐标系y轴上的结点坐标
-    vec_x = (nodeQ - nodeP) / np.linalg.norm((nodeQ - nodeP))  # 获取局部坐标系的x轴方向向量
-    vec_y = (nodeR - nodeP) - (nodeR - nodeP).dot(vec_x) * vec_x
-    vec_y = vec_y / np.linalg.norm(vec_y)  # 获取局部坐标系的y轴方向向量
-    # 获取局部坐标系下的边界列表
-    boundary = []
-    for id in bound_nodes:
-        boundA = all_nodes_coord[all_nodes_id == id].ravel()
-        boundary.append(((boundA - nodeP).dot(vec_x), (boundA - nodeP).dot(vec_y)))
-    # 获取局部坐标系下剖面结点的横纵坐标
-    XX = np.zeros(section_nodes_coord.shape[0])
-    YY = np.zeros(section_nodes_coord.shape[0])
-    for i in range(XX.shape[0]):
-        nodei = section_nodes_coord[i, :]
-        XX[i], YY[i] = (nodei - nodeP).dot(vec_x), (nodei - nodeP).dot(vec_y)
-    return XX, YY, boundary
+    frame = get_section_frame(coordinate_nodes, nodes_data)
+    boundary = [tuple(v) for v in to_section(frame, bound_nodes, nodes_data)]
+    xy = to_section(frame, section_nodes_coord)
+    return xy[:, 0], xy[:, 1], boundary
     
 
-def sta_disp_contour(fname, coordinate_nodes, bounds, nodes_data, direc='X', holes=None, concen=None, concen_dist=0):
+def load_section_geo(fpath, frame, nodes_data, rows=False):
+    """读取几何信息文件（边界、孔洞、应力集中点）并转换到局部坐标系，同一文件在同一坐标系下只转换一次
+
+    Args:
+        fpath (string): 几何信息文件路径
+        frame (numpy.array(4, 3)): 局部坐标系，见get_section_frame
+        nodes_data (numpy.array(n, 4)): 所有结点的编号和坐标，第一列为结点编号
+        rows (bool, optional): 文件每行是否为一组结点（如孔洞文件每行一个孔洞），默认为False
+
+    Returns:
+        numpy.array(n, 2) or list: 局部坐标系下的坐标，rows为True时为每行坐标数组的列表
+    """
+    stat = os.stat(fpath)
+    key = (os.path.abspath(fpath), stat.st_size, stat.st_mtime_ns, frame.tobytes(), id(nodes_data), rows)
+    cached = _lru_get(_section_geo_cache, key)
+    if cached is not None and cached[0] is nodes_data:
+        return cached[1]
+    data = load_geo_file(fpath)
+    if rows:
+        coord = [to_section(frame, data[i, :], nodes_data) for i in range(data.shape[0])]
+    else:
+        coord = to_section(frame, data, nodes_data)
+    _lru_set(_section_geo_cache, key, (nodes_data, coord), SECTION_GEO_CACHE_SIZE)
+    return coord
+
+
+def get_concen_mask(xy, concen, coordinate_nodes, nodes_data, concen_dist):
+    """筛选出离应力集中点的距离大于集中点距离的剖面结点
+
+    各结点到最近应力集中点的距离按剖面结点和集中点坐标缓存，修改集中点距离后重新筛选时不需要重新计算距离.
+
+    Args:
+        xy (numpy.array(n, 2)): 剖面结点在局部坐标系下的坐标
+        concen (string): 应力集中区域文件
+        coordinate_nodes (numpy.array(3)): 局部坐标系结点组编号
+        nodes_data (numpy.array(n, 4)): 所有结点的编号和坐标，第一列为结点编号
+        concen_dist (float): 集中点距离
+
+    Returns:
+        mask (numpy.array(n)): 需要保留的结点为True
+    """
+    concen_coord = load_section_geo(concen, get_section_frame(coordinate_nodes, nodes_data), nodes_data)
+    return get_nearest_dist(xy, concen_coord) > concen_dist
+
+
+def sta_disp_contour(fname, coordinate_nodes, bounds, nodes_data, direc='X', holes=None, concen=None, concen_dist=0, method='cubic'):
     """绘制静力位移等值线图
 
     Args:
@@ -203,6 +278,7 @@ def sta_disp_contour(fname, coordinate_nodes, bounds, nodes_data, direc='X', hol
         holes (string): 孔洞文件，默认为None
         concen (string): 应力集中区域文件，默认为None
         concen_dist (float): 集中点距离，默认为0
+        method (string): 插值方法，'tri'表示不插值到网格，直接在结点三角剖分上绘制等值线，默认为'cubic'
 
     Returns:
         fig (plt.figure): 图片句柄
@@ -213,9 +289,9 @@ def sta_disp_contour(fname, coordinate_nodes, bounds, nodes_data, direc='X', hol
         holes (list): 孔洞列表，用于重绘
         concen (string): 应力集中区域文件，默认为None
     """
+    frame = get_section_frame(coordinate_nodes, nodes_data)  # 局部坐标系只计算一次
     # 加载位移数据
-    disp_data = pd.read_csv(fname, encoding='gbk')
-    disp_data.rename(columns={'      结点编号': 'node', '          U-U1': 'U-U1', '          U-U2': 'U-U2', '          U-U3': 'U-U3'}, inplace=True)
+    disp_data = read_field_csv(fname)
     disp_data = disp_data.sort_values(by='node')  # 按结点排序
     section_nodes_coord = np.array(disp_data[['X', 'Y', 'Z']])
     if direc == 'X':
@@ -224,58 +300,45 @@ def sta_disp_contour(fname, coordinate_nodes, bounds, nodes_data, direc='X', hol
         zzU = np.array(disp_data['U-U2'] * 100)
     else:
         zzU = np.array(disp_data['U-U3'] * 100)
-    xyU = change_coord(coordinate_nodes, section_nodes_coord, nodes_data)  # 转换剖面结点坐标
+    xyU = to_section(frame, section_nodes_coord, nodes_data)  # 转换剖面结点坐标
     # 如果需要删除一些应力集中点
     if concen is not None:
-        concen_nodes = np.loadtxt(concen)
-        concen_coord = change_coord(coordinate_nodes, concen_nodes, nodes_data)
-        xyU_dele, zzU_dele = [], []
-        for i in range(xyU.shape[0]):
-            dist = np.sqrt(np.sum((concen_coord - xyU[i, :]) ** 2, axis=1))
-            if np.min(dist) > concen_dist:  # 判断该剖面结点离应力集中区域最小的距离是否大于集中点距离
-                xyU_dele.append(xyU[i, :])
-                zzU_dele.append(zzU[i])
-        xyU = np.array(xyU_dele)
-        zzU = np.array(zzU_dele)
+        mask = get_concen_mask(xyU, concen, coordinate_nodes, nodes_data, concen_dist)  # 剖面结点离应力集中区域最小的距离是否大于集中点距离
+        xyU = xyU[mask]
+        zzU = zzU[mask]
     xxU, yyU = xyU[:, 0], xyU[:, 1]
     # 加载孔洞数据
     if holes is not None:
-        holes_nodes = np.loadtxt(holes)
-        holes = []
-        for i in range(holes_nodes.shape[0]):
-            hole_coord = change_coord(coordinate_nodes, holes_nodes[i, :], nodes_data)
-            holes.append([tuple(v) for v in list(hole_coord)])
+        holes = [[tuple(v) for v in list(hole_coord)] for hole_coord in load_section_geo(holes, frame, nodes_data, rows=True)]
 
     boundarys = []
     if len(bounds) == 1:  # 如果只有一个边界
-        bound_nodes = np.loadtxt(bounds[0])
-        bound_coord = change_coord(coordinate_nodes, bound_nodes, nodes_data)
+        bound_coord = load_section_geo(bounds[0], frame, nodes_data)
         boundary = [tuple(v) for v in list(bound_coord)]
         boundarys.append(boundary)
         fig = plt.figure(figsize=(6.1, 4.4))
         try:
-            X, Y, ZU, hd = getContour(xxU, yyU, zzU, boundary, dpi=100, Extrapolation=0, holes=holes)
+            X, Y, ZU, hd = getContour(xxU, yyU, zzU, boundary, dpi=100, Extrapolation=0, holes=holes, method=method)
         except:
-            X, Y, ZU, hd = getContour(xxU, yyU, zzU, boundary, dpi=100, Extrapolation=1, holes=holes)
+            X, Y, ZU, hd = getContour(xxU, yyU, zzU, boundary, dpi=100, Extrapolation=1, holes=holes, method=method)
     else:  # 如果有两个边界
         zzU_max = np.max(zzU)
         zzU_min = np.min(zzU)
         numline = np.arange(zzU_min, zzU_max, (zzU_max - zzU_min) / 10)
         fig = plt.figure(figsize=(6.1, 4.4))
         for bound in bounds:
-            bound_nodes = np.loadtxt(bound)
-            bound_coord = change_coord(coordinate_nodes, bound_nodes, nodes_data)
+            bound_coord = load_section_geo(bound, frame, nodes_data)
             boundary = [tuple(v) for v in list(bound_coord)]
             boundarys.append(boundary)
             try:
-                X, Y, ZU, hd = getContour(xxU, yyU, zzU, boundary, numline=numline, dpi=100, Extrapolation=0, holes=holes)
+                X, Y, ZU, hd = getContour(xxU, yyU, zzU, boundary, numline=numline, dpi=100, Extrapolation=0, holes=holes, method=method)
             except:
-                X, Y, ZU, hd = getContour(xxU, yyU, zzU, boundary, numline=numline, dpi=100, Extrapolation=1, holes=holes)
+                X, Y, ZU, hd = getContour(xxU, yyU, zzU, boundary, numline=numline, dpi=100, Extrapolation=1, holes=holes, method=method)
     plt.tight_layout()
     return fig, xxU, yyU, zzU, boundarys, holes, concen
 
 
-def sta_stre_contour(fname, coordinate_nodes, bounds, nodes_data, component='Smax', holes=None, concen=None, concen_dist=0):
+def sta_stre_contour(fname, coordinate_nodes, bounds, nodes_data, component='Smax', holes=None, concen=None, concen_dist=0, method='cubic'):
     """绘制静力应力等值线图
 
     Args:
@@ -287,6 +350,7 @@ def sta_stre_contour(fname, coordinate_nodes, bounds, nodes_data, component='Sma
         holes (string): 孔洞文件，默认为None
         concen (string): 应力集中区域文件，默认为None
         concen_dist (float): 集中点距离，默认为0
+        method (string): 插值方法，'tri'表示不插值到网格，直接在结点三角剖分上绘制等值线，默认为'cubic'
 
     Returns:
         fig (plt.figure): 图片句柄
@@ -297,10 +361,9 @@ def sta_stre_contour(fname, coordinate_nodes, bounds, nodes_data, component='Sma
         holes (list): 孔洞列表，用于重绘
         concen (string): 应力集中区域文件，默认为None
     """
+    frame = get_section_frame(coordinate_nodes, nodes_data)  # 局部坐标系只计算一次
     # 获取应力数据
-    stre_data = pd.read_csv(fname, encoding='gbk')
-    stre_data.rename(columns={'      结点编号': 'node'}, inplace=True)
-    stre_data.drop_duplicates(subset='node', keep='first', inplace=True)
+    stre_data = read_field_csv(fname, drop_duplicates=True)
     stre_data = stre_data.sort_values(by='node')  # 按结点排序
     section_nodes_coord = np.array(stre_data[['X', 'Y', 'Z']])
     if component == 'Smax':
@@ -309,68 +372,73 @@ def sta_stre_contour(fname, coordinate_nodes, bounds, nodes_data, component='Sma
     elif component == 'Smin':
         zzS = np.array(stre_data['S-Min. Principal'] / 1e6)
         max_min = 'min'
-    xyS = change_coord(coordinate_nodes, section_nodes_coord, nodes_data)  # 转换剖面结点坐标
+    xyS = to_section(frame, section_nodes_coord, nodes_data)  # 转换剖面结点坐标
     # 如果需要删除一些应力集中点
     if concen is not None:
-        concen_nodes = np.loadtxt(concen)
-        concen_coord = change_coord(coordinate_nodes, concen_nodes, nodes_data)
-        xys_dele, zzS_dele = [], []
-        for i in range(xyS.shape[0]):
-            dist = np.sqrt(np.sum((concen_coord - xyS[i, :]) ** 2, axis=1))
-            if np.min(dist) > concen_dist:  # 判断该剖面结点离应力集中区域最小的距离是否大于集中点距离
-                xys_dele.append(xyS[i, :])
-                zzS_dele.append(zzS[i])
-        xyS = np.array(xys_dele)
-        zzS = np.array(zzS_dele)
+        mask = get_concen_mask(xyS, concen, coordinate_nodes, nodes_data, concen_dist)  # 剖面结点离应力集中区域最小的距离是否大于集中点距离
+        xyS = xyS[mask]
+        zzS = zzS[mask]
     xxS, yyS = xyS[:, 0], xyS[:, 1]
     # 如果有孔洞
     if holes is not None:
-        holes_nodes = np.loadtxt(holes)
-        holes = []
-        for i in range(holes_nodes.shape[0]):
-            hole_coord = change_coord(coordinate_nodes, holes_nodes[i, :], nodes_data)
-            holes.append([tuple(v) for v in list(hole_coord)])
+        holes = [[tuple(v) for v in list(hole_coord)] for hole_coord in load_section_geo(holes, frame, nodes_data, rows=True)]
     boundarys = []
     if len(bounds) == 1:  # 如果只有一个边界
-        bound_nodes = np.loadtxt(bounds[0])
-        bound_coord = change_coord(coordinate_nodes, bound_nodes, nodes_data)
+        bound_coord = load_section_geo(bounds[0], frame, nodes_data)
         boundary = [tuple(v) for v in list(bound_coord)]
         boundarys.append(boundary)
         fig = plt.figure(figsize=(6.1, 4.4))
         try:
-            X, Y, ZS, hd = getContour(xxS, yyS, zzS, boundary, dpi=100, Extrapolation=1, max_min=max_min, holes=holes)
+            X, Y, ZS, hd = getContour(xxS, yyS, zzS, boundary, dpi=100, Extrapolation=1, max_min=max_min, holes=holes, method=method)
         except:
-            X, Y, ZS, hd = getContour(xxS, yyS, zzS, boundary, dpi=100, Extrapolation=0, max_min=max_min, holes=holes)
+            X, Y, ZS, hd = getContour(xxS, yyS, zzS, boundary, dpi=100, Extrapolation=0, max_min=max_min, holes=holes, method=method)
     else:  # 如果有多个边界
         zzS_max = np.max(zzS)
         zzS_min = np.min(zzS)
         numline = np.arange(zzS_min, zzS_max, (zzS_max - zzS_min) / 10)
         fig = plt.figure(figsize=(6.1, 4.4))
         for bound in bounds:
-            bound_nodes = np.loadtxt(bound)
-            bound_coord = change_coord(coordinate_nodes, bound_nodes, nodes_data)
+            bound_coord = load_section_geo(bound, frame, nodes_data)
             boundary = [tuple(v) for v in list(bound_coord)]
             boundarys.append(boundary)
             try:
-                X, Y, ZS, hd = getContour(xxS, yyS, zzS, boundary, numline=numline, dpi=100, Extrapolation=1, max_min=max_min, holes=holes)
+                X, Y, ZS, hd = getContour(xxS, yyS, zzS, boundary, numline=numline, dpi=100, Extrapolation=1, max_min=max_min, holes=holes, method=method)
             except:
-                X, Y, ZS, hd = getContour(xxS, yyS, zzS, boundary, numline=numline, dpi=100, Extrapolation=0, max_min=max_min, holes=holes)
+                X, Y, ZS, hd = getContour(xxS, yyS, zzS, boundary, numline=numline, dpi=100, Extrapolation=0, max_min=max_min, holes=holes, method=method)
     plt.tight_layout()
     return fig, xxS, yyS, zzS, boundarys, holes, concen
 
 
-def sta_joint_contour(joint, bounds, coordinate, copen_data, copen_id, nodes, holes=None, concen=None):
+def find_joint(joint, copen_id):
+    """在横缝标签中查找横缝，有多个标签包含横缝名称时取最后一个
+
+    Args:
+        joint (string): 横缝标志
+        copen_id (list): 所有横缝的标志
+
+    Returns:
+        int: 横缝在copen_id中的序号，没有找到时为None
+    """
+    idx = None
+    for i in range(len(copen_id)):
+        if joint.upper() in copen_id[i]:
+            idx = i
+    return idx
+
+
+def sta_joint_contour(joint, bounds, coordinate, copen_data, copen_id, nodes, holes=None, concen=None, method='cubic'):
     """绘制静力横缝开度分布图
 
     Args:
         joint (string): 横缝标志
         bounds (string): 边界结点文件
         coordinate (numpy.array): 局部坐标系结点编号
-        copen_data (list): 所有横缝开度数据
-        copen_id (list): 所有横缝的标志
+        copen_data (list): 横缝开度数据，可以只包含所绘横缝
+        copen_id (list): 与copen_data对应的横缝标志
         nodes (numpy.array(n, 4)): 所有结点坐标
         holes (list): 孔洞列表，用于重绘
         concen (string): 应力集中区域文件，默认为None
+        method (string): 插值方法，'tri'表示不插值到网格，直接在结点三角剖分上绘制等值线，默认为'cubic'
 
     Returns:
         fig (plt.figure): 图片句柄
@@ -381,35 +449,150 @@ def sta_joint_contour(joint, bounds, coordinate, copen_data, copen_id, nodes, ho
         holes (list): 孔洞列表，用于重绘
         concen (string): 应力集中区域文件，默认为None
     """
-    bound_nodes = np.loadtxt(bounds)  # 读取边界结点文件
-    # 获取横缝
-    for i in range(len(copen_id)):
-        if joint.upper() in copen_id[i]:
-            idx = i
+    bound_nodes = load_geo_file(bounds)  # 读取边界结点文件
+    idx = find_joint(joint, copen_id)  # 获取横缝
     # 获取横缝开度数据
     joint_node_id = copen_data[idx][:, 0].ravel().astype(np.int64)
     joint_if_open = copen_data[idx][:, 1].ravel().astype(np.int64)
     joint_copen = 1000 * copen_data[idx][:, 2].ravel()
     joint_copen[joint_if_open == 0] = 0
 
-    all_nodes_id = nodes[:, 0].astype(np.int64)
-    all_nodes_coord = nodes[:, 1:]
     # 获取横缝结点坐标
-    joint_node_coord = np.zeros((joint_node_id.shape[0], 3))
-    for i in range(joint_node_id.shape[0]):
-        joint_node_coord[i, :] = all_nodes_coord[all_nodes_id == joint_node_id[i], :]
+    joint_node_coord = get_node_coords(nodes, joint_node_id)
 
     boundarys = []
     XX, YY, boundary = transform_coord(coordinate, bound_nodes, joint_node_coord, nodes)
     boundarys.append(boundary)
     fig = plt.figure(figsize=(6.1, 4.4))
     step = np.max([np.max(joint_copen) / 10, 0.1])
-    X, Y, vCopen, hd = getContour(XX, YY, joint_copen, boundary, baseP=-10, max_min='max', dpi=100, numline=np.arange(step, np.max(joint_copen) + 2 * step, step))
+    X, Y, vCopen, hd = getContour(XX, YY, joint_copen, boundary, baseP=-10, max_min='max', dpi=100, numline=np.arange(step, np.max(joint_copen) + 2 * step, step), method=method)
     plt.tight_layout()
     return fig, XX, YY, joint_copen, boundarys, holes, concen
 
 
-def dmgt_contour(fname, coordinate_nodes, bounds, nodes_data, fontsize=16, holes=None, cbar_ratio=1.0):
+def read_dmgt_section(fname, frame, nodes_data):
+    """读取一帧损伤因子数据并转换到剖面局部坐标系
+
+    Args:
+        fname (string): 损伤数据文件路径
+        frame (tuple): 局部坐标系，见get_section_frame
+        nodes_data (numpy.array(n, 4)): 所有结点的编号和坐标，第一列为结点编号
+
+    Returns:
+        xy (np.array(n, 2)): 数据点在局部坐标系下的坐标
+        damage (np.array(n)): 数据点的损伤因子，大于1的值置为1
+    """
+    damage_data = read_field_csv(fname, drop_duplicates=True)
+    damage = np.array(damage_data['DAMAGET'])
+    damage[damage > 1.0] = 1.0  # 将损伤因子大于1的值置为1
+    section_nodes_coord = np.array(damage_data[['X', 'Y', 'Z']])
+    return to_section(frame, section_nodes_coord, nodes_data), damage
+
+
+def dmgt_grid(xx, yy, damage, boundary, holes=None, method='cubic'):
+    """把一帧损伤因子插值到边界内的网格上，内插失败时改用外插
+
+    Args:
+        xx (np.array(n)): 数据点的横坐标数组
+        yy (np.array(n)): 数据点的纵坐标数组
+        damage (np.array(n)): 数据点的值
+        boundary (list): 边界点坐标元组的列表
+        holes (list, optional): 孔洞边界坐标点列表，默认为None
+        method (string): 插值方法，'tri'表示不插值到网格，直接在结点三角剖分上绘制等值线，默认为'cubic'
+
+    Returns:
+        tuple: getContour的返回值(X, Y, Z)
+    """
+    try:
+        return getContour(xx, yy, damage, boundary, baseP=-100, flag=0, holes=holes, Extrapolation=0, method=method)
+    except:
+        return getContour(xx, yy, damage, boundary, baseP=-100, flag=0, holes=holes, Extrapolation=1, method=method)
+
+
+def dmgt_fields(fnames, coordinate_nodes, bounds, nodes_data, holes=None, method='cubic'):
+    """读取同一剖面的多帧损伤因子数据，结点相同的帧用同一个插值算子一次插值到各边界的网格上
+
+    Args:
+        fnames (list): 各帧损伤数据文件路径
+        coordinate_nodes (numpy.array): 局部坐标系，见dmgt_contour
+        bounds (list): 边界结点文件列表
+        nodes_data (numpy.array(n, 4)): 所有结点的编号和坐标，第一列为结点编号
+        holes (string): 孔洞文件，默认为None
+        method (string): 插值方法，'tri'表示不插值到网格，直接在结点三角剖分上绘制等值线，默认为'cubic'
+
+    Returns:
+        fields (list): 各帧的(xx, yy, damage, grids)，grids为各边界的(X, Y, Z)，同一边界的X、Y为同一数组
+        boundarys (list): 边界列表，每个边界为结点坐标元组的列表
+        holes (list): 孔洞边界坐标点列表，没有孔洞时为None
+    """
+    frame = get_section_frame(coordinate_nodes, nodes_data)  # 局部坐标系只计算一次
+    data = [read_dmgt_section(fname, frame, nodes_data) for fname in fnames]
+    if holes is not None:
+        holes = [[tuple(v) for v in list(hole_coord)] for hole_coord in load_section_geo(holes, frame, nodes_data, rows=True)]
+    boundarys = [[tuple(v) for v in list(load_section_geo(bound, frame, nodes_data))] for bound in bounds]
+    grids = [[None] * len(boundarys) for _ in data]
+    if method != 'tri' and len(data) > 0:
+        # 结点与第一帧相同的帧组成(帧数, 结点数)矩阵，每个边界只调用一次apply_interp_op
+        xy0 = data[0][0]
+        same = [k for k, (xy, _) in enumerate(data) if np.array_equal(xy, xy0)]
+        zs = np.array([data[k][1] for k in same])
+        for j, boundary in enumerate(boundarys):
+            try:
+                X, Y, Zs = interp_fields(xy0[:, 0], xy0[:, 1], zs, boundary, holes, dpi=100, method=method, baseP=-100)
+            except:  # 内插失败的边界逐帧外插
+                continue
+            for k, Z in zip(same, Zs):
+                grids[k][j] = (X, Y, Z)
+    fields = []
+    for k, (xy, damage) in enumerate(data):
+        for j, boundary in enumerate(boundarys):
+            if grids[k][j] is None:
+                grids[k][j] = dmgt_grid(xy[:, 0], xy[:, 1], damage, boundary, holes, method)
+        fields.append((xy[:, 0], xy[:, 1], damage, grids[k]))
+    return fields, boundarys, holes
+
+
+def dmgt_grid_contour(xx, yy, damage, grids, boundarys, holes=None, fontsize=16, cbar_ratio=1.0):
+    """根据插值好的网格数据绘制损伤分布图，见dmgt_fields
+
+    Args:
+        xx (np.array(n)): 数据点的横坐标数组
+        yy (np.array(n)): 数据点的纵坐标数组
+        damage (np.array(n)): 数据点的值
+        grids (list): 各边界的(X, Y, Z)
+        boundarys (list): 边界列表，每个边界为结点坐标元组的列表
+        holes (list, optional): 孔洞边界坐标点列表，默认为None
+        fontsize (int, optional): 极值点数据字体大小，默认为16.
+        cbar_ratio (float, optional): 色标长度比例，默认为1.0
+
+    Returns:
+        fig (plt.figure): 图片句柄
+        xx (np.array(n)): 数据点的横坐标数组
+        yy (np.array(n)): 数据点的纵坐标数组
+        damage (np.array(n)): 数据点的值
+    """
+    fig = plt.figure(figsize=(6.1, 4.4))
+    for (X, Y, vdamage), boundary in zip(grids, boundarys):
+        cd = plot_contourf(X, Y, vdamage, vmin=0.2, cmap=cmp, levels=np.linspace(0.0, 1.0, 11))
+        bd = np.array(boundary)
+        plt.plot(bd[:, 0], bd[:, 1], color='k', linewidth=2)
+    if holes is not None:
+        for hole in holes:
+            hl = np.array(hole)
+            plt.plot(hl[:, 0], hl[:, 1], color='k', linewidth=1.5, zorder=3)
+            plt.fill(hl[:, 0], hl[:, 1], 'w', zorder=2)
+    idx = np.argmax(damage)
+    plt.scatter(xx[idx], yy[idx], color='b', marker='*')
+    plt.text(xx[idx], yy[idx], str('%.2f' % damage[idx]), color='b', fontsize=fontsize)
+    plt.gca().set_aspect(1)
+    plt.gca().set_axis_off()
+    cbar = plt.colorbar(cd, shrink=cbar_ratio)
+    cbar.set_ticks(np.linspace(0.0, 1.0, 11))
+    plt.tight_layout()
+    return fig, xx, yy, damage
+
+
+def dmgt_contour(fname, coordinate_nodes, bounds, nodes_data, fontsize=16, holes=None, cbar_ratio=1.0, method='cubic'):
     """绘制损伤分布图
 
     Args:
@@ -419,6 +602,7 @@ def dmgt_contour(fname, coordinate_nodes, bounds, nodes_data, fontsize=16, holes
         nodes_data (numpy.array(n, 4)): 所有结点的编号和坐标，第一列为结点编号
         fontsize (int, optional): 极值点数据字体大小，默认为16.
         holes (string): 孔洞文件，默认为None
+        method (string): 插值方法，'tri'表示不插值到网格，直接在结点三角剖分上绘制等值线，默认为'cubic'
 
     Returns:
         fig (plt.figure): 图片句柄
@@ -426,73 +610,15 @@ def dmgt_contour(fname, coordinate_nodes, bounds, nodes_data, fontsize=16, holes
         yy (np.array(n)): 数据点的纵坐标数组
         damage (np.array(n)): 数据点的值
     """
-    # 读取损伤因子分布数据
-    damage_data = pd.read_csv(fname, encoding='gbk')
-    damage_data.rename(columns={'      结点编号': 'node', '       DAMAGET': 'damage'}, inplace=True)
-    damage_data.drop_duplicates(subset='node', keep='first', inplace=True)
-    damage = np.array(damage_data['damage'])
-    damage[damage > 1.0] = 1.0  # 将损伤因子大于1的值置为1
-    section_nodes_coord = np.array(damage_data[['X', 'Y', 'Z']])
-    xy = change_coord(coordinate_nodes, section_nodes_coord, nodes_data)
+    frame = get_section_frame(coordinate_nodes, nodes_data)  # 局部坐标系只计算一次
+    xy, damage = read_dmgt_section(fname, frame, nodes_data)
     xx, yy = xy[:, 0], xy[:, 1]
     # 如果存在孔洞
     if holes is not None:
-        holes_nodes = np.loadtxt(holes)
-        holes = []
-        for i in range(holes_nodes.shape[0]):
-            hole_coord = change_coord(coordinate_nodes, holes_nodes[i, :], nodes_data)
-            holes.append([tuple(v) for v in list(hole_coord)])
-    if len(bounds) == 1:  # 如果只有一个边界
-        bound_nodes = np.loadtxt(bounds[0])
-        bound_coord = change_coord(coordinate_nodes, bound_nodes, nodes_data)
-        boundary = [tuple(v) for v in list(bound_coord)]
-        fig = plt.figure(figsize=(6.1, 4.4))
-        try:
-            X, Y, vdamage = getContour(xx, yy, damage, boundary, baseP=-100, flag=0, holes=holes, Extrapolation=0)
-        except:
-            X, Y, vdamage = getContour(xx, yy, damage, boundary, baseP=-100, flag=0, holes=holes, Extrapolation=1)
-        Cd = plt.contourf(X, Y, vdamage, vmin=0.2, cmap=cmp, levels=np.linspace(0.0, 1.0, 11))
-        bd = np.array(boundary)
-        plt.plot(bd[:, 0], bd[:, 1], color='k', linewidth=2)
-        if holes is not None:
-            for hole in holes:
-                hl = np.array(hole)
-                plt.plot(hl[:, 0], hl[:, 1], color='k', linewidth=1.5, zorder=3)
-                plt.fill(hl[:, 0], hl[:, 1], 'w', zorder=2)
-        idx = np.argmax(damage)
-        plt.scatter(xx[idx], yy[idx], color='b', marker='*')
-        plt.text(xx[idx], yy[idx], str('%.2f' % damage[idx]), color='b', fontsize=fontsize)
-        plt.gca().set_aspect(1)
-        plt.gca().set_axis_off()
-        cbar = plt.colorbar(Cd, shrink=cbar_ratio)
-        cbar.set_ticks(np.linspace(0.0, 1.0, 11))
-    else:  # 如果有多个边界
-        fig = plt.figure(figsize=(6.1, 4.4))
-        for bound in bounds:
-            bound_nodes = np.loadtxt(bound)
-            bound_coord = change_coord(coordinate_nodes, bound_nodes, nodes_data)
-            boundary = [tuple(v) for v in list(bound_coord)]
-            try:
-                X, Y, vdamage = getContour(xx, yy, damage, boundary, baseP=-100, flag=0, holes=holes, Extrapolation=0)
-            except:
-                X, Y, vdamage = getContour(xx, yy, damage, boundary, baseP=-100, flag=0, holes=holes, Extrapolation=1)
-            cd = plt.contourf(X, Y, vdamage, vmin=0.2, cmap=cmp, levels=np.linspace(0.0, 1.0, 11))
-            bd = np.array(boundary)
-            plt.plot(bd[:, 0], bd[:, 1], color='k', linewidth=2)
-            idx = np.argmax(damage)
-            plt.scatter(xx[idx], yy[idx], color='b', marker='*')
-            plt.text(xx[idx], yy[idx], str('%.2f' % damage[idx]), color='b', fontsize=fontsize)
-        if holes is not None:
-            for hole in holes:
-                hl = np.array(hole)
-                plt.plot(hl[:, 0], hl[:, 1], color='k', linewidth=1.5, zorder=3)
-                plt.fill(hl[:, 0], hl[:, 1], 'w', zorder=2)
-        plt.gca().set_aspect(1)
-        plt.gca().set_axis_off()
-        cbar = plt.colorbar(cd, shrink=cbar_ratio)
-        cbar.set_ticks(np.linspace(0.0, 1.0, 11))
-    plt.tight_layout()
-    return fig, xx, yy, damage
+        holes = [[tuple(v) for v in list(hole_coord)] for hole_coord in load_section_geo(holes, frame, nodes_data, rows=True)]
+    boundarys = [[tuple(v) for v in list(load_section_geo(bound, frame, nodes_data))] for bound in bounds]
+    grids = [dmgt_grid(xx, yy, damage, boundary, holes, method) for boundary in boundarys]
+    return dmgt_grid_contour(xx, yy, damage, grids, boundarys, holes, fontsize, cbar_ratio)
 
 
 def acc_history(fname, node, direc, PGA=None, fontsize=16):
@@ -554,7 +680,7 @@ def acc_history(fname, node, direc, PGA=None, fontsize=16):
     return fig, t, acc
 
 
-def dyn_disp(fname, coordinate_nodes, nodes, ref_node='0,0'):
+def dyn_disp(fname, coordinate_nodes, nodes, ref_node='0,0', stream=False, frames=None, return_frames=False):
     """动力位移数据处理
 
     Args:
@@ -562,51 +688,48 @@ def dyn_disp(fname, coordinate_nodes, nodes, ref_node='0,0'):
         coordinate_nodes (numpy.array): 局部坐标系，如果为一维数组，则表示确定局部坐标系的三个结点的编号；如果为二维数组，则表示确定局部坐标系三个结点的坐标。三个结点依次为x轴上的结点、xy平面上的结点和坐标原点
         nodes (numpy.array(n, 3)): 所有结点的坐标
         ref_node (string, optional): 参考结点坐标或者编号，默认为'0,0'，输入一个整数则表示编号，输入一个坐标则表示坐标.
+        stream (bool, optional): 是否逐帧读取数据计算包络，内存中只保留一帧数据，默认为False.
+        frames (int, slice or numpy.array, optional): 参与计算包络的帧，可以是某一帧、时间窗口或间隔取帧，默认为None，即所有帧.
+        return_frames (bool, optional): 是否同时返回各结点各方向出现最大、最小位移的帧序号，默认为False.
 
     Returns:
         disp_max (numpy.array(n, 2)): 最大位移包络数据
         disp_min (numpy.array(n, 2)): 最小位移包络数据
         xx (numpy.array(n)): 数据结点的横坐标
         yy (numpy.array(n)): 数据结点的纵坐标
+        frame_max (numpy.array(n, 3)): 出现最大位移的帧在表格中的序号，只有return_frames为True时返回
+        frame_min (numpy.array(n, 3)): 出现最小位移的帧在表格中的序号，只有return_frames为True时返回
     """
-    disp_data = pd.read_csv(fname, encoding='gbk')
-    # 获取结点数
-    num_node = 0
-    while disp_data.iloc[num_node]['X'] != 'X':
-        num_node += 1
-    # 获取帧数
-    frames = int(len(disp_data) / (num_node + 1))
-    # 将位移数据整理成三维数组
-    disp = []
-    for i in range(frames):
-        a = np.array(disp_data.iloc[(num_node + 1)*i : (num_node + 1)*(i+1)-1, 4:8]).astype(float)  # 结点坐标
-        b = np.array(disp_data.iloc[(num_node + 1)*i : (num_node + 1)*(i+1)-1, 11:14]).astype(float)  # 结点位移
-        c = np.concatenate((a, b), axis=1)  # 按列拼接
-        disp.append(c)
-    disp = np.array(disp)
-    section_nodes_coord = disp[0, :, 1 : 4]
-    xyU = change_coord(coordinate_nodes, section_nodes_coord, nodes)  # 转换剖面结点坐标
-    # 减去参考点（一般是坝踵）位移，求相对位移
+    selected = frames  # 所选的帧，用于把包络的帧序号换算为表格中的帧序号
+    frame = get_section_frame(coordinate_nodes, nodes)  # 局部坐标系只计算一次
+    columns = ['node', 'X', 'Y', 'Z', 'U-U1', 'U-U2', 'U-U3']  # 结点编号、坐标和位移
+    if stream:
+        frames = iter_frames_csv(fname, columns, frames)
+        first = next(frames)
+        frames = itertools.chain([first], frames)
+    else:
+        frames = read_frames_csv(fname, columns, frames)
+        first = frames[0]
+    section_nodes_coord = first[:, 1 : 4]
+    xyU = to_section(frame, section_nodes_coord, nodes)  # 转换剖面结点坐标
+    # 找到参考点（一般是坝踵）
     if ',' in ref_node:  # 如果输入是一个坐标（转换后的坐标）
         ref = ref_node.split(',')
         ref = [float(val) for val in ref]
         org_node = np.where((xyU[:, 0] - ref[0]) ** 2 + (xyU[:, 1] - ref[1]) ** 2 < 1)
         org_node = np.min(org_node)
-        for i in range(disp.shape[0]):
-            disp[i, :, 4:] -= disp[i, org_node, 4:]
     else:  # 如果输入是一个结点编号
-        org_node = list(disp[0, :, 0]).index(int(ref_node))
-        for i in range(disp.shape[0]):
-            disp[i, :, 4:] -= disp[i, org_node, 4:]
-    # 求最大最小位移包络
-    disp_max = np.max(disp[:, :, 4 : 7], axis=0)
-    disp_min = np.min(disp[:, :, 4 : 7], axis=0)
+        org_node = list(first[:, 0]).index(int(ref_node))
+    # 减去参考点位移求相对位移，并求最大最小位移包络
+    disp_max, disp_min, idx_max, idx_min = get_envelope((frame[:, 4:] for frame in frames), ref_row=org_node)
     xx = xyU[:, 0]
     yy = xyU[:, 1]
+    if return_frames:
+        return disp_max, disp_min, xx, yy, absolute_frames(fname, selected, idx_max), absolute_frames(fname, selected, idx_min)
     return disp_max, disp_min, xx, yy
 
 
-def dyn_disp_contour(xx, yy, zz, coordinate_nodes, bounds, nodes_data, holes=None, concen=None, concen_dist=0):
+def dyn_disp_contour(xx, yy, zz, coordinate_nodes, bounds, nodes_data, holes=None, concen=None, concen_dist=0, method='cubic'):
     """绘制动力位移等值线图
 
     Args:
@@ -619,6 +742,7 @@ def dyn_disp_contour(xx, yy, zz, coordinate_nodes, bounds, nodes_data, holes=Non
         holes (string): 孔洞文件，默认为None
         concen (string): 应力集中区域文件，默认为None
         concen_dist (float): 集中点距离，默认为0
+        method (string): 插值方法，'tri'表示不插值到网格，直接在结点三角剖分上绘制等值线，默认为'cubic'
 
     Returns:
         fig (plt.figure): 图片句柄
@@ -629,58 +753,45 @@ def dyn_disp_contour(xx, yy, zz, coordinate_nodes, bounds, nodes_data, holes=Non
         holes (list): 孔洞列表，用于重绘
         concen (string): 应力集中区域文件，默认为None
     """
+    frame = get_section_frame(coordinate_nodes, nodes_data)  # 局部坐标系只计算一次
     # 如果需要删除一些应力集中点
     if concen is not None:
-        concen_nodes = np.loadtxt(concen)
-        concen_coord = change_coord(coordinate_nodes, concen_nodes, nodes_data)
-        xx_dele, yy_dele, zz_dele = [], [], []
-        for i in range(len(xx)):
-            dist = np.sqrt((concen_coord[:, 0] - xx[i]) ** 2 + (concen_coord[:, 1] - yy[i]) ** 2)
-            if np.min(dist) > concen_dist:
-                xx_dele.append(xx[i])
-                yy_dele.append(yy[i])
-                zz_dele.append(zz[i])
-        xx = np.array(xx_dele)
-        yy = np.array(yy_dele)
-        zz = np.array(zz_dele)
+        mask = get_concen_mask(np.column_stack([xx, yy]), concen, coordinate_nodes, nodes_data, concen_dist)
+        xx = np.asarray(xx)[mask]
+        yy = np.asarray(yy)[mask]
+        zz = np.asarray(zz)[mask]
     # 加载孔洞数据
     if holes is not None:
-        holes_nodes = np.loadtxt(holes)
-        holes = []
-        for i in range(holes_nodes.shape[0]):
-            hole_coord = change_coord(coordinate_nodes, holes_nodes[i, :], nodes_data)
-            holes.append([tuple(v) for v in list(hole_coord)])
+        holes = [[tuple(v) for v in list(hole_coord)] for hole_coord in load_section_geo(holes, frame, nodes_data, rows=True)]
 
     boundarys = []
     if len(bounds) == 1:  # 如果只有一个边界
-        bound_nodes = np.loadtxt(bounds[0])
-        bound_coord = change_coord(coordinate_nodes, bound_nodes, nodes_data)
+        bound_coord = load_section_geo(bounds[0], frame, nodes_data)
         boundary = [tuple(v) for v in list(bound_coord)]
         boundarys.append(boundary)
         fig = plt.figure(figsize=(6.1, 4.4))
         try:
-            X, Y, ZU, hd = getContour(xx, yy, zz, boundary, dpi=100, Extrapolation=0, holes=holes)
+            X, Y, ZU, hd = getContour(xx, yy, zz, boundary, dpi=100, Extrapolation=0, holes=holes, method=method)
         except:
-            X, Y, ZU, hd = getContour(xx, yy, zz, boundary, dpi=100, Extrapolation=1, holes=holes)
+            X, Y, ZU, hd = getContour(xx, yy, zz, boundary, dpi=100, Extrapolation=1, holes=holes, method=method)
     else:  # 如果有多个边界
         zzU_max = np.max(zz)
         zzU_min = np.min(zz)
         numline = np.arange(zzU_min, zzU_max, (zzU_max - zzU_min) / 10)
         fig = plt.figure(figsize=(6.1, 4.4))
         for bound in bounds:
-            bound_nodes = np.loadtxt(bound)
-            bound_coord = change_coord(coordinate_nodes, bound_nodes, nodes_data)
+            bound_coord = load_section_geo(bound, frame, nodes_data)
             boundary = [tuple(v) for v in list(bound_coord)]
             boundarys.append(boundary)
             try:
-                X, Y, ZU, hd = getContour(xx, yy, zz, boundary, numline=numline, dpi=100, Extrapolation=0, holes=holes)
+                X, Y, ZU, hd = getContour(xx, yy, zz, boundary, numline=numline, dpi=100, Extrapolation=0, holes=holes, method=method)
             except:
-                X, Y, ZU, hd = getContour(xx, yy, zz, boundary, numline=numline, dpi=100, Extrapolation=1, holes=holes)
+                X, Y, ZU, hd = getContour(xx, yy, zz, boundary, numline=numline, dpi=100, Extrapolation=1, holes=holes, method=method)
     plt.tight_layout()
     return fig, xx, yy, zz, boundarys, holes, concen
 
 
-def dyn_S_env_contour(fname, coordinate_nodes, bounds, nodes_data, component='Smax', holes=None, concen=None, concen_dist=0):
+def dyn_S_env_contour(fname, coordinate_nodes, bounds, nodes_data, component='Smax', holes=None, concen=None, concen_dist=0, method='cubic'):
     """绘制动力应力包络等值线图
 
     Args:
@@ -692,6 +803,7 @@ def dyn_S_env_contour(fname, coordinate_nodes, bounds, nodes_data, component='Sm
         holes (string): 孔洞文件，默认为None
         concen (string): 应力集中区域文件，默认为None
         concen_dist (float): 集中点距离，默认为0
+        method (string): 插值方法，'tri'表示不插值到网格，直接在结点三角剖分上绘制等值线，默认为'cubic'
 
     Returns:
         fig (plt.figure): 图片句柄
@@ -702,10 +814,9 @@ def dyn_S_env_contour(fname, coordinate_nodes, bounds, nodes_data, component='Sm
         holes (list): 孔洞列表，用于重绘
         concen (string): 应力集中区域文件，默认为None
     """
+    frame = get_section_frame(coordinate_nodes, nodes_data)  # 局部坐标系只计算一次
     # 获取应力数据
-    stre_data = pd.read_csv(fname, encoding='gbk')
-    stre_data.rename(columns={'      结点编号': 'node'}, inplace=True)
-    stre_data.drop_duplicates(subset='node', keep='first', inplace=True)
+    stre_data = read_field_csv(fname, drop_duplicates=True)
     stre_data = stre_data.sort_values(by='node')  # 按结点排序
     section_nodes_coord = np.array(stre_data[['X', 'Y', 'Z']])
     if component == 'Smax':
@@ -714,68 +825,56 @@ def dyn_S_env_contour(fname, coordinate_nodes, bounds, nodes_data, component='Sm
     elif component == 'Smin':
         zzS = np.array(stre_data['S_min-Min. Principal'] / 1e6)
         max_min = 'min'
-    xyS = change_coord(coordinate_nodes, section_nodes_coord, nodes_data)  # 转换剖面结点坐标
+    xyS = to_section(frame, section_nodes_coord, nodes_data)  # 转换剖面结点坐标
     # 如果需要删除一些应力集中点
     if concen is not None:
-        concen_nodes = np.loadtxt(concen)
-        concen_coord = change_coord(coordinate_nodes, concen_nodes, nodes_data)
-        xys_dele, zzS_dele = [], []
-        for i in range(xyS.shape[0]):
-            dist = np.sqrt(np.sum((concen_coord - xyS[i, :]) ** 2, axis=1))
-            if np.min(dist) > concen_dist:  # 判断该剖面结点离应力集中区域最小的距离是否大于集中点距离
-                xys_dele.append(xyS[i, :])
-                zzS_dele.append(zzS[i])
-        xyS = np.array(xys_dele)
-        zzS = np.array(zzS_dele)
+        mask = get_concen_mask(xyS, concen, coordinate_nodes, nodes_data, concen_dist)  # 剖面结点离应力集中区域最小的距离是否大于集中点距离
+        xyS = xyS[mask]
+        zzS = zzS[mask]
     xxS, yyS = xyS[:, 0], xyS[:, 1]
     # 如果有孔洞
     if holes is not None:
-        holes_nodes = np.loadtxt(holes)
-        holes = []
-        for i in range(holes_nodes.shape[0]):
-            hole_coord = change_coord(coordinate_nodes, holes_nodes[i, :], nodes_data)
-            holes.append([tuple(v) for v in list(hole_coord)])
+        holes = [[tuple(v) for v in list(hole_coord)] for hole_coord in load_section_geo(holes, frame, nodes_data, rows=True)]
     boundarys = []
     if len(bounds) == 1:  # 如果只有一个边界
-        bound_nodes = np.loadtxt(bounds[0])
-        bound_coord = change_coord(coordinate_nodes, bound_nodes, nodes_data)
+        bound_coord = load_section_geo(bounds[0], frame, nodes_data)
         boundary = [tuple(v) for v in list(bound_coord)]
         boundarys.append(boundary)
         fig = plt.figure(figsize=(6.1, 4.4))
         try:
-            X, Y, ZS, hd = getContour(xxS, yyS, zzS, boundary, dpi=100, Extrapolation=1, max_min=max_min, holes=holes)
+            X, Y, ZS, hd = getContour(xxS, yyS, zzS, boundary, dpi=100, Extrapolation=1, max_min=max_min, holes=holes, method=method)
         except:
-            X, Y, ZS, hd = getContour(xxS, yyS, zzS, boundary, dpi=100, Extrapolation=0, max_min=max_min, holes=holes)
+            X, Y, ZS, hd = getContour(xxS, yyS, zzS, boundary, dpi=100, Extrapolation=0, max_min=max_min, holes=holes, method=method)
     else:  # 如果有多个边界
         zzS_max = np.max(zzS)
         zzS_min = np.min(zzS)
         numline = np.arange(zzS_min, zzS_max, (zzS_max - zzS_min) / 10)
         fig = plt.figure(figsize=(6.1, 4.4))
         for bound in bounds:
-            bound_nodes = np.loadtxt(bound)
-            bound_coord = change_coord(coordinate_nodes, bound_nodes, nodes_data)
+            bound_coord = load_section_geo(bound, frame, nodes_data)
             boundary = [tuple(v) for v in list(bound_coord)]
             boundarys.append(boundary)
             try:
-                X, Y, ZS, hd = getContour(xxS, yyS, zzS, boundary, numline=numline, dpi=100, Extrapolation=1, max_min=max_min, holes=holes)
+                X, Y, ZS, hd = getContour(xxS, yyS, zzS, boundary, numline=numline, dpi=100, Extrapolation=1, max_min=max_min, holes=holes, method=method)
             except:
-                X, Y, ZS, hd = getContour(xxS, yyS, zzS, boundary, numline=numline, dpi=100, Extrapolation=0, max_min=max_min, holes=holes)
+                X, Y, ZS, hd = getContour(xxS, yyS, zzS, boundary, numline=numline, dpi=100, Extrapolation=0, max_min=max_min, holes=holes, method=method)
     plt.tight_layout()
     return fig, xxS, yyS, zzS, boundarys, holes, concen
 
 
-def dyn_joint_contour(joint, bounds, coordinate, copen_data, copen_id, nodes, holes=None, concen=None):
+def dyn_joint_contour(joint, bounds, coordinate, copen_data, copen_id, nodes, holes=None, concen=None, method='cubic'):
     """绘制动力横缝开度分布图
 
     Args:
         joint (string): 横缝标志
         bounds (string): 边界结点文件
         coordinate (numpy.array): 局部坐标系结点编号
-        copen_data (list): 所有横缝开度数据
-        copen_id (list): 所有横缝的标志
+        copen_data (list): 横缝开度数据，可以只包含所绘横缝
+        copen_id (list): 与copen_data对应的横缝标志
         nodes (numpy.array(n, 4)): 所有结点坐标
         holes (list): 孔洞列表，用于重绘
         concen (string): 应力集中区域文件，默认为None
+        method (string): 插值方法，'tri'表示不插值到网格，直接在结点三角剖分上绘制等值线，默认为'cubic'
 
     Returns:
         fig (plt.figure): 图片句柄
@@ -786,28 +885,21 @@ def dyn_joint_contour(joint, bounds, coordinate, copen_data, copen_id, nodes, ho
         holes (list): 孔洞列表，用于重绘
         concen (string): 应力集中区域文件，默认为None
     """
-    bound_nodes = np.loadtxt(bounds)  # 读取边界结点文件
-    # 获取横缝
-    for i in range(len(copen_id)):
-        if joint.upper() in copen_id[i]:
-            idx = i
+    bound_nodes = load_geo_file(bounds)  # 读取边界结点文件
+    idx = find_joint(joint, copen_id)  # 获取横缝
     # 获取横缝开度数据
     joint_node_id = copen_data[idx][:, 0, 0].ravel().astype(np.int64)
     joint_copen = 1000 * np.max(copen_data[idx][:, 2, :],axis=1).ravel()
     joint_copen[joint_copen <= 5e-6] = 0
 
-    all_nodes_id = nodes[:, 0].astype(np.int64)
-    all_nodes_coord = nodes[:, 1:]
     # 获取横缝结点坐标
-    joint_node_coord = np.zeros((joint_node_id.shape[0], 3))
-    for i in range(joint_node_id.shape[0]):
-        joint_node_coord[i, :] = all_nodes_coord[all_nodes_id == joint_node_id[i], :]
+    joint_node_coord = get_node_coords(nodes, joint_node_id)
 
     boundarys = []
     XX, YY, boundary = transform_coord(coordinate, bound_nodes, joint_node_coord, nodes)
     boundarys.append(boundary)
     fig = plt.figure(figsize=(6.1, 4.4))
-    X, Y, vCopen, hd = getContour(XX, YY, joint_copen, boundary, baseP=-10, max_min='max', dpi=100)
+    X, Y, vCopen, hd = getContour(XX, YY, joint_copen, boundary, baseP=-10, max_min='max', dpi=100, method=method)
     plt.tight_layout()
     return fig, XX, YY, joint_copen, boundarys, holes, concen
 
@@ -835,4 +927,47 @@ def dyn_slide(KK, dt):
     plt.xlim([t[0], t[-1]])
     plt.ylim([0, 10])  # 只显示安全系数10以内的内容
     plt.tight_layout()
-    return fig, t
\ No newline at end of file
+    return fig, t
+
+
+def init_fig_worker(nodes_data, cache_dir=None):
+    """绘图子进程的初始化函数，改用不依赖界面的Agg后端，结点坐标数组每个子进程只传一次
+
+    Args:
+        nodes_data (numpy.array(n, 4)): 所有结点的编号和坐标，第一列为结点编号
+        cache_dir (string, optional): 插值掩膜的磁盘缓存文件夹，与界面进程相同，默认为None
+    """
+    global _fig_worker_nodes
+    plt.switch_backend('Agg')
+    set_grid_cache_dir(cache_dir)  # 子进程之间以及进程池重建后通过磁盘缓存共享插值掩膜
+    _fig_worker_nodes = nodes_data
+
+
+def run_fig_job(func, args, kwargs):
+    """在绘图子进程中执行一个绘图任务
+
+    Args:
+        func (function): 绘图或数据处理函数，须为模块级函数
+        args (tuple): 位置参数，结点坐标数组用FIG_NODES占位
+        kwargs (dict): 关键字参数
+
+    Returns:
+        func的返回值，其中的图片随返回值序列化后传回界面进程
+    """
+    result = func(*fill_fig_nodes(args, _fig_worker_nodes), **kwargs)
+    plt.close('all')  # 图片已随返回值传回，子进程中不再保留
+    return result
+
+
+def get_fig_pool(nodes_data, cache_dir=None, processes=FIG_WORKERS):
+    """创建绘图进程池，子进程用spawn方式启动，与Windows及打包后的程序一致
+
+    Args:
+        nodes_data (numpy.array(n, 4)): 所有结点的编号和坐标，第一列为结点编号
+        cache_dir (string, optional): 插值掩膜的磁盘缓存文件夹，见set_grid_cache_dir，默认为None
+        processes (int, optional): 子进程数，默认为FIG_WORKERS
+
+    Returns:
+        pool (multiprocessing.Pool): 进程池，用apply_async(run_fig_job, (func, args, kwargs))提交任务，terminate()立即结束所有任务
+    """
+    return multiprocessing.get_context('spawn').Pool(processes, initializer=init_fig_worker, initargs=(nodes_data, cache_dir))
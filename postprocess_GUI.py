@@ -1,4 +1,5 @@
 import tkinter as tk
+import multiprocessing
 from functions import *
 from OutData2D import OutData2D
 from Static2D import Static2D
@@ -34,6 +35,8 @@ class PostProcessGUI(tk.Tk):
 
     
     def _quit(self):
+        for F in (Static3D, Dynamic3D):
+            self.frames[F].close_fig_pool()  # 结束绘图子进程
         self.quit()
         self.destroy() 
 
@@ -219,7 +222,10 @@ class PostProcessGUI(tk.Tk):
 #         log_label.place(x=0.48 * w, y=0.71 * h)
 
 
-XRDam_postprocexss = PostProcessGUI()
-XRDam_postprocexss.set_init_window()
-XRDam_postprocexss.protocol('WM_DELETE_WINDOW', XRDam_postprocexss._quit)
-XRDam_postprocexss.mainloop()
\ No newline at end of file
+# 绘图子进程用spawn方式启动，会重新导入本模块，界面只能在主进程中创建
+if __name__ == '__main__':
+    multiprocessing.freeze_support()  # 打包成exe后子进程的入口
+    XRDam_postprocexss = PostProcessGUI()
+    XRDam_postprocexss.set_init_window()
+    XRDam_postprocexss.protocol('WM_DELETE_WINDOW', XRDam_postprocexss._quit)
+    XRDam_postprocexss.mainloop()
\ No newline at end of file
@@ -0,0 +1,171 @@
+import numpy as np
+import matplotlib.pyplot as plt
+import scipy.stats
+from functions import kanghua_K
+from kanghua3D import get_wedge_forces
+from postprocess2D import get_slide_forces
+
+
+def _plane_params(value, num_plane):
+    """把抗剪断参数整理为每个滑面一个分布或常数的列表"""
+    if num_plane == 1 and (np.ndim(value) == 0 or hasattr(value, 'ppf')):
+        value = [value]
+    if len(value) != num_plane:
+        raise ValueError('Expected parameters for %d planes, got %d' % (num_plane, len(value)))
+    return list(value)
+
+
+def sample_params(dists, num_samples, corr=None, rng=None):
+    """按给定的分布抽样，参数之间的相关性用高斯copula（Nataf变换）考虑
+
+    Args:
+        dists (list): 各参数的分布，每个元素为scipy.stats的冻结分布（如scipy.stats.norm(1.0, 0.1)），或表示常数的浮点数
+        num_samples (int): 样本数
+        corr (numpy.array(k, k), optional): 参数之间在标准正态空间中的相关系数矩阵，默认为None，即相互独立
+        rng (numpy.random.Generator, optional): 随机数生成器，默认为None，即新建一个
+
+    Returns:
+        samples (numpy.array(num_samples, k)): 各样本的参数值
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    z = rng.standard_normal((num_samples, len(dists)))
+    if corr is not None:
+        z = z.dot(np.linalg.cholesky(corr).T)
+    u = scipy.stats.norm.cdf(z)
+    samples = np.empty_like(z)
+    for i, dist in enumerate(dists):
+        samples[:, i] = dist.ppf(u[:, i]) if hasattr(dist, 'ppf') else dist
+    return samples
+
+
+def kanghua_mc(W, P, A, f, c, num_samples=100000, corr=None, phi=1.0, gamma_0=1.1, gamma_d=1.5, gamma_f=1.7, gamma_c=2.0, dt=0.01, seed=None, chunk_size=10000000):
+    """蒙特卡洛法求抗滑稳定失效概率，抗剪断参数随机抽样，滑面作用力只需积分一次
+
+    每批样本与所有帧一起广播计算安全系数，每批的样本数乘以帧数不超过chunk_size，内存占用与总样本数无关.
+
+    Args:
+        W (numpy.array(帧数, 滑面数)): 各帧各滑面的法向作用力，静力工况帧数为1，见get_plane_forces和get_slide_forces
+        P (numpy.array(帧数, 滑面数)): 各帧各滑面的切向作用力
+        A (numpy.array(滑面数)): 各滑面面积
+        f (list): 各滑面摩擦系数的分布，每个元素为scipy.stats的冻结分布或常数；只有一个滑面时可以直接传一个分布
+        c (list): 各滑面凝聚力系数的分布，格式同f
+        num_samples (int, optional): 样本数，默认为100000
+        corr (numpy.array(2 * 滑面数, 2 * 滑面数), optional): 参数[f1, f2, ..., c1, c2, ...]之间的相关系数矩阵，默认为None，即相互独立
+        phi (float): 设计状况系数，持久状况取1.0，偶然状况取0.85.
+        gamma_0 (float): 结构重要性系数,分级I级取1.1.
+        gamma_d (float): 抗滑稳定结构系数，静力工况取1.5，动力工况取0.65.
+        gamma_f (float): 摩擦系数材料性能分项系数，取1.7.
+        gamma_c (float): 粘聚力材料性能分项系数，取2.0.
+        dt (float, optional): 时间间隔，默认为0.01
+        seed (int, optional): 随机数种子，默认为None
+        chunk_size (int, optional): 每批样本数乘以帧数的上限，默认为10000000
+
+    Returns:
+        pf (float): 失效概率，即时程中最小安全系数小于1的样本比例
+        K_min (numpy.array(num_samples)): 各样本时程中的最小安全系数
+        t_min (numpy.array(num_samples)): 各样本最小安全系数出现的时刻
+        pf_t (numpy.array(帧数)): 各时刻安全系数小于1的样本比例
+    """
+    W = np.atleast_2d(W)
+    P = np.atleast_2d(P)
+    A = np.atleast_1d(A)
+    num_plane = W.shape[1]
+    dists = _plane_params(f, num_plane) + _plane_params(c, num_plane)
+    rng = np.random.default_rng(seed)
+    K_min = np.empty(num_samples)
+    idx_min = np.empty(num_samples, dtype=np.int64)
+    fail_t = np.zeros(W.shape[0], dtype=np.int64)
+    step = max(1, chunk_size // W.shape[0])
+    for i in range(0, num_samples, step):
+        m = min(step, num_samples - i)
+        samples = sample_params(dists, m, corr, rng)
+        K = kanghua_K(W, P, A, samples[:, :num_plane], samples[:, num_plane:], phi, gamma_0, gamma_d, gamma_f, gamma_c)  # (样本数, 帧数)
+        idx = np.argmin(K, axis=1)
+        K_min[i : i + m] = K[np.arange(m), idx]
+        idx_min[i : i + m] = idx
+        fail_t += np.sum(K < 1.0, axis=0)
+    pf = np.mean(K_min < 1.0)
+    return pf, K_min, idx_min * dt, fail_t / num_samples
+
+
+def kanghua3D_2P_mc(file_path1, file_path2, area_data1, area_data2, vec_n1, vec_n2, vec_t, f, c, num_samples=100000, corr=None, phi=1.0, gamma_0=1.1, gamma_d=1.5, gamma_f=1.7, gamma_c=2.0, static=True, dt=0.01, seed=None, chunk_size=10000000):
+    """三维滑块双滑面抗滑稳定可靠度分析
+
+    Args:
+        file_path1 (string): 滑面1应力表格文件路径.
+        file_path2 (string): 滑面2应力表格文件路径.
+        area_data1 (numpy.array(n, 4)): 滑面1结点面积数组，第一列为结点编号，后三列分别为三方向面积值.
+        area_data2 (numpy.array(n, 4)): 滑面2结点面积数组，第一列为结点编号，后三列分别为三方向面积值.
+        vec_n1 (numpy.array(1, 3)): 滑面1单位法向量.
+        vec_n2 (numpy.array(1, 3)): 滑面2单位法向量.
+        vec_t (numpy.array(1, 3)): 滑块滑动方向单位向量.
+        f (list): 滑面1、2摩擦系数的分布，见kanghua_mc.
+        c (list): 滑面1、2凝聚力系数的分布.
+        num_samples (int, optional): 样本数，默认为100000.
+        corr (numpy.array(4, 4), optional): 参数[f1, f2, c1, c2]之间的相关系数矩阵，默认为None，即相互独立.
+        phi (float): 设计状况系数，持久状况取1.0，偶然状况取0.85.
+        gamma_0 (float): 结构重要性系数,分级I级取1.1.
+        gamma_d (float): 抗滑稳定结构系数，静力工况取1.5，动力工况取0.65.
+        gamma_f (float): 摩擦系数材料性能分项系数，取1.7.
+        gamma_c (float): 粘聚力材料性能分项系数，取2.0.
+        static (bool, optional): 是否为静力工况，默认为True.
+        dt (float, optional): 时间间隔，默认为0.01.
+        seed (int, optional): 随机数种子，默认为None.
+        chunk_size (int, optional): 每批样本数乘以帧数的上限，用于控制内存，默认为10000000.
+
+    Returns:
+        见kanghua_mc.
+    """
+    W, P, A = get_wedge_forces([file_path1, file_path2], [area_data1, area_data2], [vec_n1, vec_n2], vec_t, sort_nodes=static)
+    return kanghua_mc(W, P, A, f, c, num_samples, corr, phi, gamma_0, gamma_d, gamma_f, gamma_c, dt, seed, chunk_size)
+
+
+def slide_mc(fname, f, c, num_samples=100000, corr=None, phi=1.0, gamma_0=1.1, gamma_d=1.5, gamma_f=1.7, gamma_c=2.0, dt=0.01, seed=None, chunk_size=10000000):
+    """二维层面抗滑稳定可靠度分析
+
+    Args:
+        fname (string): 抗滑稳定数据文件路径，可以是静力或动力表格
+        f: 抗剪断参数f'的分布，scipy.stats的冻结分布或常数
+        c: 抗剪断参数c'的分布
+        num_samples (int, optional): 样本数，默认为100000
+        corr (numpy.array(2, 2), optional): f'和c'之间的相关系数矩阵，默认为None，即相互独立
+        phi (float): 设计状况系数，持久状况取1.0，偶然状况取0.85.
+        gamma_0 (float): 结构重要性系数,分级I级取1.1.
+        gamma_d (float): 抗滑稳定结构系数，静力工况取1.5，动力工况取0.65.
+        gamma_f (float): 摩擦系数材料性能分项系数，取1.7.
+        gamma_c (float): 粘聚力材料性能分项系数，取2.0.
+        dt (float, optional): 时间间隔，默认为0.01
+        seed (int, optional): 随机数种子，默认为None
+        chunk_size (int, optional): 每批样本数乘以帧数的上限，用于控制内存，默认为10000000
+
+    Returns:
+        见kanghua_mc
+    """
+    W, P, A = get_slide_forces(fname)
+    return kanghua_mc(W, P, A, f, c, num_samples, corr, phi, gamma_0, gamma_d, gamma_f, gamma_c, dt, seed, chunk_size)
+
+
+def plot_mc(K_min, t_min, fontsize=16):
+    """绘制蒙特卡洛样本最小安全系数及其出现时刻的分布直方图
+
+    Args:
+        K_min (numpy.array(n)): 各样本的最小安全系数
+        t_min (numpy.array(n)): 各样本最小安全系数出现的时刻
+        fontsize (int, optional): 字体大小，默认为16.
+
+    Returns:
+        fig (plt.figure): 图片句柄
+    """
+    fig = plt.figure(figsize=(6.1, 5))
+    plt.subplot(2, 1, 1)
+    plt.hist(K_min, bins=100, color='k', density=True)
+    plt.axvline(1.0, linewidth=2, color='r')
+    plt.tick_params(labelsize=fontsize - 2)
+    plt.xlabel('$K_{min}$', fontsize=fontsize)
+    plt.subplot(2, 1, 2)
+    plt.hist(t_min, bins=100, color='k', density=True)
+    plt.tick_params(labelsize=fontsize - 2)
+    plt.xlabel('t (s)', fontsize=fontsize)
+    plt.tight_layout()
+    return fig
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from postprocess3D import read_joint_dat_dyn
+
+
+def write_block(lines, joint, value):
+    lines.append(' CONTACT OUTPUT FOR SLAVE SURFACE %s\n' % joint)
+    lines.extend([' \n', '   NODE   FOOT-   CONTACT   CPRESS    COPEN\n', '          NOTE    STATUS\n', ' \n'])
+    lines.append('   %d         %s   0.000   %.3f\n' % (1, 'OP', value))
+    lines.append('   %d         %s   0.000   %.3f\n' % (2, 'CL', -value))
+    lines.append('\n')
+
+
+def write_dat(path, num_inc, print_every, joints=('J1-X1', 'J2-X1')):
+    lines = [' S T E P       4\n']
+    for j, joint in enumerate(joints):
+        write_block(lines, joint, j)
+    lines.append(' S T E P       5\n')
+    for inc in range(1, num_inc + 1):
+        lines.append(' INCREMENT %d SUMMARY\n' % inc)
+        if inc % print_every == 0:
+            for j, joint in enumerate(joints):
+                write_block(lines, joint, 10 * inc + j)
+    with open(path, 'w', encoding='gbk') as f:
+        f.writelines(lines)
+
+
+def test_sparse_contact_output(tmp_path):
+    """接触输出每2个增量步一次时，只有有输出的增量步成为一帧"""
+    fname = str(tmp_path / 'dyn.dat')
+    write_dat(fname, num_inc=5, print_every=2)
+    copen_data, copen_id = read_joint_dat_dyn(fname)
+    assert len(copen_data) == 2
+    assert copen_data[0].shape == (2, 4, 3)
+    np.testing.assert_allclose(copen_data[0][0, -1, :], [0, 20, 40])
+    np.testing.assert_allclose(copen_data[1][0, -1, :], [1, 21, 41])
+    assert copen_data[0][0, 1, 0] == 1  # OP为1
+    copen_data, _ = read_joint_dat_dyn(fname, joints=['J2'], increments=slice(1, None))
+    np.testing.assert_allclose(copen_data[0][0, -1, :], [1, 41])
+
+
+def test_missing_joint_block(tmp_path):
+    """某个增量步缺少横缝的CONTACT OUTPUT块时报错"""
+    fname = str(tmp_path / 'dyn.dat')
+    write_dat(fname, num_inc=2, print_every=1)
+    with open(fname, encoding='gbk') as f:
+        text = f.read()
+    cut = text.rindex(' CONTACT OUTPUT')
+    with open(fname, 'w', encoding='gbk') as f:
+        f.write(text[:cut])
+    with pytest.raises(ValueError):
+        read_joint_dat_dyn(fname)